@@ -0,0 +1,263 @@
+import argparse
+import ast
+import re
+import numpy as np
+import resultsStore as rs
+import significance as sg
+
+
+# Plot labels of the olympic events, in the order of resultsStore.EVENTS
+EVENT_LABELS = {'fight': 'Foraging\nCompetition I', 'fight2': 'Foraging\nCompetition II', 'circle': 'Circle of Pellets',
+                'check': 'Control Check', 'shift': 'Shifted Sensors', 'kill': 'Left Sensor\nElimination',
+                'noise': 'Controller Noise'}
+
+# Headings used for each event in the old text logs (data*.txt, newData.txt)
+LEGACY_HEADINGS = {'Fight': 'fight', 'Fight 2': 'fight2', 'Circle': 'circle', 'Check': 'check', 'Shift': 'shift',
+                   'Kill': 'kill', 'Noise': 'noise'}
+
+
+def loadRuns(paths, **filters):
+    """
+    Load the rows of one or more results stores into a single table
+    :param paths: List of results store folders (e.g. one per experiment)
+    :param filters: Filters passed on to ResultsStore.read (e.g. event='circle')
+    :return: Dictionary of column name -> numpy array, with an extra 'store' column giving the index of the source store
+    """
+    tables = []
+    for i, path in enumerate(paths):
+        table = rs.ResultsStore(path).read(**filters)
+        table['store'] = np.full(len(table['run']), i, dtype=np.int32)
+        tables.append(table)
+
+    return {column: np.concatenate([table[column] for table in tables]) for column in tables[0]}
+
+
+def parseLegacyLog(path):
+    """
+    Parse one of the old text logs written by recordInfo into
+    a list of runs
+    :param path: Path to the text file
+    :return: List of [run heading, {event: [novelty scores, fitness scores]}]
+    :raises ValueError: If an event heading isn't in a run, or isn't followed by a list of scores
+    """
+    runs = []
+    with open(path) as file:
+        lines = file.read().splitlines()
+
+    for i, line in enumerate(lines):
+        runMatch = re.match(r'^----RUN (.*)---$', line)
+        if runMatch:
+            runs.append([runMatch.group(1), {}])
+            continue
+
+        # Event headings are followed by the list of food eaten by every robot in that event
+        # (a heading that can't be read is an error, rather than its scores being left out)
+        eventMatch = re.match(r'^(Fight 2|Fight|Circle|Check|Shift|Kill|Noise) (Novelty|Fitness):$', line)
+        if eventMatch:
+            if not runs:
+                raise ValueError(f"{path}:{i + 1}: '{line}' comes before any ----RUN heading")
+            try:
+                eventScores = ast.literal_eval(lines[i + 1])
+            except (IndexError, ValueError, SyntaxError):
+                eventScores = None
+            if not (isinstance(eventScores, list) and all(isinstance(score, int) for score in eventScores)):
+                raise ValueError(f"{path}:{i + 2}: expected a list of scores after '{line}'")
+            scores = runs[-1][1].setdefault(LEGACY_HEADINGS[eventMatch.group(1)], [[], []])
+            scores[0 if eventMatch.group(2) == 'Novelty' else 1] = eventScores
+
+    return runs
+
+
+def importLegacyLogs(paths, store, firstRun=None):
+    """
+    One-time import of the old text logs into a results store. Every run in every
+    file gets a new run number, because the same run numbers were reused between
+    files. Active nodes and behavioral scores were never logged per controller, so
+    they're saved as -1 (and NaN for mean velocity)
+    :param paths: List of text logs (e.g. data3.txt, data5.txt, data6.txt)
+    :param store: ResultsStore to import into
+    :param firstRun: Run number given to the first imported run - defaults to one more than the largest in the store
+    :return: List of [path, run heading in the file, new run number]
+    """
+    if firstRun is None:
+        runs = store.column('run')
+        firstRun = int(runs.max()) + 1 if len(runs) > 0 else 0
+
+    imported = []
+    run = firstRun
+    for path in paths:
+        for heading, events in parseLegacyLog(path):
+            for event, (novScores, fitScores) in events.items():
+                # Olympic teams are novelty controllers first, then fitness controllers
+                scores = novScores + fitScores
+                n = len(scores)
+                store.append(run=[run] * n, event=[event] * n, generation=[0] * n, controller=list(range(n)),
+                             novelty=[True] * len(novScores) + [False] * len(fitScores), foodEaten=scores,
+                             activeNodes=[-1] * n, velSpikes=[-1] * n, accSpikes=[-1] * n, meanVelocity=[np.nan] * n)
+            imported.append([path, heading, run])
+            run += 1
+
+    return imported
+
+
+def groupBy(table, keys):
+    """
+    Give every row the index of its group, where a group is a
+    unique combination of values in the key columns
+    :param table: Dictionary of column name -> numpy array
+    :param keys: List of column names to group by
+    :return: Array of unique key combinations (one row per group), array of group index for every row
+    """
+    stacked = np.stack([table[key].astype(np.int64) for key in keys], axis=1)
+    groups, index = np.unique(stacked, axis=0, return_inverse=True)
+    return groups, index.ravel()
+
+
+def groupStats(table, keys, value='foodEaten'):
+    """
+    Count, mean and standard deviation of a column for every group,
+    all done with bincount instead of looping over the groups
+    :param table: Dictionary of column name -> numpy array
+    :param keys: List of column names to group by
+    :param value: Column to summarise
+    :return: Dictionary with the group keys as columns plus 'count', 'mean' and 'std'
+    """
+    groups, index = groupBy(table, keys)
+    values = table[value].astype(np.float64)
+
+    count = np.bincount(index, minlength=len(groups))
+    mean = np.bincount(index, weights=values, minlength=len(groups)) / count
+    meanSq = np.bincount(index, weights=values ** 2, minlength=len(groups)) / count
+
+    stats = {key: groups[:, i] for i, key in enumerate(keys)}
+    stats.update({'count': count, 'mean': mean, 'std': np.sqrt(np.maximum(meanSq - mean ** 2, 0))})
+    return stats
+
+
+def successRates(table, threshold=0):
+    """
+    Fraction of novelty and fitness controllers that were successful in
+    each event (ate more than threshold pellets)
+    :param table: Dictionary of column name -> numpy array
+    :param threshold: A robot has to eat more than this many pellets to count as successful
+    :return: Array of shape (number of events, 2) - column 0 is novelty, column 1 is fitness (NaN if no rows)
+    """
+    # Combine event and search type into a single index so one bincount does every group
+    index = table['event'].astype(np.int64) * 2 + (~table['novelty']).astype(np.int64)
+    size = len(rs.EVENTS) * 2
+
+    total = np.bincount(index, minlength=size)
+    successes = np.bincount(index, weights=table['foodEaten'] > threshold, minlength=size)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (successes / total).reshape(len(rs.EVENTS), 2)
+
+
+def scoreDistributions(table, maxScore=None):
+    """
+    Histogram of food eaten for novelty and fitness controllers in each event
+    :param table: Dictionary of column name -> numpy array
+    :param maxScore: Largest score to count (bigger scores go in the last bin) - defaults to the largest in the table
+    :return: Array of counts with shape (number of events, 2, maxScore + 1) - axis 1 is novelty, fitness
+    """
+    scores = np.clip(table['foodEaten'], 0, None).astype(np.int64)
+    if maxScore is None:
+        maxScore = int(scores.max()) if len(scores) > 0 else 0
+    scores = np.minimum(scores, maxScore)
+
+    index = (table['event'].astype(np.int64) * 2 + (~table['novelty']).astype(np.int64)) * (maxScore + 1) + scores
+    counts = np.bincount(index, minlength=len(rs.EVENTS) * 2 * (maxScore + 1))
+    return counts.reshape(len(rs.EVENTS), 2, maxScore + 1)
+
+
+def eventsScored(table):
+    """
+    Vectorized version of postprocessing.calculateScores - how many events
+    each controller scored in (ate at least one pellet), for every run
+    :param table: Dictionary of column name -> numpy array (olympic rows only)
+    :return: Dictionary with 'store', 'run', 'controller', 'novelty' and 'eventsScored' for every controller
+    """
+    groups, index = groupBy(table, ['store', 'run', 'controller'])
+    scored = np.bincount(index, weights=table['foodEaten'] > 0, minlength=len(groups)).astype(np.int64)
+
+    # Every row of a controller has the same novelty flag, so any of them will do
+    novelty = np.zeros(len(groups), dtype=bool)
+    novelty[index] = table['novelty']
+
+    return {'store': groups[:, 0], 'run': groups[:, 1], 'controller': groups[:, 2], 'novelty': novelty,
+            'eventsScored': scored}
+
+
+def noveltyVsFitness(table, threshold=0):
+    """
+    Compare novelty and fitness controllers in every olympic event
+    :param table: Dictionary of column name -> numpy array
+    :param threshold: A robot has to eat more than this many pellets to count as successful
+    :return: List of [event, novelty mean, fitness mean, novelty success rate, fitness success rate, number of rows]
+    """
+    olympics = {column: values[table['event'] > 0] for column, values in table.items()}
+    stats = groupStats(olympics, ['event', 'novelty'])
+    rates = successRates(olympics, threshold)
+
+    means = np.full((len(rs.EVENTS), 2), np.nan)
+    counts = np.zeros(len(rs.EVENTS), dtype=np.int64)
+    means[stats['event'], (~stats['novelty'].astype(bool)).astype(int)] = stats['mean']
+    np.add.at(counts, stats['event'], stats['count'])
+
+    return [[rs.EVENTS[e], means[e, 0], means[e, 1], rates[e, 0], rates[e, 1], counts[e]]
+            for e in range(1, len(rs.EVENTS)) if counts[e] > 0]
+
+
+def printReport(table, threshold=0):
+    """
+    Print a summary of every olympic event across all the runs in the table
+    :param table: Dictionary of column name -> numpy array
+    :param threshold: A robot has to eat more than this many pellets to count as successful
+    :return: None
+    """
+    numRuns = len(np.unique(np.stack([table['store'], table['run']], axis=1), axis=0)) if len(table['run']) else 0
+    print(f"{numRuns} runs, {len(table['run'])} rows")
+    print(f"{'Event':<10}{'Nov mean':>10}{'Fit mean':>10}{'Nov success':>13}{'Fit success':>13}{'Rows':>8}")
+    for event, novMean, fitMean, novRate, fitRate, count in noveltyVsFitness(table, threshold):
+        print(f"{event:<10}{novMean:>10.2f}{fitMean:>10.2f}{novRate:>13.2f}{fitRate:>13.2f}{count:>8}")
+
+
+def plotSuccessRates(table, threshold=0, events=('fight', 'fight2', 'circle', 'shift', 'kill', 'noise')):
+    """
+    Bar chart of novelty vs fitness success rates across all the runs in the table
+    :param table: Dictionary of column name -> numpy array
+    :param threshold: A robot has to eat more than this many pellets to count as successful
+    :param events: Events to show on the chart
+    :return: bar chart
+    """
+    import postprocessing as pp
+
+    rates = successRates(table, threshold)
+    codes = [rs.EVENTS.index(event) for event in events]
+    pp.plotBarChart(novelty=rates[codes, 0], fitness=rates[codes, 1], labels=[EVENT_LABELS[x] for x in events],
+                    title="Performance of Novelty vs Fitness-Evolved Controllers\nwith Binary Performance Metric "
+                          "Across All Runs")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Report on the olympic results of many runs")
+    parser.add_argument('stores', nargs='*', default=['results'], help="results store folders to load")
+    parser.add_argument('--import-legacy', nargs='+', metavar='LOG',
+                        help="text logs (e.g. data3.txt) to import into the first store before reporting")
+    parser.add_argument('--threshold', type=int, default=0, help="pellets a robot must beat to count as successful")
+    parser.add_argument('--resamples', type=int, default=10000,
+                        help="bootstrap resamples/permutations for the novelty vs fitness tests (0 to skip them)")
+    parser.add_argument('--plot', action='store_true', help="show the bar chart of success rates")
+    args = parser.parse_args()
+
+    if args.import_legacy:
+        for path, heading, run in importLegacyLogs(args.import_legacy, rs.ResultsStore(args.stores[0])):
+            print(f"Imported {path} RUN {heading} as run {run}")
+
+    allRuns = loadRuns(args.stores)
+    printReport(allRuns, args.threshold)
+    if args.resamples > 0:
+        print()
+        sg.printSignificance(sg.compareNoveltyFitness(allRuns, numResamples=args.resamples))
+    if args.plot:
+        plotSuccessRates(allRuns, args.threshold)
@@ -0,0 +1,218 @@
+import argparse
+import contextlib
+import copy
+import io
+import json
+import platform
+import sys
+import time
+import types
+import numpy as np
+import pelletGenerator as pg
+import foragingRobot as fr
+import geneticController as gc
+import novelty as nv
+import main
+import simulationContext as sc
+
+sys.path.insert(1, '..')
+from situsim_v1_2 import *
+
+
+def timeCall(func, number, repeat=5):
+    """
+    Time a function, taking the best of several repeats so that
+    other processes on the machine get in the way as little as possible
+    :param func: Function to time (called with no arguments)
+    :param number: How many times it's called in each repeat
+    :param repeat: How many repeats
+    :return: Best mean time per call, in seconds
+    """
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def makeRobot(controller, pellets=None):
+    """
+    Make a foraging robot at the training start position, as in main.runSimOnce
+    :param controller: Controller for the robot
+    :param pellets: Tuple returned by pelletGenerator.generateRandomPellets - defaults to the training course
+    :return: ForagingRobot object
+    """
+    if pellets is None:
+        pellets = pg.generateRandomPellets(25, 0, 10, seed=42)
+    foodPellets, poisonPellets, allPellets = pellets
+    return fr.ForagingRobot(x=-12, y=0, controller=controller, left_food_sources=foodPellets,
+                            right_food_sources=foodPellets, left_poison_sources=poisonPellets,
+                            right_poison_sources=poisonPellets, left_food_sensor_angle=np.pi / 3,
+                            right_food_sensor_angle=-np.pi / 3, left_poison_sensor_angle=np.pi / 3,
+                            right_poison_sensor_angle=-np.pi / 3, food_field_of_view=0.8 * np.pi,
+                            poison_field_of_view=0.8 * np.pi, consumables=allPellets)
+
+
+# Every benchmark sets up its own objects (with fixed seeds, so every run times the same work) and returns the function
+# to time, how many calls to time it for, and how many units of work (and what they are) each call does
+def lightSensorStep():
+    foodPellets, _, _ = pg.generateRandomPellets(25, 0, 10, seed=42)
+    sensor = LightSensor(light_sources=foodPellets, x=-12, y=0, field_of_view=2 * np.pi)
+    return lambda: sensor.step(0.1), 2000, 25, 'source'
+
+
+def getBrightnessAt():
+    source = LightSource(x=3, y=4, brightness=3)
+    return lambda: source.get_brightness_at(-12, 0), 20000, 1, 'call'
+
+
+def robotStep():
+    robot = Robot(x=0, y=0, controller=Controller(), left_light_sources=[LightSource(x=5, y=5)],
+                  right_light_sources=[LightSource(x=5, y=5)])
+    return lambda: robot.step(0.1), 2000, 1, 'step'
+
+
+def foragingRobotStep():
+    robot = makeRobot(gc.GeneticController(rng=np.random.default_rng(1)))
+    return lambda: robot.step(0.1), 1000, 1, 'step'
+
+
+def controllerEval():
+    controller = gc.GeneticController(rng=np.random.default_rng(1))
+    return lambda: controller.eval(0.5, 0.3, 90), 2000, 1, 'call'
+
+
+def controllerMutate():
+    controller = gc.GeneticController(rng=np.random.default_rng(1))
+    rng = np.random.default_rng(2)
+    return lambda: controller.mutate(0.05, rng), 200, 1, 'child'
+
+
+def noveltyScores():
+    # A generation of 20 robots scored against an archive of 200 behaviors - only the parts getNoveltyScores uses
+    rng = np.random.default_rng(3)
+    archive = [[int(a), int(b), c] for a, b, c in zip(rng.integers(0, 300, 200), rng.integers(0, 400, 200),
+                                                      rng.random(200))]
+    pop = [types.SimpleNamespace(behScore=score, controller=types.SimpleNamespace()) for score in archive[:20]]
+
+    def score():
+        novelty = nv.Novelty()
+        novelty.behArchive = list(archive)
+        novelty.getNoveltyScores(pop, 0, rng)
+
+    return score, 50, len(pop), 'robot'
+
+
+def runSimOnce():
+    controller = gc.GeneticController(rng=np.random.default_rng(4))
+
+    def run():
+        # runSimOnce prints each robot's score, which isn't wanted in the middle of the results
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.runSimOnce(screen_width=700, controller=copy.deepcopy(controller), animate=False)
+
+    return run, 1, 1000, 'step'
+
+
+def runSimOnceReused():
+    controller = gc.GeneticController(rng=np.random.default_rng(4))
+    context = sc.SimulationContext()
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.runSimOnce(screen_width=700, controller=copy.deepcopy(controller), animate=False, context=context)
+
+    return run, 1, 1000, 'step'
+
+
+BENCHMARKS = {'LightSensor.step': lightSensorStep, 'LightSource.get_brightness_at': getBrightnessAt,
+              'Robot.step': robotStep, 'ForagingRobot.step': foragingRobotStep,
+              'GeneticController.eval': controllerEval, 'GeneticController.mutate': controllerMutate,
+              'Novelty.getNoveltyScores': noveltyScores, 'runSimOnce': runSimOnce,
+              'runSimOnce (reused context)': runSimOnceReused}
+
+
+def runBenchmarks(names=None, repeat=5):
+    """
+    Run the benchmarks
+    :param names: Names of the benchmarks to run (keys in BENCHMARKS) - defaults to all of them
+    :param repeat: How many repeats to take the best of
+    :return: Dictionary of benchmark name -> {'perCall', 'perUnit', 'unit'} (times in seconds)
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        func, number, units, unit = BENCHMARKS[name]()
+        perCall = timeCall(func, number, repeat)
+        results[name] = {'perCall': perCall, 'perUnit': perCall / units, 'unit': unit}
+    return results
+
+
+def compareToBaseline(results, baseline, threshold=0.25):
+    """
+    Find the benchmarks that got slower than the baseline by more than the threshold
+    :param results: Dictionary returned by runBenchmarks
+    :param baseline: Dictionary returned by runBenchmarks, for the code being compared against
+    :param threshold: Allowed fractional slowdown (0.25 means 25% slower is still fine)
+    :return: List of [name, baseline time per call, new time per call] for every regression
+    """
+    return [[name, baseline[name]['perCall'], result['perCall']] for name, result in results.items()
+            if name in baseline and result['perCall'] > baseline[name]['perCall'] * (1 + threshold)]
+
+
+def printResults(results, baseline=None):
+    """
+    Print the results as a table, with the change from the baseline if there is one
+    :param results: Dictionary returned by runBenchmarks
+    :param baseline: Dictionary returned by runBenchmarks, or None
+    :return: None
+    """
+    print(f"{'Benchmark':<32}{'Per call':>12}{'Throughput':>22}{'Change':>10}")
+    for name, result in results.items():
+        throughput = f"{1 / result['perUnit']:,.0f} {result['unit']}/s"
+        change = ''
+        if baseline is not None and name in baseline:
+            change = f"{result['perCall'] / baseline[name]['perCall'] - 1:+.0%}"
+        print(f"{name:<32}{result['perCall'] * 1e6:>10.1f}us{throughput:>22}{change:>10}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Time the simulation's hot paths and check them against a baseline")
+    parser.add_argument('names', nargs='*', help="benchmarks to run (defaults to all of them)",
+                        metavar='NAME')
+    parser.add_argument('--baseline', default='benchmarkBaseline.json', help="baseline JSON file to compare against")
+    parser.add_argument('--save', action='store_true', help="save the results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="fractional slowdown past which a benchmark counts as a regression")
+    parser.add_argument('--repeat', type=int, default=5, help="repeats to take the best of")
+    args = parser.parse_args()
+
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {sorted(unknown)} (choose from {list(BENCHMARKS)})")
+
+    results = runBenchmarks(args.names, args.repeat)
+
+    if args.save:
+        with open(args.baseline, "w") as file:
+            json.dump({'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine(),
+                       'results': results}, file, indent=4)
+        printResults(results)
+        print("Baseline saved to", args.baseline)
+    else:
+        try:
+            with open(args.baseline) as file:
+                baseline = json.load(file)['results']
+        except FileNotFoundError:
+            baseline = None
+        printResults(results, baseline)
+
+        if baseline is None:
+            print("No baseline at", args.baseline, "- run with --save to make one")
+        else:
+            regressions = compareToBaseline(results, baseline, args.threshold)
+            for name, old, new in regressions:
+                print(f"REGRESSION: {name} went from {old * 1e6:.1f}us to {new * 1e6:.1f}us per call")
+            if regressions:
+                sys.exit(1)
@@ -0,0 +1,119 @@
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.colors import LogNorm
+
+
+# Counts of robots in each cell of a fixed grid over the behavior space, added to as each generation finishes - so
+# phase-space plots of a whole run come from the grid instead of from every robot. With zEdges it's a 3D grid over
+# all three behavioral scores, otherwise a 2D grid over the first two. Scores outside the grid are counted in the
+# nearest edge cell, and the number of them is kept in self.clipped
+class PhaseSpaceDensity:
+
+    def __init__(self, xEdges, yEdges, zEdges=None):
+        """
+        Constructor method
+        :param xEdges: Bin edges of the first behavioral score (velocity spikes)
+        :param yEdges: Bin edges of the second behavioral score (acceleration spikes)
+        :param zEdges: Bin edges of the third behavioral score (mean velocity) - None for a 2D grid
+        """
+        self.edges = [np.asarray(xEdges, dtype=float), np.asarray(yEdges, dtype=float)]
+        if zEdges is not None:
+            self.edges.append(np.asarray(zEdges, dtype=float))
+        self.counts = np.zeros([len(edges) - 1 for edges in self.edges], dtype=np.int64)
+        self.generationCounts = []      # Number of robots added in each generation
+        self.clipped = 0                # Number of scores outside the grid
+
+    def add(self, robots):
+        """
+        Add a generation of robots to the grid
+        :param robots: List of robots (or anything with a behScore, e.g. EvaluationSummary)
+        :return: None
+        """
+        self.generationCounts.append(len(robots))
+        if not robots:
+            return
+        scores = np.array([robot.behScore[:len(self.edges)] for robot in robots], dtype=float)
+
+        # Find every robot's cell in each dimension, keeping scores outside the grid in the edge cells
+        cells = []
+        outside = np.zeros(len(scores), dtype=bool)
+        for d, edges in enumerate(self.edges):
+            cell = np.searchsorted(edges, scores[:, d], side='right') - 1
+            cell[scores[:, d] == edges[-1]] = len(edges) - 2     # The last edge belongs to the last cell
+            outside |= (cell < 0) | (cell > len(edges) - 2)
+            cells.append(np.clip(cell, 0, len(edges) - 2))
+        self.clipped += int(outside.sum())
+
+        flat = np.ravel_multi_index(cells, self.counts.shape)
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+
+    def total(self):
+        """
+        Total number of robots added
+        :return: Number of robots
+        """
+        return int(sum(self.generationCounts))
+
+
+def behaviorEdges(duration=100, dt=0.1, bins=50, maxSpeed=2):
+    """
+    Bin edges covering every possible behavioral score of a simulation
+    (spikes can't be more than the number of steps, and the mean
+    velocity can't be more than the motors' maximum speed)
+    :param duration: Duration of the simulations
+    :param dt: Time step of the simulations
+    :param bins: Number of bins in each dimension
+    :param maxSpeed: Maximum speed of the robots' motors
+    :return: Velocity spike edges, acceleration spike edges, mean velocity edges
+    """
+    steps = int(round(duration / dt))
+    return np.linspace(0, steps, bins + 1), np.linspace(0, steps, bins + 1), np.linspace(-maxSpeed, maxSpeed, bins + 1)
+
+
+def plotPhaseSpaceDensity(density, title):
+    """
+    Plot the phase space of a run from its accumulated grid - the 2D equivalent
+    of postprocessing.plotPhaseSpace, with cells coloured by how many robots are in them
+    :param density: PhaseSpaceDensity object (a 3D grid is summed over mean velocity)
+    :param title: Portion of the plot title indicating type of robot population
+    :return: None
+    """
+    counts = density.counts if density.counts.ndim == 2 else density.counts.sum(axis=2)
+
+    plt.figure()
+    # Log colours so a few very common behaviors don't hide the rest (empty cells are left blank)
+    plt.pcolormesh(density.edges[0], density.edges[1], np.ma.masked_equal(counts, 0).T, cmap='viridis',
+                   norm=LogNorm(vmin=1, vmax=max(counts.max(), 1)))
+    plt.colorbar(label="Robots")
+
+    plt.title(f"Phase Space of Velocity vs Acceleration Spikes for {title} ({density.total()} robots)")
+    plt.xlabel("Velocity")
+    plt.ylabel("Acceleration")
+
+
+def plot3DDensity(density, title=""):
+    """
+    3D version of the accumulated grid - the equivalent of postprocessing.plot3DSpace,
+    with one point per occupied cell, sized and coloured by how many robots are in it
+    :param density: PhaseSpaceDensity object with a 3D grid
+    :param title: Plot title
+    :return: None
+    """
+    if density.counts.ndim != 3:
+        raise ValueError("plot3DDensity needs a 3D grid (made with zEdges)")
+
+    centres = [(edges[:-1] + edges[1:]) / 2 for edges in density.edges]
+    occupied = np.nonzero(density.counts)
+    counts = density.counts[occupied]
+
+    fig = plt.figure()
+    ax = fig.add_subplot(projection='3d')
+    points = ax.scatter(*[centre[cells] for centre, cells in zip(centres, occupied)], c=counts, cmap='viridis',
+                        norm=LogNorm(vmin=1, vmax=max(counts.max(initial=1), 1)),
+                        s=10 + 40 * np.log1p(counts) / np.log1p(counts.max(initial=1)))
+    fig.colorbar(points, label="Robots")
+
+    ax.set_xlabel('Velocity Spikes')
+    ax.set_ylabel('Acceleration Spikes')
+    ax.set_zlabel('Mean Velocity')
+    ax.set_title(title)
@@ -0,0 +1,93 @@
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+
+def renderFigures(outDir, name, job):
+    """
+    Render every figure made by a plotting function to png files -
+    runs inside a worker process, so it switches matplotlib to the
+    non-interactive Agg backend before anything is drawn
+    :param outDir: Folder the figures are saved to
+    :param name: Name used as the prefix of every file (e.g. the event name)
+    :param job: Pickled (plotFunc, args) tuple - plotFunc has to be a module-level function
+    :return: List of the file paths that were written
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    plotFunc, args = pickle.loads(job)
+    plotFunc(*args)
+
+    # Save every figure the plotting function opened, then close them so the worker doesn't hold onto them
+    paths = []
+    for i, num in enumerate(plt.get_fignums()):
+        path = os.path.join(outDir, f"{name}_{i}.png")
+        plt.figure(num).savefig(path)
+        paths.append(path)
+    plt.close('all')
+
+    return paths
+
+
+# Sends plotting jobs to a pool of background processes so the simulation can keep running (and never stops on a GUI
+# window) while the figures are drawn and saved. An index of every file written is saved when the exporter is closed
+class FigureExporter:
+
+    def __init__(self, outDir="figures", workers=2):
+        """
+        Constructor method
+        :param outDir: Folder the figures and the index are saved to (created if it doesn't exist)
+        :param workers: Number of background processes doing the rendering
+        """
+        self.outDir = outDir
+        os.makedirs(outDir, exist_ok=True)
+
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.jobs = []          # List of [name, future] for every plotting job submitted
+        self.names = {}         # How many times each name has been used, so repeated names don't overwrite files
+
+    def submit(self, name, plotFunc, *args):
+        """
+        Queue a plotting function to be rendered to files in the background
+        :param name: Name of the job - used as the file prefix and as the key in the index
+        :param plotFunc: Module-level plotting function that draws one or more matplotlib figures
+        :param args: Arguments for plotFunc (everything has to be picklable)
+        :return: None
+        """
+        count = self.names.get(name, 0)
+        self.names[name] = count + 1
+        if count > 0:
+            name = f"{name}_{count}"
+
+        # Pickle the job straight away - the pool only sends it to a worker later, by which time the simulation may
+        # already have changed the objects (e.g. reset the controllers for the next event)
+        job = pickle.dumps((plotFunc, args))
+        self.jobs.append([name, self.pool.submit(renderFigures, self.outDir, name, job)])
+
+    def close(self):
+        """
+        Wait for every job to finish, shut down the workers and
+        write the index of files (index.json in the output folder). A job
+        that failed is kept in the index as {"error": message} in place of
+        its list of files, so the figures that did render are still indexed
+        :return: Path to the index file
+        """
+        index = {}
+        try:
+            for name, future in self.jobs:
+                try:
+                    index[name] = future.result()
+                except Exception as error:
+                    print(f"Figure job {name} failed: {type(error).__name__}: {error}")
+                    index[name] = {'error': f"{type(error).__name__}: {error}"}
+        finally:
+            self.pool.shutdown()
+
+        indexPath = os.path.join(self.outDir, "index.json")
+        with open(indexPath, "w") as file:
+            json.dump(index, file, indent=4)
+
+        return indexPath
@@ -1,4 +1,5 @@
 import sys
+import heapq
 
 # path to folder which contains situsim_v1_2
 sys.path.insert(1, '..')
@@ -32,6 +33,14 @@ class RobotEnergySensor(Sensor):
         self.noisemaker = noisemaker
         self.robot = robot
 
+    # reset sensor, with its record cleared
+    def reset(self, x=None, y=None, theta=None):
+        super().reset(x, y, theta)
+        self.activation = 0
+        self.activations = [self.activation]
+        if self.noisemaker is not None:
+            self.noisemaker.reset()
+
     # step sensor
     def step(self, dt):
         super().step(dt)
@@ -71,7 +80,9 @@ class ForagingRobot(Robot):
                  left_motor_max_speed=2, right_motor_max_speed=2,
                  left_motor_inertia=0, right_motor_inertia=0,
                  left_motor_reversed=False, right_motor_reversed=False,
-                 novelty=False      # Whether or not the robot is implementing novelty search
+                 novelty=False,     # Whether or not the robot is implementing novelty search
+                 integrator='euler',
+                 occluders=None     # Occluders which block light from reaching the robot's sensors (None for none)
                  ):
         self.novelty = novelty      # Set self.novelty to parameter (boolean T/F robot implements novelty search)
         self.left_poison_sensor_angle = left_poison_sensor_angle
@@ -113,25 +124,63 @@ class ForagingRobot(Robot):
                          left_motor_inertia=left_motor_inertia,
                          right_motor_inertia=right_motor_inertia,
                          left_motor_reversed=left_motor_reversed,
-                         right_motor_reversed=right_motor_reversed
+                         right_motor_reversed=right_motor_reversed,
+                         integrator=integrator
                          )
 
+        # every light sensor is blocked by the same obstacles
+        for sensor in [self.left_sensor, self.right_sensor, self.left_poison_sensor, self.right_poison_sensor]:
+            sensor.occluders = occluders
+
         self.left_sensor.color = 'darkgreen'  # set food sensor colours. poison sensor colours are left at default- red
         self.right_sensor.color = 'darkgreen'
         self.energy_sensor.color = 'yellow'     # set energy level sensor
+        self.set_novelty(novelty)
+
+        # the poison sensors are normally in the same places as the food sensors, with the same field of view, in which
+        # case each food and poison pair is stepped together as one sensor with a channel for each
+        self.left_multi_sensor = None
+        self.right_multi_sensor = None
+        if food_field_of_view == poison_field_of_view:
+            if left_food_sensor_angle == left_poison_sensor_angle:
+                self.left_multi_sensor = MultiChannelLightSensor([self.left_sensor, self.left_poison_sensor])
+            if right_food_sensor_angle == right_poison_sensor_angle:
+                self.right_multi_sensor = MultiChannelLightSensor([self.right_sensor, self.right_poison_sensor])
+
+        self.initial_energy = initial_energy    # energy level at the start of a run
+        self.energy = initial_energy            # set initial energy level
+        self.energies = [initial_energy]        # store energy level
+        self.decay_rate = decay_rate            # rate at which energy decays when used by motors
+        self.decay_rate2 = decay_rate2          # rate at which energy decays even if the motors are inactive
+
+    # Set whether the robot implements novelty search, and colour its poison sensors to match
+    def set_novelty(self, novelty):
+        self.novelty = novelty
         # If the robot uses novelty, make it's food sensors purple (for visual ID during animation)
         if novelty:
             self.right_poison_sensor.color = 'purple'
             self.left_poison_sensor.color = 'purple'
         # If the robot uses fitness, make its food sensors yellow (for visual ID during animation)
-        elif not novelty:
+        else:
             self.right_poison_sensor.color = 'yellow'
             self.left_poison_sensor.color = 'yellow'
 
-        self.energy = initial_energy            # set initial energy level
-        self.energies = [initial_energy]        # store energy level
-        self.decay_rate = decay_rate            # rate at which energy decays when used by motors
-        self.decay_rate2 = decay_rate2          # rate at which energy decays even if the motors are inactive
+    # Put the robot back at the start of a run, with full energy, nothing eaten and every record cleared, so it can be
+    # evaluated again without being constructed again. behScore is replaced rather than changed, as the novelty archive
+    # may still hold the last one
+    def reset(self, x, y, theta=0, controller=None):
+        # the poison and energy sensors first, as the Robot reset positions them along with the food sensors
+        self.left_poison_sensor.reset(x, y, 0)
+        self.right_poison_sensor.reset(x, y, 0)
+        self.energy_sensor.reset(x, y)
+        super().reset(x, y, theta, controller)
+
+        self.behScore = 0
+        self.generation = 0
+        self.foodEaten = 0
+        self.poisonEaten = 0
+        self.energy = self.initial_energy
+        self.energies = [self.initial_energy]
 
     # Method to keep the sensors attached to the bot
     def update_sensor_positions(self):
@@ -156,9 +205,25 @@ class ForagingRobot(Robot):
 
     # step robot
     def step(self, dt):
+        # position at the start of the step (after any correction by the arena), for swept contact below
+        start_x, start_y = self.state[0], self.state[1]
         super().step(dt)  # call Robot's step function. note that the control method (below) gets called from there
+        self.eat(start_x, start_y)
+        self.energies.append(self.energy)
+
+    # consume any consumables the robot reached in the last step. this is separated from the step method so that it
+    # can be overridden, or timed on its own
+    def eat(self, start_x, start_y):
         for consumable in self.consumables:
-            if np.linalg.norm([self.x - consumable.x, self.y - consumable.y]) < consumable.radius+1 and not consumable.depleted:
+            if consumable.depleted:
+                continue
+            # with the arc integrator, steps can be long enough to jump straight over a pellet, so a pellet is reached
+            # if it was touched anywhere along the (chord of the) path over the step, not just at the end of it
+            if self.integrator == 'arc':
+                distance = distance_to_segment(consumable.x, consumable.y, start_x, start_y, self.x, self.y)
+            else:
+                distance = np.hypot(self.x - consumable.x, self.y - consumable.y)
+            if distance < consumable.radius+1:
                 quantity = consumable.consume()
                 if consumable.real_type == Consumables.food:
                     self.energy += quantity
@@ -167,16 +232,21 @@ class ForagingRobot(Robot):
                     self.energy -= quantity
                     self.poisonEaten += 1
                 # print('Energy: ' + str(self.energy))
-        self.energies.append(self.energy)
 
     # this is separated from the step method as it is easier to override in any subclasses of Robot than step, which
     # should be the same for all Robots
     def control(self, dt):
         # update all sensor measurements
-        left_food_activation = self.left_sensor.step(dt)
-        right_food_activation = self.right_sensor.step(dt)
-        left_poison_activation = self.left_poison_sensor.step(dt)
-        right_poison_activation = self.right_poison_sensor.step(dt)
+        if self.left_multi_sensor is not None:
+            left_food_activation, left_poison_activation = self.left_multi_sensor.step(dt)
+        else:
+            left_food_activation = self.left_sensor.step(dt)
+            left_poison_activation = self.left_poison_sensor.step(dt)
+        if self.right_multi_sensor is not None:
+            right_food_activation, right_poison_activation = self.right_multi_sensor.step(dt)
+        else:
+            right_food_activation = self.right_sensor.step(dt)
+            right_poison_activation = self.right_poison_sensor.step(dt)
         energy_activation = self.energy_sensor.step(dt)
 
         # get motor speeds from controller
@@ -184,6 +254,10 @@ class ForagingRobot(Robot):
                                                         left_poison_activation, right_poison_activation,
                                                         energy_activation], dt)
 
+        return self.spend_energy(left_speed, right_speed, dt)
+
+    # use up energy for the step, and get the motor speeds the robot can actually manage
+    def spend_energy(self, left_speed, right_speed, dt):
         # update energy. the faster the robot's wheels turn, the quicker it loses energy
         self.energy -= np.abs(left_speed) * dt * self.decay_rate
         self.energy -= np.abs(right_speed) * dt * self.decay_rate
@@ -196,16 +270,20 @@ class ForagingRobot(Robot):
         else:
             return 0, 0
 
-    def setBehScore(self):
+    def setBehScore(self, dt=0.1):
         """
         Set the robot's behavioral score - used to determine it's novelty score
         List of format [# of velocity spikes, # of acceleration spikes, mean velocity]
+        :param dt: Time step the robot was simulated with
         :return: None
         """
+        # The spike thresholds are changes of 0.2 per step at dt = 0.1, scaled to the same rates of change at other time
+        # steps, so scores from runs with different time steps can be compared
+        threshold = 0.2 * (dt / 0.1)
         y = self.velocities
-        vSpike = (abs(np.diff(y)) > 0.2)
-        dy = np.gradient(y, 0.1)
-        aSpike = (abs(np.diff(dy)) > 0.2)
+        vSpike = (abs(np.diff(y)) > threshold)
+        dy = np.gradient(y, dt)
+        aSpike = (abs(np.diff(dy)) > threshold)
         self.behScore = [vSpike.sum(), aSpike.sum(), np.mean(y)]
 
     # draw robot in the specified matplotlib axes
@@ -233,6 +311,81 @@ class ForagingRobot(Robot):
         self.pygame_draw_fov(self.right_poison_sensor, screen, scale, shiftx, shifty)
 
 
+# evenly spaced angles for a ring of sensors all the way around a robot, symmetric about its heading (so with two
+# sensors, they are at either side, and with four, they are at 45 degrees either side of the front and back)
+def radial_sensor_angles(n):
+    return tuple(float(angle) for angle in np.pi / n + np.linspace(-np.pi, np.pi, n, endpoint=False))
+
+
+# a ForagingRobot with a ring of food sensors and a ring of poison sensors (LightSensorArrays) in place of its pairs of
+# sensors, for evolving controllers with many more inputs. every sensor in each ring is stepped in one go, so adding
+# sensors does not add much to the cost of a step. the controller is given the food activations, then the poison
+# activations, then the energy activation, as one list - so a GeneticController for it should have numInputs set to
+# the number of sensors, and inputMap=None. the pairs of sensors of the ForagingRobot are still there, as Robot is
+# built with them, but are never stepped (they are still drawn)
+class ArrayForagingRobot(ForagingRobot):
+    # construct robot
+    def __init__(self, x, y, controller, food_sources, poison_sources, consumables,
+                 sensor_angles=radial_sensor_angles(8), field_of_view=2 * np.pi,
+                 food_noisemakers=None, poison_noisemakers=None, radius=1, theta=0, occluders=None, **kwargs):
+        self.sensor_angles = sensor_angles
+
+        # construct the arrays first, so they are there when the super constructor positions the sensors
+        self.food_sensor_array = LightSensorArray(light_sources=food_sources, x=x, y=y, angles=sensor_angles,
+                                                  fields_of_view=field_of_view, mount_radius=radius,
+                                                  noisemakers=food_noisemakers, occluders=occluders)
+        self.poison_sensor_array = LightSensorArray(light_sources=poison_sources, x=x, y=y, angles=sensor_angles,
+                                                    fields_of_view=field_of_view, mount_radius=radius,
+                                                    noisemakers=poison_noisemakers, occluders=occluders)
+
+        super().__init__(x=x, y=y, controller=controller,
+                         left_food_sources=food_sources, right_food_sources=food_sources,
+                         left_poison_sources=poison_sources, right_poison_sources=poison_sources,
+                         consumables=consumables, radius=radius, theta=theta,
+                         food_field_of_view=field_of_view, poison_field_of_view=field_of_view, occluders=occluders,
+                         **kwargs)
+
+        self.food_sensor_array.color = 'darkgreen'
+        self.poison_sensor_array.color = self.left_poison_sensor.color
+
+    # reset robot, with its sensor arrays reset first so the super reset can position them
+    def reset(self, x, y, theta=0, controller=None):
+        self.food_sensor_array.reset(x, y, 0)
+        self.poison_sensor_array.reset(x, y, 0)
+        super().reset(x, y, theta, controller)
+
+    # keep the arrays at the centre of the robot, facing the same way as it
+    def update_sensor_positions(self):
+        super().update_sensor_positions()
+        for array in [self.food_sensor_array, self.poison_sensor_array]:
+            array.x = self.state[0]
+            array.y = self.state[1]
+            array.theta = self.thetas[-1]
+
+    # step the arrays and give the controller every activation in one list
+    def control(self, dt):
+        food_activations = self.food_sensor_array.step(dt)
+        poison_activations = self.poison_sensor_array.step(dt)
+        energy_activation = self.energy_sensor.step(dt)
+
+        left_speed, right_speed = self.controller.step(list(food_activations) + list(poison_activations)
+                                                       + [energy_activation], dt)
+
+        return self.spend_energy(left_speed, right_speed, dt)
+
+    # draw robot in the specified matplotlib axes, with its arrays
+    def draw(self, ax):
+        super().draw(ax)
+        self.food_sensor_array.draw(ax)
+        self.poison_sensor_array.draw(ax)
+
+    # draw robot in a pygame display, with its arrays
+    def pygame_draw(self, screen, scale, shiftx, shifty):
+        super().pygame_draw(screen, scale, shiftx, shifty)
+        self.food_sensor_array.pygame_draw(screen, scale, shiftx, shifty)
+        self.poison_sensor_array.pygame_draw(screen, scale, shiftx, shifty)
+
+
 # using an enum probably makes less sense in Python than it does in some other languages, as Python allows you to do
 # pretty much anything you like to a variable, at any time you like, but the general idea is to use an enum to define
 # and stick to a finite and constant set of values
@@ -263,6 +416,7 @@ class Consumable(System):
 
         self.time_since_consumed = 0        # used to track time to recover
         self.radius = radius                # this is the radius within which a HungryRobot will consume it
+        self.scheduler = None               # RecoveryScheduler told when it's consumed, if it isn't being stepped
 
         # conceptually, a consumable has a real and an apparent type. the apparent type is what it "looks" like, but the
         # real_type determines the effect it has. In the current implementation, apparent_type is unused, as it is the
@@ -271,6 +425,16 @@ class Consumable(System):
         self.apparent_type = apparent_type
         self.real_type = real_type
 
+    # put the consumable back at the start of a run, undepleted and with its records cleared. it (and its LightSource)
+    # can be moved to a new position at the same time
+    def reset(self, x=None, y=None):
+        super().reset(x, y)
+        self.stimulus.reset(x, y)
+        self.stimulus.is_on = True
+        self.depleted = False
+        self.time_since_consumed = 0
+        self.scheduler = None
+
     # step consumable. Consumables are stepped in order to implement recovery from depletion
     def step(self, dt):
         super().step(dt)  # call System step method, to allow for the possibility that a Consumable will move
@@ -289,6 +453,8 @@ class Consumable(System):
             self.depleted = True            # set to depleted
             self.stimulus.is_on = False     # turn LightSource off, to make the Consumable invisible
             self.time_since_consumed = 0
+            if self.scheduler is not None:  # let the scheduler know when to recover it
+                self.scheduler.schedule(self)
             return self.quantity
 
     # draw consumable in the specified matplotlib axes
@@ -316,3 +482,64 @@ class Consumable(System):
             width = 2
         pygame.draw.circle(screen, center=(scale * self.x + shiftx, scale * self.y + shifty), color=self.color,
                            width=width, radius=scale * self.radius)
+
+
+# Recovers depleted Consumables at exactly the step stepping them would have, without stepping them. Consumables tell
+# the scheduler when they're consumed, and their recovery steps are kept in a priority queue - so each step only the
+# consumables due to recover are touched, and ones that are never eaten are never touched at all. Static consumables
+# only - ones that move still need stepping. Consumables that are waiting to recover don't update time_since_consumed
+# until they do recover
+class RecoveryScheduler:
+
+    # construct scheduler, and attach it to the consumables. any that are already depleted are carried on from where
+    # they were
+    def __init__(self, consumables, dt):
+        self.consumables = list(consumables)
+        self.dt = dt
+        self.steps = 0          # number of steps taken so far
+        self.queue = []         # heap of [step due to recover, order scheduled, consumable, time_since_consumed then]
+        self.scheduled = 0      # number of recoveries scheduled, so ties are recovered in the order they were eaten
+        self.delays = {}        # steps to recover from fresh depletion, for each recovery time
+        for consumable in self.consumables:
+            consumable.scheduler = self
+            if consumable.depleted:
+                self.schedule(consumable, consumable.time_since_consumed)
+
+    # work out how many steps a consumable takes to recover, adding up dt exactly as Consumable.step does, so the
+    # rounding (and so the step it recovers on) is the same
+    def recovery_steps(self, recovery_time, elapsed=0):
+        steps = 0
+        while elapsed < recovery_time:
+            elapsed += self.dt
+            steps += 1
+        return steps, elapsed
+
+    # called by a consumable when it's consumed, during the robots' part of a step
+    def schedule(self, consumable, elapsed=0):
+        if elapsed == 0:
+            if consumable.recovery_time not in self.delays:
+                self.delays[consumable.recovery_time] = self.recovery_steps(consumable.recovery_time)
+            steps, elapsed = self.delays[consumable.recovery_time]
+        else:
+            steps, elapsed = self.recovery_steps(consumable.recovery_time, elapsed)
+        heapq.heappush(self.queue, [self.steps + steps, self.scheduled, consumable, elapsed])
+        self.scheduled += 1
+
+    # step scheduler - called in place of stepping every consumable, after the robots have been stepped. dt must be
+    # the one the scheduler was made with (it's only taken so the scheduler can be stepped like anything else)
+    def step(self, dt):
+        while self.queue and self.queue[0][0] <= self.steps:
+            _, _, consumable, elapsed = heapq.heappop(self.queue)
+            consumable.depleted = False                 # replenish consumable
+            consumable.stimulus.is_on = True            # make consumable detectable again
+            consumable.time_since_consumed = elapsed
+        self.steps += 1
+
+    # detach scheduler from the consumables, so they can be stepped (or copied) on their own again. consumables still
+    # waiting to recover get the time_since_consumed they would have had from stepping (to within rounding)
+    def close(self):
+        for due, _, consumable, elapsed in self.queue:
+            consumable.time_since_consumed = elapsed - (due - self.steps) * self.dt
+        for consumable in self.consumables:
+            consumable.scheduler = None
+        self.queue = []
@@ -61,10 +61,21 @@ class Node:
 
 class GeneticController(Controller):
     """
-    A single genotype - takes 3 inputs, has a bunch of nodes connected up, then gives two outputs (motor speeds)
+    A single genotype - takes 3 inputs (or more, for robots with sensor arrays), has a bunch of nodes connected up, then gives two outputs (motor speeds)
     """
 
-    def __init__(self, gain=1, left_noisemaker=None, right_noisemaker=None):
+    def __init__(self, gain=1, left_noisemaker=None, right_noisemaker=None, rng=None, numInputs=2,
+                 inputMap=(0, 1, 4)):
+        """
+        Constructor method
+        :param gain: Gain parameter - determines how fast the robot moves
+        :param left_noisemaker: Noise source applied to the left motor command
+        :param right_noisemaker: Noise source applied to the right motor command
+        :param rng: np.random.Generator used to build the random graph (fresh entropy if None)
+        :param numInputs: Number of inputs the graph's nodes can connect to (the first numInputs of the mapped inputs)
+        :param inputMap: Which of the robot's sensor inputs are passed to the graph, in order (None for all of them,
+        e.g. for an ArrayForagingRobot)
+        """
         super().__init__(left_noisemaker, right_noisemaker)
 
         self.gain = gain                        # the gain parameter determines how fast the robot moves
@@ -72,7 +83,8 @@ class GeneticController(Controller):
         self.functionTable = functionTable      # Table of functions that can be set for each node
         self.weightMin = -1                     # Min weight for each input
         self.weightMax = 1                      # Max weight for each input
-        self.numInputs = 2                      # Set the number of inputs - currently 5 - v, g, h, vr, and hr
+        self.numInputs = numInputs              # Set the number of inputs the nodes can connect to
+        self.inputMap = inputMap                # Indices of the sensor inputs passed to the graph (None for all)
         self.numOutputs = 2                     # Set the number of outputs for the graph
         self.numNodes = st.N_COLS               # Set the number of nodes for each genotype
         self.nodes = []                         # Initialize empty list to hold all the node objects
@@ -84,13 +96,14 @@ class GeneticController(Controller):
         self.activeNodesDetermined = False      # Tells whether the active nodes have been found
         self.activeNodes = 0                    # Number of nodes active for individual
 
-        self.createNodes()                      # Call function to create all the nodes and link them
+        self.createNodes(rng)                   # Call function to create all the nodes and link them
 
     def step(self, inputs, dt):
         """
         Step the controller - used to control robot's
         speed and direction
-        :param inputs: List of 5 available inputs, as shown below
+        :param inputs: List of available inputs - for a ForagingRobot the 5 shown below, for an
+        ArrayForagingRobot every food sensor, every poison sensor, then energy
         :param dt: Time step
         :return: The left and right speed commands (via the base controller step method)
         """
@@ -100,29 +113,34 @@ class GeneticController(Controller):
         # inputs[3] = right_poison_activation
         # inputs[4] = energy_activation
 
-        # We only use inputs 1, 2, and 4 because poison is not used in any of our scenarios
-        self.left_speed_command, self.right_speed_command = self.eval(inputs[0], inputs[1], inputs[4])
+        # By default we only use inputs 1, 2, and 4 because poison is not used in any of our scenarios
+        if self.inputMap is not None:
+            inputs = [inputs[i] for i in self.inputMap]
+        self.left_speed_command, self.right_speed_command = self.eval(*inputs)
 
         return super().step(inputs, dt)
 
-    def createNodes(self):
+    def createNodes(self, rng=None):
         """
         Create each node and connect it to
         the required number of inputs
+        :param rng: np.random.Generator to draw functions, connections and weights from (fresh entropy if None)
         :return: none
         """
+        rng = np.random.default_rng(rng)
+
         for nodeIndex in range(self.numNodes):
             node = Node()  # Create an instance of the node class
             self.nodes.append(node)  # Append the new node to the list of nodes
 
             # Randomly choose what function the node is (i.e., addition, multiplication, etc.)
-            node.functionIndex = random.randint(0, len(self.functionTable) - 1)
+            node.functionIndex = int(rng.integers(0, len(self.functionTable)))
 
             # Randomly set weights and input nodes for this node (iterates through each input)
             for y in range(self.functionTable[node.functionIndex].arity):
                 # Note, this line would need to be changed if self.levelsBack != self.numNodes
-                node.inputIndices.append(random.randint(0 - self.numInputs, nodeIndex - 1))
-                node.inputWeights.append(random.uniform(self.weightMin, self.weightMax))
+                node.inputIndices.append(int(rng.integers(0 - self.numInputs, nodeIndex)))
+                node.inputWeights.append(rng.uniform(self.weightMin, self.weightMax))
 
         # Set all the output nodes (last x number in the list of nodes) to active
         for x in range(1, self.numOutputs + 1):
@@ -181,20 +199,23 @@ class GeneticController(Controller):
         # Return the final output values
         return self.nodes[-1].output, self.nodes[-2].output
 
-    def mutate(self, mutRate):
+    def mutate(self, mutRate, rng=None):
         """
         Create children from parents through mutation
         :param mutRate: Mutation rate (value from 0 to 1)
+        :param rng: np.random.Generator the mutations are drawn from (fresh entropy if None)
         :return: a new Individual object
         """
+        rng = np.random.default_rng(rng)
+
         # Creates a child genotype to be mutated, leaving the parent genotype untouched
         child = copy.deepcopy(self)
 
         # Iterates through every node
         for node in child.nodes:
             # If randomly chosen to mutate, randomly choose a new function (math operator) for the node
-            if random.random() < mutRate:
-                node.functionIndex = random.randint(0, len(child.functionTable) - 1)
+            if rng.random() < mutRate:
+                node.functionIndex = int(rng.integers(0, len(child.functionTable)))
 
             # Grab old weight/input values and then clear them - done to allow list re-sizing in case the new
             # function has a different arity than the old function
@@ -206,18 +227,18 @@ class GeneticController(Controller):
             # Iterate through every input to see if it will mutate
             for inputIndex in reversed(range(child.functionTable[node.functionIndex].arity)):
                 # If randomly chosen to mutate, append the new index value
-                if random.random() < mutRate:
-                    node.inputIndices.append(random.randint(0 - child.numInputs, child.nodes.index(node) - 1))
+                if rng.random() < mutRate:
+                    node.inputIndices.append(int(rng.integers(0 - child.numInputs, child.nodes.index(node))))
                     # Try except used to keep the same weights if possible, or add a new one if the previous
                     # arity was only one and a new function is chosen with an arity of two
                     try:
                         node.inputWeights.append(oldWeightIndices[inputIndex])
                     except IndexError:
-                        node.inputWeights.append(random.uniform(self.weightMin, self.weightMax))
+                        node.inputWeights.append(rng.uniform(self.weightMin, self.weightMax))
                 # If the new function takes more inputs than the old function, append new random inputs/weights
                 elif inputIndex > len(node.inputIndices):
-                    node.inputIndices.append(random.randint(0 - child.numInputs, child.nodes.index(node) - 1))
-                    node.inputWeights.append(random.uniform(child.weightMin, child.weightMax))
+                    node.inputIndices.append(int(rng.integers(0 - child.numInputs, child.nodes.index(node))))
+                    node.inputWeights.append(rng.uniform(child.weightMin, child.weightMax))
                 # If the input index isn't mutated and an input already exists, put it and the weight back where it was
                 else:
                     node.inputIndices.append(oldInputIndices[inputIndex])
@@ -236,30 +257,75 @@ class GeneticController(Controller):
 
         return child
 
+    def getGenome(self):
+        """
+        Get the genotype as plain arrays - everything needed to rebuild a controller
+        that behaves identically (see fromGenome), without any of its histories
+        :return: Dictionary of gain, numInputs, inputMap, functions (index of each node's function), inputs and weights (one row
+        per node, padded with zeros for nodes with only one input)
+        """
+        inputs = np.zeros((len(self.nodes), 2), dtype=np.int16)
+        weights = np.zeros((len(self.nodes), 2))
+        for i, node in enumerate(self.nodes):
+            inputs[i, :len(node.inputIndices)] = node.inputIndices
+            weights[i, :len(node.inputWeights)] = node.inputWeights
+        return {'gain': self.gain, 'numInputs': self.numInputs, 'inputMap': self.inputMap,
+                'functions': np.array([node.functionIndex for node in self.nodes], dtype=np.int8),
+                'inputs': inputs, 'weights': weights}
+
 
-def createPopulation(popSize):
+def fromGenome(genome):
+    """
+    Build a fresh controller from a genotype saved by getGenome
+    :param genome: Dictionary returned by GeneticController.getGenome
+    :return: GeneticController object
+    """
+    controller = GeneticController(gain=genome['gain'], rng=0, numInputs=genome['numInputs'],
+                                   inputMap=genome.get('inputMap', (0, 1, 4)))
+    controller.numNodes = len(genome['functions'])
+    controller.nodes = []
+    for functionIndex, inputs, weights in zip(genome['functions'], genome['inputs'], genome['weights']):
+        node = Node()
+        node.functionIndex = int(functionIndex)
+        arity = controller.functionTable[node.functionIndex].arity
+        node.inputIndices = [int(x) for x in inputs[:arity]]
+        node.inputWeights = [float(x) for x in weights[:arity]]
+        controller.nodes.append(node)
+
+    # Set all the output nodes (last x number in the list of nodes) to active
+    for x in range(1, controller.numOutputs + 1):
+        controller.nodes[-x].active = True
+    return controller
+
+
+def createPopulation(popSize, rng=None, numInputs=2, inputMap=(0, 1, 4)):
     """
     Create a new population, randomly generated within given parameters
     :param popSize: Number of individuals in the population
+    :param rng: np.random.Generator the population is drawn from (fresh entropy if None)
+    :param numInputs: Number of inputs of every controller's graph (see GeneticController)
+    :param inputMap: Which of the robot's sensor inputs are passed to the graphs (see GeneticController)
     :return: List of Individual objects
     """
-    return [GeneticController() for _ in range(popSize)]
+    rng = np.random.default_rng(rng)
+    return [GeneticController(rng=rng, numInputs=numInputs, inputMap=inputMap) for _ in range(popSize)]
 
 
 def calculateAvgActiveNodes(population):
     """
     Calculate the average number of active nodes
     for a given population of individuals
-    :param population: list of Individual objects
+    :param population: list of Individual objects (or anything with an activeNodes attribute, e.g. EvaluationSummary)
     :return: average number of active nodes
     """
     listActiveNodes = [individual.activeNodes for individual in population]
     return np.mean(listActiveNodes)
 
 
-def evolve(pop, robots, mutRate, numParents, numChildren, novelty=True):
+def evolve(pop, robots, mutRate, numParents, numChildren, novelty=True, rng=None):
     """
     Evolve the entire population for a new generation
+    :param rng: np.random.Generator for choosing parents and mutating them (fresh entropy if None)
     :param robots: List of robots for which the controllers were used - used to see if any were decent
     :param novelty: Whether or not novelty search is turned on (determines which individuals produce offspring)
     :param pop: List of individuals from the previous generation
@@ -269,6 +335,8 @@ def evolve(pop, robots, mutRate, numParents, numChildren, novelty=True):
     :return: list of new population
     """
 
+    rng = np.random.default_rng(rng)
+
     if novelty:
         # Sort population by novelty
         pop0 = sorted(pop, key=lambda genotype: genotype.novelty)
@@ -281,7 +349,7 @@ def evolve(pop, robots, mutRate, numParents, numChildren, novelty=True):
     goodBots = [robot for robot in robots if robot.foodEaten > 3]
     if len(goodBots) == 0:
         mutRate = 0.5
-        parents = random.choices(pop, k=numParents)
+        parents = [pop[i] for i in rng.integers(0, len(pop), numParents)]
         for x in pop:
             del x
     # If there's at least one decent bot, proceed normally
@@ -294,7 +362,7 @@ def evolve(pop, robots, mutRate, numParents, numChildren, novelty=True):
 
     # Pick a parent at random and add their mutated genotype to the list of children
     for _ in range(numChildren):
-        parent = random.choice(parents)
-        children.append(parent.mutate(mutRate))
+        parent = parents[rng.integers(0, len(parents))]
+        children.append(parent.mutate(mutRate, rng))
 
     return children     # Return all the children as the new population
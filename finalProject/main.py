@@ -1,7 +1,6 @@
 import copy
 import sys
 
-import pygameFunctions as pf
 import pelletGenerator as pg
 import foragingRobot as fr
 import novelty as nv
@@ -9,6 +8,17 @@ import geneticController as gc
 import settings as st
 import postprocessing as pp
 import olympicEvents as oe
+import figureExport as fe
+import resultsStore as rs
+import stageTimers as stm
+import memoryAccounting as ma
+import runHistory as rh
+import trajectoryArchive as ta
+import densityPlots as dp
+import occupancy as oc
+import responseMaps as rm
+import simLoop as sl
+import simulationContext as sc
 
 sys.path.insert(1, '..')
 from situsim_extensions.arena import *
@@ -16,12 +26,23 @@ from situsim_extensions.arena import *
 
 # Runs the entirety of each simulation once - launched from run_sim
 def runSimOnce(screen_width, controller, animate=True, field_of_view=0.8 * np.pi, left_sensor_angle=np.pi / 3,
-               right_sensor_angle=-np.pi / 3, duration=100, generation=0, novelty=False, seed=42):
+               right_sensor_angle=-np.pi / 3, duration=100, generation=0, novelty=False, seed=42, dt=0.1,
+               integrator='euler', timers=None, probes=(), responseMaps=False, sensorAngles=None, context=None):
     """
     Run the simulation once - in this main loop,
     for only one robot at a time as we evolve populations
     to forage successfully
     :param seed: Random seed for pellet generation
+    :param dt: Time step of the simulation
+    :param integrator: 'euler', or 'arc' for exact arcs and swept pellet contact (accurate at larger dt)
+    :param timers: StageTimers to add the time of every stage of the simulation to (None for no timing)
+    :param probes: List of probes.Probe objects to watch the simulation
+    :param responseMaps: Whether the robot's light sensors look their activations up from precomputed response maps
+    (cached on disk in RESPONSE_MAP_DIR) instead of adding up every pellet - approximate, see responseMaps.py
+    :param sensorAngles: Angles of a ring of sensors for an ArrayForagingRobot (None for a ForagingRobot with the
+    usual pair of sensors at left_sensor_angle and right_sensor_angle)
+    :param context: SimulationContext to reset and run in, instead of building everything again (None for a new one) -
+    it must have been built with the same sensors, integrator and response maps
     :param screen_width: Obviously - the width of the screen
     :param controller: Controller object to put in robot - this is what we're evolving
     :param animate: Boolean to animate simulation
@@ -34,83 +55,22 @@ def runSimOnce(screen_width, controller, animate=True, field_of_view=0.8 * np.pi
     :return: List of time steps, list of agents, list of pellets
     """
 
-    # Set robot's starting position and angle
-    x = -12
-    y = 0
-    theta = 0
-
-    # Create a random set of 25 food pellets in a centered, 10x10 space in the arena
-    # (using a random seed to maintain consistency in training)
-    foodPellets, poisonPellets, allPellets = pg.generateRandomPellets(25, 0, 10, seed=seed)
-
-    # Create a foragingRobot object with the appropriate parameters
-    robot = fr.ForagingRobot(x=x, y=y, controller=controller, left_food_sources=foodPellets,
-                             right_food_sources=foodPellets, left_poison_sources=poisonPellets,
-                             right_poison_sources=poisonPellets,
-                             left_food_sensor_angle=left_sensor_angle,
-                             right_food_sensor_angle=right_sensor_angle,
-                             left_poison_sensor_angle=left_sensor_angle,
-                             right_poison_sensor_angle=right_sensor_angle,
-                             food_field_of_view=field_of_view, poison_field_of_view=field_of_view,
-                             consumables=allPellets, theta=theta, novelty=novelty
-                             )
-    # Set the controller's novelty - I don't love how this is done, but it works and its fragile now
-    robot.controller.nov = novelty
-    robot.generation = generation       # Set what generation the robot is
-    agents = [robot]                    # Put robot in a list of agents (uses a list to make easily expandable)
-
-    # Create an arena so the robot is confined to the space
-    arena = Arena(agents, x_left=-20, x_right=20, y_top=20, y_bottom=-20)
-
-    # only run pygame code if animating the simulation
-    if animate:
-        screen = pf.setup_pygame_window(screen_width)
-
-    # animation variables
-    delay = 0           # can be used to slow animation down
-    running = True      # can be used to exit animation early
-    paused = False      # can be used to pause simulation/animation
-
-    # prepare simulation time variables
-    t = 0
-    ts = [t]
-    dt = 0.1
-
-    # begin simulation main loop
-    while t < duration and running:
-
-        # only move simulation forwards in time if not paused
-        if not paused:
-
-            # step all robots
-            for agent in agents:
-                agent.step(dt)
-
-            # Step all consumable pellets
-            for pellet in allPellets:
-                pellet.step(dt)
-
-            arena.step(dt)      # Step arena (needed in case robot hits the wall)
-
-            # increment time variable and store in ts list for plotting later
-            t += dt
-            ts.append(t)
-
-        # only run pygame code if animating the simulation
-        if animate:
-            running, paused, delay = pf.pygame_drawsim(screen, agents + allPellets + [arena], screen_width, paused,
-                                                       delay)
-    # simulation has completed
-
-    # only run pygame code if animating the simulation
-    if animate:
-        # Quit pygame.
-        pygame.display.quit()
-        pygame.quit()
+    # Build the robot, pellets and arena for this run, unless a context they can be reset in is given
+    scenario = dict(field_of_view=field_of_view, left_sensor_angle=left_sensor_angle,
+                    right_sensor_angle=right_sensor_angle, integrator=integrator, responseMaps=responseMaps,
+                    sensorAngles=sensorAngles)
+    if context is None:
+        context = sc.SimulationContext(seed=seed, **scenario)
+    elif not context.matches(**scenario):
+        raise ValueError("The simulation context was built for a different set up")
+    agents, allPellets, arena = context.reset(controller, seed, generation, novelty)
+
+    # Run the simulation main loop (shared with the olympic events)
+    ts = sl.runLoop(agents, allPellets, arena, duration, dt, animate, screen_width, probes, timers)
 
     # For the robot, set its behavioral score and fitness score then print relevant values to the terminal
     for robot in agents:
-        robot.setBehScore()
+        robot.setBehScore(dt)
         robot.controller.fitness = robot.foodEaten
         print("Score:", (robot.behScore[0], robot.behScore[1], round(robot.behScore[2], 2)), "Foods:", robot.foodEaten,
               "Energy:", round(robot.energy, 2), "Novelty:", novelty)
@@ -119,10 +79,15 @@ def runSimOnce(screen_width, controller, animate=True, field_of_view=0.8 * np.pi
 
 
 # Main function that actually popSize all the other stuff
-def runSim(popSize=1, animate=True, numGoodNovBots=10, numGoodFitBots=10, foodThresh=10):
+def runSim(popSize=1, animate=True, numGoodNovBots=10, numGoodFitBots=10, foodThresh=10, exporter=None, store=None,
+           seed=None):
     """
     Main entry point for the entire program, launches the initial simulation
     to begin evolving the population of robots
+    :param seed: Master seed for the whole run (evolution, novelty archive, re-runs and olympics) - if None, a fresh
+    one is drawn and printed so the run can be repeated
+    :param store: ResultsStore every generation's (and event's) scores are recorded in - defaults to RESULTS_DIR
+    :param exporter: FigureExporter to save all the plots to files in the background - if None, plots are shown
     :param foodThresh: How many food pieces a robot has to eat to be considered good
     :param numGoodFitBots: How many good fitness robots you want to compete in the olympics
     :param numGoodNovBots: How many good novelty robots you want to compete in the olympics
@@ -130,14 +95,36 @@ def runSim(popSize=1, animate=True, numGoodNovBots=10, numGoodFitBots=10, foodTh
     :param animate: Whether or not to animate the simulation
     :return: None
     """
-    all_robots = []     # A list to hold all of the robots (for postprocessing)
-    all_ts = []         # A list to hold all time steps (for postprocessing)
+    if store is None:
+        store = rs.ResultsStore(st.RESULTS_DIR)
+
+    # Every random draw in the run comes from streams spawned off one master seed, so a run can be repeated exactly
+    master = np.random.SeedSequence(seed)
+    print("Master seed:", master.entropy)
+    populationSeq, trainingSeq, olympicSeq = master.spawn(3)
+
+    # Only a compact summary of each robot is kept for postprocessing - a generation's robots (with their trajectories)
+    # are let go once it's finished, so memory stays flat however many generations it takes
+    all_robots = []     # A list to hold an EvaluationSummary of every robot
+
+    # With SENSOR_ARRAY, the robots have a ring of that many food (and poison) sensors instead of the usual pair, and
+    # their controllers take an input from every food sensor
+    sensorAngles = None
+    controllerInputs = {}
+    if st.SENSOR_ARRAY:
+        sensorAngles = fr.radial_sensor_angles(st.SENSOR_ARRAY)
+        controllerInputs = dict(numInputs=st.SENSOR_ARRAY, inputMap=None)
 
     # Initialize the starting population of robots - each are gp.Individual() objects
-    population = gc.createPopulation(popSize)
+    population = gc.createPopulation(popSize, np.random.default_rng(populationSeq), **controllerInputs)
     originalPop = population
     # Create a novelty object - does the novelty score calculations and stores the novelty archive
     novelty = nv.Novelty()
+    # Full trajectories are only kept if asked for, in an archive on disk
+    archive = None
+    if st.TRAJECTORY_DIR is not None:
+        archive = ta.TrajectoryArchive(st.TRAJECTORY_DIR, dtype=st.TRAJECTORY_DTYPE, delta=st.TRAJECTORY_DELTA)
+    memoryCache = {}        # Sizes of finished summaries, so memory accounting only walks each one once
 
     goodBots = []           # Instantiate list to hold all the robots
     nov = True              # Whether or not the population of robots is being judged on fitness or novelty
@@ -148,12 +135,52 @@ def runSim(popSize=1, animate=True, numGoodNovBots=10, numGoodFitBots=10, foodTh
     left_sensor_angle = np.pi / 3       # Set left and right sensor locations on the robot
     right_sensor_angle = -np.pi / 3
     duration = 100                      # Set the duration of the simulation
+    trainingSeed = 42                   # Seed of the pellet layout every robot is trained on
+
+    # Everything a training simulation is set up with besides the controller - kept with every robot's summary so it
+    # can be replayed exactly (see replay.py)
+    scenario = dict(field_of_view=field_of_view, left_sensor_angle=left_sensor_angle,
+                    right_sensor_angle=right_sensor_angle, duration=duration, seed=trainingSeed, dt=st.DT,
+                    integrator=st.INTEGRATOR, responseMaps=st.RESPONSE_MAPS, sensorAngles=sensorAngles)
+
+    # With REUSE_CONTEXTS, each place in the population has its own robot, pellets and arena, reset for every run
+    # instead of built again - one per place rather than one for all, as a generation's robots are all kept until it
+    # has been evolved. The re-runs of good bots share one more, whose pellets are moved to each re-run's layout
+    contextScenario = dict(field_of_view=field_of_view, left_sensor_angle=left_sensor_angle,
+                           right_sensor_angle=right_sensor_angle, seed=trainingSeed, integrator=st.INTEGRATOR,
+                           responseMaps=st.RESPONSE_MAPS, sensorAngles=sensorAngles)
+    contexts = [None] * popSize
+    rerunContext = None
+    if st.REUSE_CONTEXTS:
+        contexts = [sc.SimulationContext(**contextScenario) for _ in range(popSize)]
+        rerunContext = sc.SimulationContext(**dict(contextScenario, responseMaps=False))
+
+    # With huge runs the phase spaces are plotted as densities, from grids added to as each generation finishes
+    densities = {}
+    if st.PHASE_SPACE_DENSITY:
+        edges = dp.behaviorEdges(duration, st.DT, st.PHASE_SPACE_BINS)
+        densities = {title: dp.PhaseSpaceDensity(*edges) for title in ["All Novelty Robots", "All Fitness Robots",
+                                                                        "\nAdapted Novelty Robots",
+                                                                        "\nAdapted Fitness Robots"]}
+
+    # Where the robots spend their time, binned into a grid over the arena as each training run finishes
+    trainingProbes = []
+    occupancy = None
+    if st.OCCUPANCY:
+        occupancy = oc.OccupancyGrid(cells=st.OCCUPANCY_CELLS, window=st.OCCUPANCY_WINDOW)
+        trainingProbes.append(oc.OccupancyProbe(occupancy))
 
     # Test/evolve the population of robots to forage until goToOlympics is True
     while goToOlympics is False:
         print("GENERATION", g)
         g += 1              # Increment generation
         genRobots = []      # Create/reset an empty list to hold just this generation of robots
+        timers = stm.StageTimers() if st.STAGE_TIMERS else None     # Times each stage of this generation's runs
+
+        # Streams for this generation are keyed on the generation number, so generation g always gets the same
+        # numbers for a given master seed
+        genSeq = np.random.SeedSequence(trainingSeq.entropy, spawn_key=trainingSeq.spawn_key + (g,))
+        evolveRng, archiveRng, rerunRng = [np.random.default_rng(x) for x in genSeq.spawn(3)]
 
         # run the simulation the specified number of times - goes through each bot in the population once
         for i in range(popSize):
@@ -168,19 +195,35 @@ def runSim(popSize=1, animate=True, numGoodNovBots=10, numGoodFitBots=10, foodTh
             ts, robots, pellets = runSimOnce(screen_width=700, controller=controller, animate=animate,
                                              field_of_view=field_of_view, left_sensor_angle=left_sensor_angle,
                                              right_sensor_angle=right_sensor_angle, duration=duration,
-                                             generation=g, novelty=nov)
+                                             generation=g, novelty=nov, seed=trainingSeed, dt=st.DT,
+                                             integrator=st.INTEGRATOR, timers=timers, probes=trainingProbes,
+                                             responseMaps=st.RESPONSE_MAPS, sensorAngles=sensorAngles,
+                                             context=contexts[i])
 
             genRobots += robots     # Add the new robot(s) to the list of this generation of robots
-            all_robots += robots    # Add the new robot(s) to the list of all robots for the whole experiment
-            all_ts.append(ts)
+            # Add a summary of the new robot(s) to the list of all robots for the whole experiment
+            all_robots += [rh.EvaluationSummary(robot, scenario) for robot in robots]
+            if archive is not None:
+                for robot in robots:
+                    archive.append(robot, ts)
 
         # Do the novelty evaluation on this generation of robots
-        novelty.getNoveltyScores(genRobots, g)
+        novelty.getNoveltyScores(genRobots, g, archiveRng)
+
+        # Record the generation's scores in the results store as the run goes
+        pp.recordEvent(store, st.RUN_NUMBER, 'training', genRobots, generation=g, dt=st.DT)
+
+        # Add the generation to the phase space densities (every robot in a generation has the same novelty)
+        if densities:
+            adapted = [robot for robot in genRobots if robot.foodEaten >= 10]
+            kind = "Novelty" if nov else "Fitness"
+            densities[f"All {kind} Robots"].add(genRobots)
+            densities[f"\nAdapted {kind} Robots"].add(adapted)
 
         # Evolve the population of controllers using the old population and given parameters
         # Note that an entire population is either evolved on the basis of novelty or fitness
         population = gc.evolve(pop=population, robots=genRobots, mutRate=st.MUT_PB, numParents=st.MU,
-                               numChildren=st.LAMBDA, novelty=nov)
+                               numChildren=st.LAMBDA, novelty=nov, rng=evolveRng)
 
         # After evolving the current generation, check if any of them are ready for the olympics
         for robot in genRobots:
@@ -191,7 +234,9 @@ def runSim(popSize=1, animate=True, numGoodNovBots=10, numGoodFitBots=10, foodTh
                 _, newRobot, _ = runSimOnce(screen_width=700, controller=robot.controller, animate=animate,
                                             field_of_view=field_of_view, left_sensor_angle=left_sensor_angle,
                                             right_sensor_angle=right_sensor_angle, duration=duration,
-                                            generation=g, novelty=nov, seed=random.randint(1, 500000))
+                                            generation=g, novelty=nov, seed=int(rerunRng.integers(1, 500001)),
+                                            dt=st.DT, integrator=st.INTEGRATOR, sensorAngles=sensorAngles,
+                                            context=rerunContext)
                 # If a new robot with the same controller succeeds again, add a copy of the controller to the list of
                 # goodBots and reset it (method in base class) to wipe its memory
                 if newRobot[0].foodEaten >= foodThresh:
@@ -199,6 +244,12 @@ def runSim(popSize=1, animate=True, numGoodNovBots=10, numGoodFitBots=10, foodTh
                     goodBots[-1].reset()
 
         print("Number of good bots:", len(goodBots))
+        if timers is not None:
+            timers.report(f"Stage timings, generation {g}")
+        if st.MEMORY_ACCOUNTING:
+            usage = ma.accountMemory(all_robots, population, novelty, goodBots, memoryCache)
+            ma.reportMemory(usage, g)
+            ma.checkBudget(usage, st.MEMORY_BUDGET)
 
         # If the number of novelty bots for the olympic team has been reached, begin fitness search with a new,
         # randomly generated population
@@ -216,25 +267,59 @@ def runSim(popSize=1, animate=True, numGoodNovBots=10, numGoodFitBots=10, foodTh
     goodNovBots = [x for x in novBots if x.foodEaten >= 10]
     goodFitBots = [x for x in fitBots if x.foodEaten >= 10]
 
-    print("Mean active nodes for novBots:", gc.calculateAvgActiveNodes([x.controller for x in novBots]), "Good nov bots:", gc.calculateAvgActiveNodes([x.controller for x in goodNovBots]),
-          "fitBots:", gc.calculateAvgActiveNodes([x.controller for x in fitBots]), "Good fit bots:", gc.calculateAvgActiveNodes([x.controller for x in goodFitBots]))
-
-    # Plot the 2D and 3D phase spaces of all the bots
-    pp.plotPhaseSpace(novBots, "All Novelty Robots")
-    pp.plotPhaseSpace(fitBots, "All Fitness Robots")
-    pp.plotPhaseSpace(goodNovBots, "\nAdapted Novelty Robots")
-    pp.plotPhaseSpace(goodFitBots, "\nAdapted Fitness Robots")
-    plt.show()
+    print("Mean active nodes for novBots:", gc.calculateAvgActiveNodes(novBots), "Good nov bots:", gc.calculateAvgActiveNodes(goodNovBots),
+          "fitBots:", gc.calculateAvgActiveNodes(fitBots), "Good fit bots:", gc.calculateAvgActiveNodes(goodFitBots))
+
+    # Plot the 2D and 3D phase spaces of all the bots (in the background if exporting, so the olympics can start)
+    if densities:
+        for title, density in densities.items():
+            if exporter is not None:
+                exporter.submit("phaseSpace", dp.plotPhaseSpaceDensity, density, title)
+            else:
+                dp.plotPhaseSpaceDensity(density, title)
+        if exporter is None:
+            plt.show()
+    elif exporter is not None:
+        exporter.submit("phaseSpace", pp.plotPhaseSpace, novBots, "All Novelty Robots")
+        exporter.submit("phaseSpace", pp.plotPhaseSpace, fitBots, "All Fitness Robots")
+        exporter.submit("phaseSpace", pp.plotPhaseSpace, goodNovBots, "\nAdapted Novelty Robots")
+        exporter.submit("phaseSpace", pp.plotPhaseSpace, goodFitBots, "\nAdapted Fitness Robots")
+    else:
+        pp.plotPhaseSpace(novBots, "All Novelty Robots")
+        pp.plotPhaseSpace(fitBots, "All Fitness Robots")
+        pp.plotPhaseSpace(goodNovBots, "\nAdapted Novelty Robots")
+        pp.plotPhaseSpace(goodFitBots, "\nAdapted Fitness Robots")
+        plt.show()
     # pp.plot3DSpace(novBots)
     # pp.plot3DSpace(fitBots)
     # pp.plot3DSpace(goodNovBots)
     # pp.plot3DSpace(goodFitBots)
 
+    if occupancy is not None:
+        if exporter is not None:
+            exporter.submit("occupancy", oc.plotOccupancy, occupancy, "Where the Training Robots Went")
+        else:
+            oc.plotOccupancy(occupancy, "Where the Training Robots Went")
+            plt.show()
+
+    # The olympic events are built around the pair of sensors (moving them, cutting them off...), so robots with sensor
+    # arrays don't compete
+    if sensorAngles is not None:
+        print("Robots with sensor arrays don't compete in the olympics")
+        return
+
     # BEGIN THE OLYMPICS!!!
-    oe.runEvents(goodBots, field_of_view, left_sensor_angle, right_sensor_angle, duration)
+    oe.runEvents(goodBots, field_of_view, left_sensor_angle, right_sensor_angle, duration, exporter=exporter,
+                 store=store, seed=olympicSeq, dt=st.DT, integrator=st.INTEGRATOR, occlusion=st.OCCLUSION)
 
 
 # Run the simulation
 if __name__ == "__main__":
+    # In headless mode every figure is saved to file by background processes instead of being shown
+    figExporter = fe.FigureExporter(st.FIGURE_DIR) if st.HEADLESS else None
+
     runSim(popSize=20, animate=False, numGoodNovBots=st.NUM_NOV_BOTS,
-           numGoodFitBots=st.NUM_FIT_BOTS, foodThresh=st.FOOD_THRESH)
+           numGoodFitBots=st.NUM_FIT_BOTS, foodThresh=st.FOOD_THRESH, exporter=figExporter, seed=st.SEED)
+
+    if figExporter is not None:
+        print("Figures saved, index at:", figExporter.close())
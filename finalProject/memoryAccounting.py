@@ -0,0 +1,136 @@
+import sys
+import warnings
+import numpy as np
+
+
+# Categories memory is reported in, in the order they're counted - anything reachable from more than one category is
+# only counted in the first one
+CATEGORIES = ('runHistory', 'trajectories', 'sensorHistories', 'controllerHistories', 'archive', 'population')
+
+# Types that are never shared between histories, so don't need tracking to avoid counting them twice
+SCALARS = (float, int, bool, np.generic)
+
+
+def deepSize(obj, seen):
+    """
+    Approximate number of bytes held by an object and everything it refers to
+    (through lists, tuples, sets, dictionaries and object attributes, including __slots__)
+    :param obj: Object to size
+    :param seen: Set of ids of objects already counted - they're not counted again
+    :return: Size in bytes
+    """
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)   # For numpy arrays this includes the data, if the array owns it
+    if isinstance(obj, (list, tuple, set)):
+        # Histories are long lists of numbers, so those are summed directly instead of being walked one by one
+        if obj and isinstance(next(iter(obj)), SCALARS):
+            size += sum(map(sys.getsizeof, obj))
+        else:
+            size += sum(deepSize(x, seen) for x in obj)
+    elif isinstance(obj, dict):
+        size += sum(deepSize(key, seen) + deepSize(value, seen) for key, value in obj.items())
+    elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+        size += deepSize(vars(obj), seen)
+    elif hasattr(type(obj), '__slots__') and not isinstance(obj, type):
+        size += sum(deepSize(getattr(obj, name), seen) for name in type(obj).__slots__ if hasattr(obj, name))
+    return size
+
+
+def attributeSize(objects, names, seen):
+    """
+    Total size of the given attributes of a list of objects (missing attributes are skipped)
+    :param objects: List of objects
+    :param names: Names of the attributes to size
+    :param seen: Set of ids of objects already counted
+    :return: Size in bytes
+    """
+    return sum(deepSize(getattr(obj, name), seen) for obj in objects for name in names if hasattr(obj, name))
+
+
+def robotHistorySize(robot):
+    """
+    Size of a robot's own histories - its trajectory (with motor speeds) and its sensors' histories
+    :param robot: ForagingRobot object (or ArrayForagingRobot, whose sensor arrays are counted too)
+    :return: Trajectory bytes, sensor history bytes
+    """
+    seen = set()
+    sensors = [robot.left_sensor, robot.right_sensor, robot.left_poison_sensor, robot.right_poison_sensor,
+               robot.energy_sensor]
+    sensors += [getattr(robot, name) for name in ['food_sensor_array', 'poison_sensor_array'] if hasattr(robot, name)]
+    trajectory = (attributeSize([robot], ['xs', 'ys', 'thetas', 'velocities', 'energies', 'state'], seen) +
+                  attributeSize([robot.left_motor, robot.right_motor], ['speeds'], seen))
+    return trajectory, attributeSize(sensors, ['xs', 'ys', 'thetas', 'activations'], seen)
+
+
+def accountMemory(robots, population, novelty, goodBots=(), cache=None):
+    """
+    Work out how much memory is held in each category by walking the objects of a run
+    :param robots: List of everything kept for postprocessing (all_robots in main.runSim) - EvaluationSummary objects,
+    or full robots, whose histories are counted too
+    :param population: Current population of controllers
+    :param novelty: Novelty object holding the archive and score histories
+    :param goodBots: List of controllers saved for the olympics
+    :param cache: Dictionary kept between calls so finished robots and summaries (which never change again) are only
+    walked once - they must stay alive while it's in use, as it's keyed on id
+    :return: Dictionary of category -> bytes
+    """
+    if cache is None:
+        cache = {}
+    for robot in robots:
+        if id(robot) not in cache:
+            # Summaries have no histories - the whole summary is counted instead
+            if hasattr(robot, 'left_sensor'):
+                cache[id(robot)] = (0,) + robotHistorySize(robot)
+            else:
+                cache[id(robot)] = (deepSize(robot, set()), 0, 0)
+
+    # Controllers keep adding to their histories whenever they're run again (e.g. the re-runs of good bots), so they
+    # are walked every time
+    seen = set()
+    controllers = ([robot.controller for robot in robots if hasattr(robot, 'controller')] + list(population) +
+                   list(goodBots))
+    noisemakers = [x for controller in controllers for x in [controller.left_noisemaker, controller.right_noisemaker]
+                   if x is not None]
+
+    usage = {}
+    usage['runHistory'] = sum(cache[id(robot)][0] for robot in robots)
+    usage['trajectories'] = sum(cache[id(robot)][1] for robot in robots)
+    usage['sensorHistories'] = sum(cache[id(robot)][2] for robot in robots)
+    usage['controllerHistories'] = (attributeSize(controllers, ['inputs', 'left_speed_commands',
+                                                                'right_speed_commands', 'allScores'], seen) +
+                                    attributeSize(noisemakers, ['noises'], seen))
+    usage['archive'] = attributeSize([novelty], ['behArchive', 'allBehScores', 'allNoveltyScores'], seen)
+    usage['population'] = sum(deepSize(controller, seen) for controller in list(population) + list(goodBots))
+    return usage
+
+
+def reportMemory(usage, generation):
+    """
+    Print the memory held in each category
+    :param usage: Dictionary returned by accountMemory
+    :param generation: Generation number, for the heading
+    :return: None
+    """
+    total = sum(usage.values())
+    print(f"Memory held after generation {generation}: {total / 1e6:.1f}MB")
+    for category in CATEGORIES:
+        print(f"    {category:<22}{usage[category] / 1e6:>10.2f}MB{usage[category] / max(total, 1):>8.0%}")
+
+
+def checkBudget(usage, budget):
+    """
+    Warn if the memory held is over budget
+    :param usage: Dictionary returned by accountMemory
+    :param budget: Budget in bytes (None for no budget)
+    :return: True if over budget
+    """
+    total = sum(usage.values())
+    if budget is not None and total > budget:
+        largest = max(usage, key=usage.get)
+        warnings.warn(f"Memory held ({total / 1e6:.1f}MB) is over the budget of {budget / 1e6:.1f}MB - the largest "
+                      f"category is {largest} ({usage[largest] / 1e6:.1f}MB)", stacklevel=2)
+        return True
+    return False
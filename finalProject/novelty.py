@@ -1,4 +1,3 @@
-import random
 import numpy as np
 
 
@@ -11,12 +10,13 @@ class Novelty:
         self.allNoveltyScores = []      # List to hold lists of the novelty scores of every generation
         self.behArchive = []            # List to hold all the behavioral scores used for the archive
 
-    def getNoveltyScores(self, pop, generation):
+    def getNoveltyScores(self, pop, generation, rng=None):
         """
         Get the novelty scores for every controller
         in a population
         :param pop: Population of robots
         :param generation: Generation number - just for human interest
+        :param rng: np.random.Generator for the archive update (fresh entropy if None)
         :return: None
         """
 
@@ -49,7 +49,7 @@ class Novelty:
             combinedScores.append([robotScore, novelty])    # Append the robot's score and novelty (for archive update)
 
         # Update the archive with the list of combined scores
-        self.updateArchive(combinedScores)
+        self.updateArchive(combinedScores, rng)
         # Add all of the behavioral scores for this generation to the list of all behavioral scores
         self.allBehScores.append(currentBehScores)
         # Add all the novelty scores for this generation to the list of all novelty scores
@@ -61,16 +61,18 @@ class Novelty:
         # print("Novelty scores:", [round(robot.controller.novelty, 3) for robot in pop])
         # print("Archive Scores:", [[x[0], x[1], round(x[2], 2)] for x in self.behArchive])
 
-    def updateArchive(self, combinedScores):
+    def updateArchive(self, combinedScores, rng=None):
         """
         Update the archive to randomly include
         only the most novel new genotypes
         :param combinedScores: List of lists containing a generation's worth of [behavioral score, novelty score]
+        :param rng: np.random.Generator deciding which novel scores are kept (fresh entropy if None)
         :return: None
         """
+        rng = np.random.default_rng(rng)
 
         for score in combinedScores:
             # If the novelty score was greater than 5, add the beahvior associated with it to the archive with a
             # 50% probability (prevents archive from getting too large and search space from getting too constrained)
-            if score[1] > 5 and random.random() < 0.5:
+            if score[1] > 5 and rng.random() < 0.5:
                 self.behArchive.append(score[0])
@@ -0,0 +1,110 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import probes as pr
+
+
+# Counts of how many time steps robots spent in each cell of a grid over the arena, kept separately for novelty and
+# fitness robots and for each window of generations. Positions are binned as each run finishes, so the whole run's
+# spatial behavior is kept in a few fixed-size grids rather than in every robot's trajectory
+class OccupancyGrid:
+
+    def __init__(self, x_left=-20, x_right=20, y_bottom=-20, y_top=20, cells=80, window=25):
+        """
+        Constructor method
+        :param x_left: Left edge of the arena
+        :param x_right: Right edge of the arena
+        :param y_bottom: Bottom edge of the arena
+        :param y_top: Top edge of the arena
+        :param cells: Number of cells along each side of the grid
+        :param window: Number of generations in each window (0 for one window for the whole run)
+        """
+        self.x_left, self.x_right, self.y_bottom, self.y_top = x_left, x_right, y_bottom, y_top
+        self.cells = cells
+        self.window = window
+        self.counts = {}        # Dictionary of (novelty, window) -> cells x cells array of counts (rows are y)
+
+    def windowOf(self, generation):
+        """
+        Find which window of generations a generation is in
+        :param generation: Generation number (starting at 1)
+        :return: Index of the window
+        """
+        return (generation - 1) // self.window if self.window else 0
+
+    def add(self, xs, ys, novelty, generation):
+        """
+        Add a trajectory to the grid - every position counts as one time step
+        :param xs: List of x positions
+        :param ys: List of y positions
+        :param novelty: Whether the robot was evolved with novelty search
+        :param generation: Generation of the robot
+        :return: None
+        """
+        cols = ((np.asarray(xs) - self.x_left) / (self.x_right - self.x_left) * self.cells).astype(int)
+        rows = ((np.asarray(ys) - self.y_bottom) / (self.y_top - self.y_bottom) * self.cells).astype(int)
+        flat = np.clip(rows, 0, self.cells - 1) * self.cells + np.clip(cols, 0, self.cells - 1)
+
+        key = (bool(novelty), self.windowOf(generation))
+        if key not in self.counts:
+            self.counts[key] = np.zeros((self.cells, self.cells), dtype=np.int64)
+        self.counts[key] += np.bincount(flat, minlength=self.cells * self.cells).reshape(self.cells, self.cells)
+
+    def windows(self):
+        """
+        Every window that has any counts in it
+        :return: Sorted list of window indices
+        """
+        return sorted({window for _, window in self.counts})
+
+    def heatmap(self, novelty=None, windows=None):
+        """
+        Total counts for a selection of the grids
+        :param novelty: True or False for only novelty or fitness robots, None for both
+        :param windows: List of window indices to include, None for all of them
+        :return: cells x cells array of counts (rows are y)
+        """
+        total = np.zeros((self.cells, self.cells), dtype=np.int64)
+        for (nov, window), counts in self.counts.items():
+            if (novelty is None or nov == novelty) and (windows is None or window in windows):
+                total += counts
+        return total
+
+
+# Feeds every robot's trajectory into an OccupancyGrid as each run finishes
+class OccupancyProbe(pr.Probe):
+
+    def __init__(self, grid):
+        self.grid = grid
+
+    def endOfRun(self, ts, robots, pellets):
+        for robot in robots:
+            self.grid.add(robot.xs, robot.ys, robot.novelty, robot.generation)
+
+
+def plotOccupancy(grid, title="Occupancy"):
+    """
+    Plot heatmaps of where robots spent their time - one row for novelty
+    and one for fitness robots, with a column for each window of generations
+    :param grid: OccupancyGrid object
+    :param title: Title of the figure
+    :return: None
+    """
+    windows = grid.windows() or [0]
+    fig, axs = plt.subplots(2, len(windows), squeeze=False, sharex=True, sharey=True,
+                            figsize=(3 * len(windows) + 1, 6))
+    extent = [grid.x_left, grid.x_right, grid.y_bottom, grid.y_top]
+
+    for row, novelty in enumerate([True, False]):
+        for col, window in enumerate(windows):
+            counts = grid.heatmap(novelty, [window])
+            ax = axs[row, col]
+            # Share of the time steps in each cell, so windows with different numbers of robots can be compared
+            image = ax.imshow(counts / max(counts.sum(), 1), origin='lower', extent=extent, cmap='magma')
+            fig.colorbar(image, ax=ax, fraction=0.046)
+            if grid.window:
+                generations = f"gens {window * grid.window + 1}-{(window + 1) * grid.window}"
+            else:
+                generations = "all gens"
+            ax.set_title(f"{'Novelty' if novelty else 'Fitness'}, {generations}", fontsize=8)
+
+    fig.suptitle(title)
@@ -2,17 +2,28 @@ import numpy as np
 import sys
 import pelletGenerator as pg
 import postprocessing as pp
-import pygameFunctions as pf
+import simLoop as sl
 import foragingRobot as fr
+import resultsStore as rs
+import settings as st
 
 sys.path.insert(1, '..')
 from situsim_extensions.arena import *
 
 
-def runEvents(controllers, field_of_view, left_sensor_angle, right_sensor_angle, duration):
+def runEvents(controllers, field_of_view, left_sensor_angle, right_sensor_angle, duration, exporter=None, store=None,
+              seed=None, dt=0.1, integrator='euler', probes=(), occlusion=False):
     """
     Run all olympic events for the
     novelty and fitness robots
+    :param dt: Time step of every event's simulation
+    :param integrator: 'euler', or 'arc' for exact arcs and swept pellet contact (accurate at larger dt)
+    :param probes: List of probes.Probe objects to watch every event's simulations
+    :param occlusion: Whether robots and pellets block light from the robots' sensors in the events with many robots
+    :param seed: Seed (or np.random.SeedSequence) for the randomly placed pellets and the controller noise - the other
+    events keep their fixed layouts
+    :param store: ResultsStore every event's scores are recorded in - defaults to the one at RESULTS_DIR in settings
+    :param exporter: FigureExporter to save the plots of every event to files in the background - if None, plots are shown
     :param duration: int - how long the simulation lasts
     :param right_sensor_angle: in radians, the angle location of the robot's right sensor
     :param left_sensor_angle: in radians, the angle location of the robot's left sensor
@@ -21,7 +32,16 @@ def runEvents(controllers, field_of_view, left_sensor_angle, right_sensor_angle,
     :return: None
     """
 
-    runNumber = 5       # Run number - manually set for each trial - saves to data3.txt to distinguish data
+    runNumber = st.RUN_NUMBER   # Run number - manually set for each trial in settings.py to distinguish data
+
+    if store is None:
+        store = rs.ResultsStore(st.RESULTS_DIR)
+
+    # Give each event that draws random numbers its own independent stream, so adding draws to one event doesn't
+    # change what happens in the others
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    fightSeed, fight2Seed, noiseSeed = seed.spawn(3)
 
     all_robots = []     # A list to hold all of the robots (for postprocessing)
     all_ts = []         # A list to hold all time steps (for postprocessing)
@@ -40,7 +60,9 @@ def runEvents(controllers, field_of_view, left_sensor_angle, right_sensor_angle,
     # run the simulation once, with the given parameters
     ts, robots, pellets = runFightSim(screen_width=700, controller=controllers, animate=animate,
                                       field_of_view=field_of_view, left_sensor_angle=left_sensor_angle,
-                                      right_sensor_angle=right_sensor_angle, duration=duration, generation=0)
+                                      right_sensor_angle=right_sensor_angle, duration=duration, generation=0,
+                                      seed=fightSeed, dt=dt, integrator=integrator, probes=probes,
+                                      occlusion=occlusion)
 
     all_robots += robots                    # Add the new robot(s) to the list of all robots for the whole experiment
     for robot in range(len(all_robots)):    # Must be done b/c provided plot pkg assumes each robot has own time series
@@ -50,12 +72,14 @@ def runEvents(controllers, field_of_view, left_sensor_angle, right_sensor_angle,
     for robot in all_robots:
         print("Food eaten:", robot.foodEaten, "Novelty:", robot.novelty)
 
-    # Separate novel and fitness bots from each other for postprocessing
-    fightNov = [x.foodEaten for x in all_robots if x.novelty]
-    fightFit = [x.foodEaten for x in all_robots if not x.novelty]
+    # Record every robot's score for this event in the results store straight away
+    pp.recordEvent(store, runNumber, 'fight', all_robots, dt=dt)
 
-    # Run all the plots for all the bots for this event
-    pp.do_plots(all_ts, all_robots, pellets)
+    # Run all the plots for all the bots for this event (saved to files in the background if exporting)
+    if exporter is not None:
+        exporter.submit("fight", pp.do_plots, all_ts, all_robots, pellets, False)
+    else:
+        pp.do_plots(all_ts, all_robots, pellets)
 
     """
     -------------------------------------------------------------------------------------------------------------------
@@ -75,7 +99,9 @@ def runEvents(controllers, field_of_view, left_sensor_angle, right_sensor_angle,
     # run the simulation once, with the given parameters
     ts, robots, pellets = runFightSim2(screen_width=700, controller=controllers, animate=animate,
                                        field_of_view=field_of_view, left_sensor_angle=left_sensor_angle,
-                                       right_sensor_angle=right_sensor_angle, duration=duration, generation=0)
+                                       right_sensor_angle=right_sensor_angle, duration=duration, generation=0,
+                                       seed=fight2Seed, dt=dt, integrator=integrator, probes=probes,
+                                       occlusion=occlusion)
 
     all_robots += robots  # Add the new robot(s) to the list of all robots for the whole experiment
     for robot in range(len(all_robots)):  # Must be done b/c provided plot pkg assumes each robot has own time series
@@ -84,10 +110,12 @@ def runEvents(controllers, field_of_view, left_sensor_angle, right_sensor_angle,
     for robot in all_robots:
         print("Food eaten:", robot.foodEaten, "Novelty:", robot.novelty)
 
-    fight2Nov = [x.foodEaten for x in all_robots if x.novelty]
-    fight2Fit = [x.foodEaten for x in all_robots if not x.novelty]
+    pp.recordEvent(store, runNumber, 'fight2', all_robots, dt=dt)
 
-    pp.do_plots(all_ts, all_robots, pellets)
+    if exporter is not None:
+        exporter.submit("fight2", pp.do_plots, all_ts, all_robots, pellets, False)
+    else:
+        pp.do_plots(all_ts, all_robots, pellets)
 
     """
     -------------------------------------------------------------------------------------------------------------------
@@ -107,7 +135,8 @@ def runEvents(controllers, field_of_view, left_sensor_angle, right_sensor_angle,
         # run the simulation once, with the given parameters
         ts, robots, pellets = runCircleSim(screen_width=700, controller=troll, animate=animate,
                                            field_of_view=field_of_view, left_sensor_angle=left_sensor_angle,
-                                           right_sensor_angle=right_sensor_angle, duration=duration, generation=0)
+                                           right_sensor_angle=right_sensor_angle, duration=duration, generation=0,
+                                           dt=dt, integrator=integrator, probes=probes)
 
         all_robots += robots  # Add the new robot(s) to the list of all robots for the whole experiment
         all_ts.append(ts)
@@ -115,10 +144,12 @@ def runEvents(controllers, field_of_view, left_sensor_angle, right_sensor_angle,
     for robot in all_robots:
         print("Food eaten:", robot.foodEaten, "Novelty:", robot.novelty)
 
-    circleNov = [x.foodEaten for x in all_robots if x.novelty]
-    circleFit = [x.foodEaten for x in all_robots if not x.novelty]
+    pp.recordEvent(store, runNumber, 'circle', all_robots, dt=dt)
 
-    pp.do_plots(all_ts, all_robots, pellets)
+    if exporter is not None:
+        exporter.submit("circle", pp.do_plots, all_ts, all_robots, pellets, False)
+    else:
+        pp.do_plots(all_ts, all_robots, pellets)
 
     """
     -------------------------------------------------------------------------------------------------------------------
@@ -137,7 +168,8 @@ def runEvents(controllers, field_of_view, left_sensor_angle, right_sensor_angle,
         # run the simulation once, with the given parameters
         ts, robots, pellets = runCheckSim(screen_width=700, controller=troll, animate=animate,
                                           field_of_view=field_of_view, left_sensor_angle=left_sensor_angle,
-                                          right_sensor_angle=right_sensor_angle, duration=duration, generation=0)
+                                          right_sensor_angle=right_sensor_angle, duration=duration, generation=0,
+                                          dt=dt, integrator=integrator, probes=probes)
 
         all_robots += robots  # Add the new robot(s) to the list of all robots for the whole experiment
         all_ts.append(ts)
@@ -145,10 +177,12 @@ def runEvents(controllers, field_of_view, left_sensor_angle, right_sensor_angle,
     for robot in all_robots:
         print("Food eaten:", robot.foodEaten, "Novelty:", robot.novelty)
 
-    checkNov = [x.foodEaten for x in all_robots if x.novelty]
-    checkFit = [x.foodEaten for x in all_robots if not x.novelty]
+    pp.recordEvent(store, runNumber, 'check', all_robots, dt=dt)
 
-    pp.do_plots(all_ts, all_robots, pellets)
+    if exporter is not None:
+        exporter.submit("check", pp.do_plots, all_ts, all_robots, pellets, False)
+    else:
+        pp.do_plots(all_ts, all_robots, pellets)
 
     """
     -------------------------------------------------------------------------------------------------------------------
@@ -172,7 +206,8 @@ def runEvents(controllers, field_of_view, left_sensor_angle, right_sensor_angle,
         # run the simulation once, with the given parameters
         ts, robots, pellets = runSensorShiftSim(screen_width=700, controller=troll, animate=animate,
                                                 field_of_view=field_of_view, left_sensor_angle=left_sensor_angle,
-                                                right_sensor_angle=right_sensor_angle, duration=duration, generation=0)
+                                                right_sensor_angle=right_sensor_angle, duration=duration, generation=0,
+                                                dt=dt, integrator=integrator, probes=probes)
 
         all_robots += robots  # Add the new robot(s) to the list of all robots for the whole experiment
         all_ts.append(ts)
@@ -180,10 +215,12 @@ def runEvents(controllers, field_of_view, left_sensor_angle, right_sensor_angle,
     for robot in all_robots:
         print("Food eaten:", robot.foodEaten, "Novelty:", robot.novelty)
 
-    shiftNov = [x.foodEaten for x in all_robots if x.novelty]
-    shiftFit = [x.foodEaten for x in all_robots if not x.novelty]
+    pp.recordEvent(store, runNumber, 'shift', all_robots, dt=dt)
 
-    pp.do_plots(all_ts, all_robots, pellets)
+    if exporter is not None:
+        exporter.submit("shift", pp.do_plots, all_ts, all_robots, pellets, False)
+    else:
+        pp.do_plots(all_ts, all_robots, pellets)
 
     """
     -------------------------------------------------------------------------------------------------------------------
@@ -207,7 +244,8 @@ def runEvents(controllers, field_of_view, left_sensor_angle, right_sensor_angle,
         # run the simulation once, with the given parameters
         ts, robots, pellets = runSensorKillSim(screen_width=700, controller=troll, animate=animate,
                                                field_of_view=field_of_view, left_sensor_angle=left_sensor_angle,
-                                               right_sensor_angle=right_sensor_angle, duration=duration, generation=0)
+                                               right_sensor_angle=right_sensor_angle, duration=duration, generation=0,
+                                               dt=dt, integrator=integrator, probes=probes)
 
         all_robots += robots  # Add the new robot(s) to the list of all robots for the whole experiment
         all_ts.append(ts)
@@ -215,10 +253,12 @@ def runEvents(controllers, field_of_view, left_sensor_angle, right_sensor_angle,
     for robot in all_robots:
         print("Food eaten:", robot.foodEaten, "Novelty:", robot.novelty)
 
-    killNov = [x.foodEaten for x in all_robots if x.novelty]
-    killFit = [x.foodEaten for x in all_robots if not x.novelty]
+    pp.recordEvent(store, runNumber, 'kill', all_robots, dt=dt)
 
-    pp.do_plots(all_ts, all_robots, pellets)
+    if exporter is not None:
+        exporter.submit("kill", pp.do_plots, all_ts, all_robots, pellets, False)
+    else:
+        pp.do_plots(all_ts, all_robots, pellets)
 
     """
     -------------------------------------------------------------------------------------------------------------------
@@ -233,13 +273,15 @@ def runEvents(controllers, field_of_view, left_sensor_angle, right_sensor_angle,
     all_robots = []
     all_ts = []
 
-    for troll in controllers:
+    # One noise stream per controller, so each controller's noise is the same whatever order they're run in
+    for troll, trollSeed in zip(controllers, noiseSeed.spawn(len(controllers))):
         troll.reset()
 
         # run the simulation once, with the given parameters
         ts, robots, pellets = runNoiseSim(screen_width=700, controller=troll, animate=animate,
                                           field_of_view=field_of_view, left_sensor_angle=left_sensor_angle,
-                                          right_sensor_angle=right_sensor_angle, duration=duration, generation=0)
+                                          right_sensor_angle=right_sensor_angle, duration=duration, generation=0,
+                                          seed=trollSeed, dt=dt, integrator=integrator, probes=probes)
 
         animate = False
         all_robots += robots  # Add the new robot(s) to the list of all robots for the whole experiment
@@ -248,13 +290,12 @@ def runEvents(controllers, field_of_view, left_sensor_angle, right_sensor_angle,
     for robot in all_robots:
         print("Food eaten:", robot.foodEaten, "Novelty:", robot.novelty)
 
-    noiseNov = [x.foodEaten for x in all_robots if x.novelty]
-    noiseFit = [x.foodEaten for x in all_robots if not x.novelty]
+    pp.recordEvent(store, runNumber, 'noise', all_robots, dt=dt)
 
-    pp.do_plots(all_ts, all_robots, pellets)
-
-    pp.recordInfo(runNumber, fightNov, fightFit, fight2Nov, fight2Fit, circleNov, circleFit, checkNov, checkFit,
-                  shiftNov, shiftFit, killNov, killFit, noiseNov, noiseFit, controllers)
+    if exporter is not None:
+        exporter.submit("noise", pp.do_plots, all_ts, all_robots, pellets, False)
+    else:
+        pp.do_plots(all_ts, all_robots, pellets)
 
 
 """
@@ -262,19 +303,23 @@ I considered trying to put these event simulations into a for loop or some such
 the breadth of variables that needed to change, I just made each its own function. To paraphrase Mark Twain, if I'd 
 had more time I'd have written shorter code. Briefer comments here since the simulations are very similar to the 
 well-commented one in main.py, and each other, and the descriptions of the events are in the runEvents function above. 
+The simulation main loop itself is shared by all of them (and training) - see simLoop.runLoop.
 """
 
 
 # Compete all robots in the same arena with 25 randomly placed food pellets in a 20x20 space (same as training)
 def runFightSim(screen_width, controller, animate=True, field_of_view=0.8 * np.pi, left_sensor_angle=np.pi / 3,
-                right_sensor_angle=-np.pi / 3, duration=100, generation=0):
+                right_sensor_angle=-np.pi / 3, duration=100, generation=0, seed=None,
+                dt=0.1, integrator='euler', probes=(), occlusion=False):
     # Set robot's starting position and angle
     x = -12
     y = 0
     theta = 0
 
-    foodPellets, poisonPellets, allPellets = pg.generateRandomPellets(25, 0, 10)
+    foodPellets, poisonPellets, allPellets = pg.generateRandomPellets(25, 0, 10, seed=seed)
     agents = []
+    # With occlusion, every robot and pellet blocks light from the robots' sensors
+    occluders = Occluders(list(allPellets)) if occlusion else None
 
     # create robots from all the controllers to compete in same arena
     for troll in controller:
@@ -286,55 +331,17 @@ def runFightSim(screen_width, controller, animate=True, field_of_view=0.8 * np.p
                                  left_poison_sensor_angle=left_sensor_angle,
                                  right_poison_sensor_angle=right_sensor_angle,
                                  food_field_of_view=field_of_view, poison_field_of_view=field_of_view,
-                                 consumables=allPellets, theta=theta, novelty=troll.nov
-                                 )
+                                 consumables=allPellets, theta=theta, novelty=troll.nov, integrator=integrator,
+                                 occluders=occluders)
         robot.generation = generation
         agents.append(robot)
+    if occluders is not None:
+        occluders.obstacles += agents
 
-    arena = Arena(agents, x_left=-20, x_right=20, y_top=20, y_bottom=-20)
-
-    # only run pygame code if animating the simulation
-    if animate:
-        screen = pf.setup_pygame_window(screen_width)
-
-    # animation variables
-    delay = 0  # can be used to slow animation down
-    running = True  # can be used to exit animation early
-    paused = False  # can be used to pause simulation/animation
-
-    # prepare simulation time variables
-    t = 0
-    ts = [t]
-    dt = 0.1
-    # begin simulation main loop
-    while t < duration and running:
-
-        # only move simulation forwards in time if not paused
-        if not paused:
+    # The robots all start in the same place, so they're pushed apart as well as kept in the arena
+    arena = MultiAgentArena(agents, x_left=-20, x_right=20, y_top=20, y_bottom=-20)
 
-            # step all robots
-            for agent in agents:
-                agent.step(dt)
-
-            for pellet in allPellets:
-                pellet.step(dt)
-
-            arena.step(dt)
-
-            # increment time variable and store in ts list for plotting later
-            t += dt
-            ts.append(t)
-
-        # only run pygame code if animating the simulation
-        if animate:
-            running, paused, delay = pf.pygame_drawsim(screen, agents + allPellets + [arena], screen_width, paused,
-                                                       delay)
-
-    # only run pygame code if animating the simulation
-    if animate:
-        # Quit pygame.
-        pygame.display.quit()
-        pygame.quit()
+    ts = sl.runLoop(agents, allPellets, arena, duration, dt, animate, screen_width, probes)
 
     # Iterate through the list of agents, recording all their scores
     for i in range(len(agents)):
@@ -345,14 +352,17 @@ def runFightSim(screen_width, controller, animate=True, field_of_view=0.8 * np.p
 
 # Compete all robots in the same arena with 50 randomly placed food pellets in the entire arena space (40x40)
 def runFightSim2(screen_width, controller, animate=True, field_of_view=0.8 * np.pi, left_sensor_angle=np.pi / 3,
-                 right_sensor_angle=-np.pi / 3, duration=100, generation=0):
+                 right_sensor_angle=-np.pi / 3, duration=100, generation=0, seed=None,
+                 dt=0.1, integrator='euler', probes=(), occlusion=False):
     # Set robot's starting position and angle
     x = -12
     y = 0
     theta = 0
 
-    foodPellets, poisonPellets, allPellets = pg.generateRandomPellets(50, 0, 20)
+    foodPellets, poisonPellets, allPellets = pg.generateRandomPellets(50, 0, 20, seed=seed)
     agents = []
+    # With occlusion, every robot and pellet blocks light from the robots' sensors
+    occluders = Occluders(list(allPellets)) if occlusion else None
 
     # create robot
     for troll in controller:
@@ -364,55 +374,17 @@ def runFightSim2(screen_width, controller, animate=True, field_of_view=0.8 * np.
                                  left_poison_sensor_angle=left_sensor_angle,
                                  right_poison_sensor_angle=right_sensor_angle,
                                  food_field_of_view=field_of_view, poison_field_of_view=field_of_view,
-                                 consumables=allPellets, theta=theta, novelty=troll.nov
-                                 )
+                                 consumables=allPellets, theta=theta, novelty=troll.nov, integrator=integrator,
+                                 occluders=occluders)
         robot.generation = generation
         agents.append(robot)
+    if occluders is not None:
+        occluders.obstacles += agents
 
-    arena = Arena(agents, x_left=-20, x_right=20, y_top=20, y_bottom=-20)
-
-    # only run pygame code if animating the simulation
-    if animate:
-        screen = pf.setup_pygame_window(screen_width)
-
-    # animation variables
-    delay = 0  # can be used to slow animation down
-    running = True  # can be used to exit animation early
-    paused = False  # can be used to pause simulation/animation
-
-    # prepare simulation time variables
-    t = 0
-    ts = [t]
-    dt = 0.1
-    # begin simulation main loop
-    while t < duration and running:
+    # The robots all start in the same place, so they're pushed apart as well as kept in the arena
+    arena = MultiAgentArena(agents, x_left=-20, x_right=20, y_top=20, y_bottom=-20)
 
-        # only move simulation forwards in time if not paused
-        if not paused:
-
-            # step all robots
-            for agent in agents:
-                agent.step(dt)
-
-            for pellet in allPellets:
-                pellet.step(dt)
-
-            arena.step(dt)
-
-            # increment time variable and store in ts list for plotting later
-            t += dt
-            ts.append(t)
-
-        # only run pygame code if animating the simulation
-        if animate:
-            running, paused, delay = pf.pygame_drawsim(screen, agents + allPellets + [arena], screen_width, paused,
-                                                       delay)
-
-    # only run pygame code if animating the simulation
-    if animate:
-        # Quit pygame.
-        pygame.display.quit()
-        pygame.quit()
+    ts = sl.runLoop(agents, allPellets, arena, duration, dt, animate, screen_width, probes)
 
     for i in range(len(agents)):
         controller[i].allScores.append(['fight2', agents[i].foodEaten])
@@ -423,7 +395,8 @@ def runFightSim2(screen_width, controller, animate=True, field_of_view=0.8 * np.
 # One robot at a time, pellets are placed in a circle with robot at the origin instead of randomly placed
 # There are 25 pellets at a radius of 10 away from the origin
 def runCircleSim(screen_width, controller, animate=True, field_of_view=0.8 * np.pi, left_sensor_angle=np.pi / 3,
-                 right_sensor_angle=-np.pi / 3, duration=100, generation=0):
+                 right_sensor_angle=-np.pi / 3, duration=100, generation=0,
+                 dt=0.1, integrator='euler', probes=()):
     # Set robot's starting position and angle
     x = 0
     y = 0
@@ -440,55 +413,14 @@ def runCircleSim(screen_width, controller, animate=True, field_of_view=0.8 * np.
                              left_poison_sensor_angle=left_sensor_angle,
                              right_poison_sensor_angle=right_sensor_angle,
                              food_field_of_view=field_of_view, poison_field_of_view=field_of_view,
-                             consumables=allPellets, theta=theta, novelty=controller.nov
+                             consumables=allPellets, theta=theta, novelty=controller.nov, integrator=integrator,
                              )
     robot.generation = generation
     agents = [robot]
 
     arena = Arena(agents, x_left=-20, x_right=20, y_top=20, y_bottom=-20)
 
-    # only run pygame code if animating the simulation
-    if animate:
-        screen = pf.setup_pygame_window(screen_width)
-
-    # animation variables
-    delay = 0  # can be used to slow animation down
-    running = True  # can be used to exit animation early
-    paused = False  # can be used to pause simulation/animation
-
-    # prepare simulation time variables
-    t = 0
-    ts = [t]
-    dt = 0.1
-    # begin simulation main loop
-    while t < duration and running:
-
-        # only move simulation forwards in time if not paused
-        if not paused:
-
-            # step all robots
-            for agent in agents:
-                agent.step(dt)
-
-            for pellet in allPellets:
-                pellet.step(dt)
-
-            arena.step(dt)
-
-            # increment time variable and store in ts list for plotting later
-            t += dt
-            ts.append(t)
-
-        # only run pygame code if animating the simulation
-        if animate:
-            running, paused, delay = pf.pygame_drawsim(screen, agents + allPellets + [arena], screen_width, paused,
-                                                       delay)
-
-    # only run pygame code if animating the simulation
-    if animate:
-        # Quit pygame.
-        pygame.display.quit()
-        pygame.quit()
+    ts = sl.runLoop(agents, allPellets, arena, duration, dt, animate, screen_width, probes)
 
     controller.allScores.append(['circle', robot.foodEaten])
 
@@ -497,7 +429,8 @@ def runCircleSim(screen_width, controller, animate=True, field_of_view=0.8 * np.
 
 # Run a control check of the sim identical to training but with a different random seed for pellet generation
 def runCheckSim(screen_width, controller, animate=True, field_of_view=0.8 * np.pi, left_sensor_angle=np.pi / 3,
-                right_sensor_angle=-np.pi / 3, duration=100, generation=0):
+                right_sensor_angle=-np.pi / 3, duration=100, generation=0,
+                dt=0.1, integrator='euler', probes=()):
     # Set robot's starting position and angle
     x = -12
     y = 0
@@ -515,55 +448,14 @@ def runCheckSim(screen_width, controller, animate=True, field_of_view=0.8 * np.p
                              left_poison_sensor_angle=left_sensor_angle,
                              right_poison_sensor_angle=right_sensor_angle,
                              food_field_of_view=field_of_view, poison_field_of_view=field_of_view,
-                             consumables=allPellets, theta=theta, novelty=controller.nov
+                             consumables=allPellets, theta=theta, novelty=controller.nov, integrator=integrator,
                              )
     robot.generation = generation
     agents = [robot]
 
     arena = Arena(agents, x_left=-20, x_right=20, y_top=20, y_bottom=-20)
 
-    # only run pygame code if animating the simulation
-    if animate:
-        screen = pf.setup_pygame_window(screen_width)
-
-    # animation variables
-    delay = 0  # can be used to slow animation down
-    running = True  # can be used to exit animation early
-    paused = False  # can be used to pause simulation/animation
-
-    # prepare simulation time variables
-    t = 0
-    ts = [t]
-    dt = 0.1
-    # begin simulation main loop
-    while t < duration and running:
-
-        # only move simulation forwards in time if not paused
-        if not paused:
-
-            # step all robots
-            for agent in agents:
-                agent.step(dt)
-
-            for pellet in allPellets:
-                pellet.step(dt)
-
-            arena.step(dt)
-
-            # increment time variable and store in ts list for plotting later
-            t += dt
-            ts.append(t)
-
-        # only run pygame code if animating the simulation
-        if animate:
-            running, paused, delay = pf.pygame_drawsim(screen, agents + allPellets + [arena], screen_width, paused,
-                                                       delay)
-
-    # only run pygame code if animating the simulation
-    if animate:
-        # Quit pygame.
-        pygame.display.quit()
-        pygame.quit()
+    ts = sl.runLoop(agents, allPellets, arena, duration, dt, animate, screen_width, probes)
 
     robot.controller.allScores.append(['check', robot.foodEaten])
 
@@ -573,7 +465,8 @@ def runCheckSim(screen_width, controller, animate=True, field_of_view=0.8 * np.p
 # Shift both sensors inwards from pi/3 to pi/9 (given in function parameters) and run on same course as training but
 # with a new random seed
 def runSensorShiftSim(screen_width, controller, animate=True, field_of_view=0.8 * np.pi, left_sensor_angle=np.pi / 3,
-                      right_sensor_angle=-np.pi / 3, duration=100, generation=0):
+                      right_sensor_angle=-np.pi / 3, duration=100, generation=0,
+                      dt=0.1, integrator='euler', probes=()):
     # Set robot's starting position and angle
     x = -12
     y = 0
@@ -590,55 +483,14 @@ def runSensorShiftSim(screen_width, controller, animate=True, field_of_view=0.8
                              left_poison_sensor_angle=left_sensor_angle,
                              right_poison_sensor_angle=right_sensor_angle,
                              food_field_of_view=field_of_view, poison_field_of_view=field_of_view,
-                             consumables=allPellets, theta=theta, novelty=controller.nov
+                             consumables=allPellets, theta=theta, novelty=controller.nov, integrator=integrator,
                              )
     robot.generation = generation
     agents = [robot]
 
     arena = Arena(agents, x_left=-20, x_right=20, y_top=20, y_bottom=-20)
 
-    # only run pygame code if animating the simulation
-    if animate:
-        screen = pf.setup_pygame_window(screen_width)
-
-    # animation variables
-    delay = 0  # can be used to slow animation down
-    running = True  # can be used to exit animation early
-    paused = False  # can be used to pause simulation/animation
-
-    # prepare simulation time variables
-    t = 0
-    ts = [t]
-    dt = 0.1
-    # begin simulation main loop
-    while t < duration and running:
-
-        # only move simulation forwards in time if not paused
-        if not paused:
-
-            # step all robots
-            for agent in agents:
-                agent.step(dt)
-
-            for pellet in allPellets:
-                pellet.step(dt)
-
-            arena.step(dt)
-
-            # increment time variable and store in ts list for plotting later
-            t += dt
-            ts.append(t)
-
-        # only run pygame code if animating the simulation
-        if animate:
-            running, paused, delay = pf.pygame_drawsim(screen, agents + allPellets + [arena], screen_width, paused,
-                                                       delay)
-
-    # only run pygame code if animating the simulation
-    if animate:
-        # Quit pygame.
-        pygame.display.quit()
-        pygame.quit()
+    ts = sl.runLoop(agents, allPellets, arena, duration, dt, animate, screen_width, probes)
 
     controller.allScores.append(['shift', robot.foodEaten])
 
@@ -648,7 +500,8 @@ def runSensorShiftSim(screen_width, controller, animate=True, field_of_view=0.8
 # Kill the left sensor by feeding it an empty list of food sources to seek and run the robots on the same course as
 # training but with a new random seed for pellet generation
 def runSensorKillSim(screen_width, controller, animate=True, field_of_view=0.8 * np.pi, left_sensor_angle=np.pi / 3,
-                     right_sensor_angle=-np.pi / 3, duration=100, generation=0):
+                     right_sensor_angle=-np.pi / 3, duration=100, generation=0,
+                     dt=0.1, integrator='euler', probes=()):
     # Set robot's starting position and angle
     x = -12
     y = 0
@@ -665,55 +518,14 @@ def runSensorKillSim(screen_width, controller, animate=True, field_of_view=0.8 *
                              left_poison_sensor_angle=left_sensor_angle,
                              right_poison_sensor_angle=right_sensor_angle,
                              food_field_of_view=field_of_view, poison_field_of_view=field_of_view,
-                             consumables=allPellets, theta=theta, novelty=controller.nov
+                             consumables=allPellets, theta=theta, novelty=controller.nov, integrator=integrator,
                              )
     robot.generation = generation
     agents = [robot]
 
     arena = Arena(agents, x_left=-20, x_right=20, y_top=20, y_bottom=-20)
 
-    # only run pygame code if animating the simulation
-    if animate:
-        screen = pf.setup_pygame_window(screen_width)
-
-    # animation variables
-    delay = 0  # can be used to slow animation down
-    running = True  # can be used to exit animation early
-    paused = False  # can be used to pause simulation/animation
-
-    # prepare simulation time variables
-    t = 0
-    ts = [t]
-    dt = 0.1
-    # begin simulation main loop
-    while t < duration and running:
-
-        # only move simulation forwards in time if not paused
-        if not paused:
-
-            # step all robots
-            for agent in agents:
-                agent.step(dt)
-
-            for pellet in allPellets:
-                pellet.step(dt)
-
-            arena.step(dt)
-
-            # increment time variable and store in ts list for plotting later
-            t += dt
-            ts.append(t)
-
-        # only run pygame code if animating the simulation
-        if animate:
-            running, paused, delay = pf.pygame_drawsim(screen, agents + allPellets + [arena], screen_width, paused,
-                                                       delay)
-
-    # only run pygame code if animating the simulation
-    if animate:
-        # Quit pygame.
-        pygame.display.quit()
-        pygame.quit()
+    ts = sl.runLoop(agents, allPellets, arena, duration, dt, animate, screen_width, probes)
 
     controller.allScores.append(['kill', robot.foodEaten])
 
@@ -723,7 +535,8 @@ def runSensorKillSim(screen_width, controller, animate=True, field_of_view=0.8 *
 # Add brown noise to the controller for both the left and right side, then run the robots on the same course as training
 # but with a new random seed for pellet generation
 def runNoiseSim(screen_width, controller, animate=True, field_of_view=0.8 * np.pi, left_sensor_angle=np.pi / 3,
-                right_sensor_angle=-np.pi / 3, duration=100, generation=0):
+                right_sensor_angle=-np.pi / 3, duration=100, generation=0, seed=None,
+                dt=0.1, integrator='euler', probes=()):
     # Set robot's starting position and angle
     x = -12
     y = 0
@@ -732,8 +545,9 @@ def runNoiseSim(screen_width, controller, animate=True, field_of_view=0.8 * np.p
     # Lower "brightness" of pellet by half
     foodPellets, poisonPellets, allPellets = pg.generateRandomPellets(25, 0, 10, seed=38)
 
-    controller.left_noisemaker = BrownNoiseSource(1)
-    controller.right_noisemaker = BrownNoiseSource(1)
+    leftSeed, rightSeed = np.random.default_rng(seed).spawn(2)
+    controller.left_noisemaker = BrownNoiseSource(1, seed=leftSeed)
+    controller.right_noisemaker = BrownNoiseSource(1, seed=rightSeed)
 
     # create robot
     robot = fr.ForagingRobot(x=x, y=y, controller=controller, left_food_sources=foodPellets,
@@ -744,55 +558,14 @@ def runNoiseSim(screen_width, controller, animate=True, field_of_view=0.8 * np.p
                              left_poison_sensor_angle=left_sensor_angle,
                              right_poison_sensor_angle=right_sensor_angle,
                              food_field_of_view=field_of_view, poison_field_of_view=field_of_view,
-                             consumables=allPellets, theta=theta, novelty=controller.nov,
+                             consumables=allPellets, theta=theta, novelty=controller.nov, integrator=integrator,
                              )
     robot.generation = generation
     agents = [robot]
 
     arena = Arena(agents, x_left=-20, x_right=20, y_top=20, y_bottom=-20)
 
-    # only run pygame code if animating the simulation
-    if animate:
-        screen = pf.setup_pygame_window(screen_width)
-
-    # animation variables
-    delay = 0  # can be used to slow animation down
-    running = True  # can be used to exit animation early
-    paused = False  # can be used to pause simulation/animation
-
-    # prepare simulation time variables
-    t = 0
-    ts = [t]
-    dt = 0.1
-    # begin simulation main loop
-    while t < duration and running:
-
-        # only move simulation forwards in time if not paused
-        if not paused:
-
-            # step all robots
-            for agent in agents:
-                agent.step(dt)
-
-            for pellet in allPellets:
-                pellet.step(dt)
-
-            arena.step(dt)
-
-            # increment time variable and store in ts list for plotting later
-            t += dt
-            ts.append(t)
-
-        # only run pygame code if animating the simulation
-        if animate:
-            running, paused, delay = pf.pygame_drawsim(screen, agents + allPellets + [arena], screen_width, paused,
-                                                       delay)
-
-    # only run pygame code if animating the simulation
-    if animate:
-        # Quit pygame.
-        pygame.display.quit()
-        pygame.quit()
+    ts = sl.runLoop(agents, allPellets, arena, duration, dt, animate, screen_width, probes)
 
     controller.allScores.append(['noise', robot.foodEaten])
 
@@ -26,6 +26,29 @@ def generatePellets(pelletType, num, spacing, xStart, yStart):
     return [x.stimulus for x in pellets], pellets
 
 
+def randomPelletPositions(food_num, poison_num, scale, seed=None):
+    """
+    Random positions of pellets, drawn in the same way as generateRandomPellets
+    (so they can be used to move existing pellets to the layout of another seed)
+    :param food_num: How many food pellets
+    :param poison_num: How many poison pellets
+    :param scale: Left/right/top/bottom bounds of pellet placement
+    :param seed: Random seed or np.random.Generator, for replicability (defaults to none - fresh entropy)
+    :return: List of (x, y) positions - the food pellets' then the poison pellets'
+    """
+
+    # One generator for all the pellets, so the whole layout is determined by the seed
+    rng = np.random.default_rng(seed)
+
+    positions = []
+    for i in range(food_num + poison_num):
+        x = random_in_interval(-scale, scale, rng=rng)
+        y = random_in_interval(-scale, scale, rng=rng)
+        positions.append((x, y))
+
+    return positions
+
+
 def generateRandomPellets(food_num, poison_num, scale, brightness=3, seed=None):
     """
     Generate randomly placed pellets
@@ -33,10 +56,12 @@ def generateRandomPellets(food_num, poison_num, scale, brightness=3, seed=None):
     :param poison_num: How many poison pellets
     :param scale: Left/right/top/bottom bounds of pellet placement
     :param brightness: How bright the pellets are (how easily robot can find them) - defaults to 3
-    :param seed: Random seed, for replicability (defaults to none)
+    :param seed: Random seed or np.random.Generator, for replicability (defaults to none - fresh entropy)
     :return: List of food stimulus objects, list of pellet stimulus objects, list of all food and poison objects
     """
 
+    positions = randomPelletPositions(food_num, poison_num, scale, seed)
+
     # Stimuli are stored separately as the light source objects which the robot can see
     # Consumable objects are what the robots actually eat/interact with, hence the two different lists
     foods_and_poisons = []   # list of all food and poison objects
@@ -44,18 +69,14 @@ def generateRandomPellets(food_num, poison_num, scale, brightness=3, seed=None):
     poisons_stimuli = []     # list of LightSources attached to poison consumables, used by the robot's poison sensors
 
     # generate food items
-    for i in range(food_num):
-        x = random_in_interval(-scale, scale, seed)
-        y = random_in_interval(-scale, scale, seed)
+    for x, y in positions[:food_num]:
         food = FR.Consumable(x, y, radius=0.5, recovery_time=1e2, quantity=5)
         food.stimulus.brightness = brightness
         foods_and_poisons.append(food)
         foods_stimuli.append(food.stimulus)
 
     # generate poison items
-    for i in range(poison_num):
-        x = random_in_interval(-scale, scale, seed)
-        y = random_in_interval(-scale, scale, seed)
+    for x, y in positions[food_num:]:
         poison = FR.Consumable(x, y, radius=0.5, recovery_time=1e2, quantity=5, real_type=FR.Consumables.poison)
         foods_and_poisons.append(poison)
         poisons_stimuli.append(poison.stimulus)
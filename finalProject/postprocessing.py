@@ -11,12 +11,13 @@ import geneticController as gc
 
 
 
-def do_plots(all_ts, agents, foods_and_poisons):
+def do_plots(all_ts, agents, foods_and_poisons, show=True):
     """
     plot outputs for all robots - provided package
     :param all_ts: List of lists of time steps - one list for each agent in the list of agents provided
     :param agents: List of agents
     :param foods_and_poisons: List of food and pellet objects for plotting
+    :param show: Whether or not to show the plots (False when they're being exported to files instead)
     :return: Four plots
     """
 
@@ -29,7 +30,8 @@ def do_plots(all_ts, agents, foods_and_poisons):
     # plot_all_robots_controllers(all_ts, agents)
     # plot_all_robots_sensors(all_ts, agents)
 
-    plt.show()
+    if show:
+        plt.show()
 
 
 def plotPhaseSpace(allRobots, title):
@@ -129,17 +131,29 @@ def calculateScores(scores):
     return countedList, newCount
 
 
-def plotBarChart():
+def plotBarChart(novelty=None, fitness=None, labels=None,
+                 title="Performance of Novelty vs Fitness-Evolved Controllers\nwith Binary Performance Metric for a "
+                       "Single Run"):
     """
-    Plot bar chart of summary values for run 6
+    Plot bar chart of success rates for novelty and fitness robots in each
+    event - defaults to the summary values for run 6 (analytics.plotSuccessRates
+    computes them from the results store instead)
+    :param novelty: List of novelty success rates, one per event
+    :param fitness: List of fitness success rates, one per event
+    :param labels: List of event labels for the x-axis
+    :param title: Title of the chart
     :return: bar chart
     """
 
-    plt.title("Performance of Novelty vs Fitness-Evolved Controllers\nwith Binary Performance Metric for a Single Run")
+    plt.title(title)
 
     X = ['Foraging\nCompetition I', 'Foraging\nCompetition II', 'Circle of Pellets', 'Shifted Sensors', 'Left Sensor\nElimination', 'Controller Noise']
-    novelty = [0.4, 0.7, 0.45, 0.75, 0.20, 0.7]
-    fitness = [0.3, 0.4, 0.4, 0.8, 0.175, 0.6]
+    if novelty is None:
+        novelty = [0.4, 0.7, 0.45, 0.75, 0.20, 0.7]
+    if fitness is None:
+        fitness = [0.3, 0.4, 0.4, 0.8, 0.175, 0.6]
+    if labels is not None:
+        X = labels
 
     X_axis = np.arange(len(X))
 
@@ -156,83 +170,32 @@ def plotBarChart():
     plt.show()
 
 
-def recordInfo(runNum, fightNov, fightFit, fight2Nov, fight2Fit, circleNov, circleFit, checkNov, checkFit, shiftNov,
-               shiftFit, killNov, killFit, noiseNov, noiseFit, trolls):
-    # Record all relevant info for a run of the olympics and save it to data____.txt
-    # :param ___Nov: The foraging scores of the population of novelty search robots for each event
-    # :param ___Fit: The foraging scores of the population of fitness search robots for each event
-    # :param runNum: What run number it was (to keep track of trials and associate with plots)
-    # :param trolls: List of all the controllers
-    # :return: None
-
-    # Text to be saved. I realized after I did it this way I could have probably used some loops but...too late
-    text = f"----RUN {runNum}---\n" \
-           f"Population Size: {st.LAMBDA}\n\n" \
-           f"Fight Novelty:\n" \
-           f"{fightNov}\n" \
-           f"{len([x for x in fightNov if x == 0]), len([x for x in fightNov if 0 < x <= 5]), len([x for x in fightNov if x > 5])}\n" \
-           f"Fight Fitness:\n" \
-           f"{fightFit}\n" \
-           f"{len([x for x in fightFit if x == 0]), len([x for x in fightFit if 0 < x <= 5]), len([x for x in fightFit if x > 5])}\n" \
-           f"\nFight 2 Novelty:\n" \
-           f"{fight2Nov}\n" \
-           f"{len([x for x in fight2Nov if x == 0]), len([x for x in fight2Nov if 0 < x <= 5]), len([x for x in fight2Nov if x > 5])}\n" \
-           f"Fight 2 Fitness:\n" \
-           f"{fight2Fit}\n" \
-           f"{len([x for x in fight2Fit if x == 0]), len([x for x in fight2Fit if 0 < x <= 5]), len([x for x in fight2Fit if x > 5])}\n" \
-           f"\nCircle Novelty:\n" \
-           f"{circleNov}\n" \
-           f"{len([x for x in circleNov if x == 0]), len([x for x in circleNov if 0 < x <= 15]), len([x for x in circleNov if x > 15])}\n" \
-           f"Circle Fitness:\n" \
-           f"{circleFit}\n" \
-           f"{len([x for x in circleFit if x == 0]), len([x for x in circleFit if 0 < x <= 15]), len([x for x in circleFit if x > 15])}\n" \
-           f"\nCheck Novelty:\n" \
-           f"{checkNov}\n" \
-           f"{len([x for x in checkNov if x == 0]), len([x for x in checkNov if 0 < x <= 15]), len([x for x in checkNov if x > 15])}\n" \
-           f"Check Fitness:\n" \
-           f"{checkFit}\n" \
-           f"{len([x for x in checkFit if x == 0]), len([x for x in checkFit if 0 < x <= 15]), len([x for x in checkFit if x > 15])}\n" \
-           f"\nShift Novelty:\n" \
-           f"{shiftNov}\n" \
-           f"{len([x for x in shiftNov if x == 0]), len([x for x in shiftNov if 0 < x <= 15]), len([x for x in shiftNov if x > 15])}\n" \
-           f"Shift Fitness:\n" \
-           f"{shiftFit}\n" \
-           f"{len([x for x in shiftFit if x == 0]), len([x for x in shiftFit if 0 < x <= 15]), len([x for x in shiftFit if x > 15])}\n" \
-           f"\nKill Novelty:\n" \
-           f"{killNov}\n" \
-           f"{len([x for x in killNov if x == 0]), len([x for x in killNov if 0 < x <= 15]), len([x for x in killNov if x > 15])}\n" \
-           f"Kill Fitness:\n" \
-           f"{killFit}\n" \
-           f"{len([x for x in killFit if x == 0]), len([x for x in killFit if 0 < x <= 15]), len([x for x in killFit if x > 15])}\n" \
-           f"\nNoise Novelty:\n" \
-           f"{noiseNov}\n" \
-           f"{len([x for x in noiseNov if x == 0]), len([x for x in noiseNov if 0 < x <= 15]), len([x for x in noiseNov if x > 15])}\n" \
-           f"Noise Fitness:\n" \
-           f"{noiseFit}\n" \
-           f"{len([x for x in noiseFit if x == 0]), len([x for x in noiseFit if 0 < x <= 15]), len([x for x in noiseFit if x > 15])}\n" \
-           f"\n\n" \
-           f"Controller Scores Novelty:\n" \
-           f"{[[y[1] for y in x.allScores] for x in trolls if x.nov is True]}\n" \
-           f"{[x.allScores for x in trolls if x.nov is True]}\n" \
-           f"{calculateScores([[y[1] for y in x.allScores] for x in trolls if x.nov is True])}\n\n" \
-           f"Controller Scores Fitness:\n" \
-           f"{[[y[1] for y in x.allScores] for x in trolls if x.nov is False]}\n" \
-           f"{[x.allScores for x in trolls if x.nov is False]} \n" \
-           f"{calculateScores([[y[1] for y in x.allScores] for x in trolls if x.nov is False])}\n\n" \
-           f"Average Number of Active Nodes:\n" \
-           f"Novelty: {gc.calculateAvgActiveNodes([x for x in trolls if x.nov is True])}" \
-           f"Fitness: {gc.calculateAvgActiveNodes([x for x in trolls if x.nov is False])}"
-
-    # Save text to a file
-    with open("newData.txt", "a+") as file:
-        # Move read cursor to the start of file.
-        file.seek(0)
-        # If file is not empty then append '\n'
-        data = file.read(100)
-        if len(data) > 0:
-            file.write("\n\n")
-        # Append text at the end of file
-        file.write(text)
+def recordEvent(store, runNum, event, robots, generation=0, dt=0.1):
+    """
+    Record how every robot did in an event as rows in the results store
+    (one row per controller) - called as soon as each event finishes
+    :param store: ResultsStore the rows are appended to
+    :param runNum: What run number it was (to keep track of trials and associate with plots)
+    :param event: Name of the event (from resultsStore.EVENTS)
+    :param robots: List of robots from the event, in the same order as their controllers
+    :param generation: Generation of the robots (0 for the olympics)
+    :param dt: Time step the event was simulated with
+    :return: None
+    """
+    # The olympic events don't set the behavioral score, so make sure every robot has one
+    for robot in robots:
+        robot.setBehScore(dt)
+
+    store.append(run=[runNum] * len(robots),
+                 event=[event] * len(robots),
+                 generation=[generation] * len(robots),
+                 controller=list(range(len(robots))),
+                 novelty=[robot.novelty for robot in robots],
+                 foodEaten=[robot.foodEaten for robot in robots],
+                 activeNodes=[robot.controller.activeNodes for robot in robots],
+                 velSpikes=[robot.behScore[0] for robot in robots],
+                 accSpikes=[robot.behScore[1] for robot in robots],
+                 meanVelocity=[robot.behScore[2] for robot in robots])
 
 
 if __name__ == '__main__':
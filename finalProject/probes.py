@@ -0,0 +1,154 @@
+import numpy as np
+
+
+# Events in a simulation that probes can be called at
+HOOKS = ('preStep', 'postSense', 'postControl', 'consume', 'endOfRun')
+
+
+# Base class for probes - objects that watch a simulation as it runs, for analysis that isn't part of the simulation
+# itself. A probe only overrides the hooks it needs; the simulation loop works out which hooks each probe overrides
+# once, when the simulation is set up, and only calls (or installs anything for) those. A probe can be given to many
+# runs one after the other - setup is called at the start of each
+class Probe:
+
+    def setup(self, robots, pellets, arena, dt):
+        """
+        Called once before a run starts
+        :param robots: List of robots in the run
+        :param pellets: List of consumables in the run
+        :param arena: Arena the robots are in
+        :param dt: Time step of the run
+        :return: None
+        """
+        pass
+
+    def preStep(self, t, robot, state):
+        """
+        Called before each robot is stepped
+        :param t: Simulation time at the start of the step
+        :param robot: Robot about to be stepped
+        :param state: Read-only view of the robot's [x, y, theta] - it changes as the robot moves, so copy it to keep it
+        :return: None
+        """
+        pass
+
+    def postSense(self, t, robot, inputs):
+        """
+        Called after a robot's sensors are stepped, before its controller uses them
+        :param t: Simulation time at the start of the step
+        :param robot: Robot being stepped
+        :param inputs: List of the sensor activations given to the controller (not a copy - don't change it)
+        :return: None
+        """
+        pass
+
+    def postControl(self, t, robot, leftSpeed, rightSpeed):
+        """
+        Called after a robot's controller has decided its motor commands
+        :param t: Simulation time at the start of the step
+        :param robot: Robot being stepped
+        :param leftSpeed: Left motor command
+        :param rightSpeed: Right motor command
+        :return: None
+        """
+        pass
+
+    def consume(self, t, robot, food, poison):
+        """
+        Called when a robot eats something
+        :param t: Simulation time at the start of the step
+        :param robot: Robot that ate
+        :param food: Number of food pellets it ate this step
+        :param poison: Number of poison pellets it ate this step
+        :return: None
+        """
+        pass
+
+    def endOfRun(self, ts, robots, pellets):
+        """
+        Called once the run has finished
+        :param ts: List of simulation times
+        :param robots: List of robots in the run
+        :param pellets: List of consumables in the run
+        :return: None
+        """
+        pass
+
+
+def resolveHooks(probes):
+    """
+    Find which hooks every probe actually overrides
+    :param probes: List of Probe objects
+    :return: Dictionary of hook name -> list of bound methods to call (empty if no probe overrides it)
+    """
+    return {hook: [getattr(probe, hook) for probe in probes if getattr(type(probe), hook) is not getattr(Probe, hook)]
+            for hook in HOOKS}
+
+
+# Records when each robot first ate a food pellet (NaN if it never did) - one array per run in self.runs
+class FirstPelletProbe(Probe):
+
+    def __init__(self):
+        self.runs = []
+
+    def setup(self, robots, pellets, arena, dt):
+        self.index = {id(robot): i for i, robot in enumerate(robots)}
+        self.times = np.full(len(robots), np.nan)
+        self.dt = dt
+
+    def consume(self, t, robot, food, poison):
+        i = self.index[id(robot)]
+        if food > 0 and np.isnan(self.times[i]):
+            self.times[i] = t + self.dt
+
+    def endOfRun(self, ts, robots, pellets):
+        self.runs.append(self.times)
+
+
+# Counts how many times each robot ran into a wall and how long it spent against one - one array of
+# [contacts, time in contact] per robot for each run in self.runs
+class WallContactProbe(Probe):
+
+    def __init__(self, tolerance=1e-6):
+        self.tolerance = tolerance      # How close to a wall (beyond touching it) still counts as contact
+        self.runs = []
+
+    def setup(self, robots, pellets, arena, dt):
+        self.index = {id(robot): i for i, robot in enumerate(robots)}
+        self.arena = arena
+        self.dt = dt
+        self.touching = np.zeros(len(robots), dtype=bool)
+        self.counts = np.zeros((len(robots), 2))
+
+    def preStep(self, t, robot, state):
+        # The arena has already pushed the robot back inside by the start of the step, so it's left touching the wall
+        arena, reach = self.arena, robot.radius + self.tolerance
+        touching = (state[0] - reach <= arena.x_left or state[0] + reach >= arena.x_right or
+                    state[1] - reach <= arena.y_bottom or state[1] + reach >= arena.y_top)
+        i = self.index[id(robot)]
+        if touching:
+            self.counts[i, 0] += not self.touching[i]
+            self.counts[i, 1] += self.dt
+        self.touching[i] = touching
+
+    def endOfRun(self, ts, robots, pellets):
+        self.runs.append(self.counts)
+
+
+# Measures how long each robot spent with no energy (when its motors are stopped) - one array per run in self.runs
+class ZeroEnergyProbe(Probe):
+
+    def __init__(self):
+        self.runs = []
+
+    def setup(self, robots, pellets, arena, dt):
+        self.index = {id(robot): i for i, robot in enumerate(robots)}
+        self.dt = dt
+        self.times = np.zeros(len(robots))
+
+    def preStep(self, t, robot, state):
+        if robot.energy <= 0:
+            self.times[self.index[id(robot)]] += self.dt
+
+    def endOfRun(self, ts, robots, pellets):
+        self.runs.append(self.times)
@@ -0,0 +1,65 @@
+import geneticController as gc
+import postprocessing as pp
+import runHistory as rh
+import main
+
+
+def replay(summary, animate=False, probes=(), verify=True):
+    """
+    Re-simulate a recorded training evaluation from its genotype and scenario,
+    with the robot recording everything as usual - so trajectories only need
+    to exist while they're being looked at
+    :param summary: runHistory.EvaluationSummary of the evaluation
+    :param animate: Whether to animate the replay with pygame
+    :param probes: List of probes.Probe objects to watch the replay
+    :param verify: Whether to check the replay did exactly what the recorded evaluation did (stopping an animation
+    early will fail the check)
+    :return: List of time steps, list of agents, list of pellets (as returned by main.runSimOnce)
+    """
+    if summary.scenario is None:
+        raise ValueError("The evaluation has no scenario recorded, so it can't be replayed")
+
+    controller = gc.fromGenome(summary.genome)
+    ts, robots, pellets = main.runSimOnce(screen_width=700, controller=controller, animate=animate,
+                                          generation=summary.generation, novelty=summary.novelty, probes=probes,
+                                          **summary.scenario)
+
+    if verify and rh.trajectoryChecksum(robots[0]) != summary.checksum:
+        raise RuntimeError(f"Replay of a generation {summary.generation} robot doesn't match its recorded evaluation "
+                           f"(food eaten {robots[0].foodEaten}, recorded {summary.foodEaten}) - the simulation code or "
+                           f"settings must have changed since it was recorded")
+    return ts, robots, pellets
+
+
+def replayAll(summaries, verify=True):
+    """
+    Replay a list of recorded evaluations, collecting the results
+    in the form the plotting functions take
+    :param summaries: List of runHistory.EvaluationSummary objects
+    :param verify: Whether to check every replay against its recorded evaluation
+    :return: List of lists of time steps (one per robot), list of robots, list of pellets of the first replay
+    """
+    all_ts, all_robots, firstPellets = [], [], None
+    for summary in summaries:
+        ts, robots, pellets = replay(summary, verify=verify)
+        all_ts += [ts] * len(robots)
+        all_robots += robots
+        if firstPellets is None:
+            firstPellets = pellets
+    return all_ts, all_robots, firstPellets
+
+
+def plotReplays(summaries, exporter=None, verify=True):
+    """
+    Plot the trajectories of past robots by replaying them - every training
+    robot uses the same pellet layout, so they're drawn on the first one's
+    :param summaries: List of runHistory.EvaluationSummary objects
+    :param exporter: FigureExporter to save the plot in the background (None to show it)
+    :param verify: Whether to check every replay against its recorded evaluation
+    :return: None
+    """
+    all_ts, all_robots, pellets = replayAll(summaries, verify)
+    if exporter is not None:
+        exporter.submit("replay", pp.do_plots, all_ts, all_robots, pellets, False)
+    else:
+        pp.do_plots(all_ts, all_robots, pellets)
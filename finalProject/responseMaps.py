@@ -0,0 +1,276 @@
+import os
+import sys
+import hashlib
+import numpy as np
+
+sys.path.insert(1, '..')
+from situsim_v1_2 import *
+
+
+# Changing how maps are computed must change this, so maps cached on disk by older code aren't used
+MAP_VERSION = 1
+
+# Maps already loaded or computed in this process, by layout hash - robots on the same course share one map
+loadedMaps = {}
+
+
+def layoutHash(lightSources, fieldOfView, bounds, spacing, headingBins):
+    """
+    Hash of everything a response map depends on - the lights (where they are and how
+    they decay), the sensors' field of view and the grid - to cache maps by
+    :param lightSources: List of LightSource objects
+    :param fieldOfView: Field of view of the sensors
+    :param bounds: (x_left, x_right, y_bottom, y_top) of the grid
+    :param spacing: Distance between grid points
+    :param headingBins: Number of sensor headings in the grid
+    :return: Hash as a hex string
+    """
+    layout = [MAP_VERSION, float(fieldOfView), [float(x) for x in bounds], float(spacing), int(headingBins)]
+    layout += [[float(s.x), float(s.y), float(s.brightness), s.model, float(s.gradient)] for s in lightSources]
+    return hashlib.sha1(repr(layout).encode()).hexdigest()
+
+
+# Every light's contribution to a light sensor's activation, precomputed over a grid of sensor positions and headings.
+# With the lights fixed in place, a sensor's activation only depends on where it is, which way it's facing, and which
+# lights are on - so it becomes a lookup (trilinear interpolation between the 8 grid points around the sensor's pose)
+# and a sum over the lights that are on.
+#
+# Error bound: the brightness of a light is smooth away from it, so between grid points the interpolated brightness
+# is off by at most spacing^2 / 4 times the largest second derivative of the light's brightness over the cell (for the
+# inverse square model, the larger of 6b / (d + 1)^4 and 2b / (d (d + 1)^3) at the nearest the cell gets to the light,
+# d - linear and binary lights are flat apart from the linear one's cutoff). Whether a light is in the field of view
+# isn't smooth, though: a light within a heading step (plus the angle the cell takes up, seen from the light) of an
+# edge of the field of view can be blended between in and out of view, so for those lights the error can be as large
+# as their brightness. errorBound works out the sum of both for any pose and set of lights. The error
+# shrinks with finer spacing and more heading bins, at the cost of memory (x points * y points * headings * lights)
+class ResponseMap:
+
+    def __init__(self, lightSources, fieldOfView, bounds=(-20, 20, -20, 20), spacing=0.5, headingBins=36):
+        """
+        Constructor method - computes the map (see getResponseMap to use a cached one)
+        :param lightSources: List of LightSource objects, which mustn't move
+        :param fieldOfView: Field of view of the sensors the map is for
+        :param bounds: (x_left, x_right, y_bottom, y_top) of the grid - sensors outside it use its edge
+        :param spacing: Distance between grid points
+        :param headingBins: Number of sensor headings in the grid (1 if the field of view is the full circle)
+        """
+        self.fieldOfView = fieldOfView
+        self.bounds = bounds
+        self.spacing = spacing
+        self.headingBins = 1 if fieldOfView >= 2 * np.pi else headingBins
+        self.xs = np.arange(bounds[0], bounds[1] + spacing / 2, spacing)
+        self.ys = np.arange(bounds[2], bounds[3] + spacing / 2, spacing)
+        self.headings = np.arange(self.headingBins) * 2 * np.pi / self.headingBins
+        self.lightX = np.array([source.x for source in lightSources], dtype=float)
+        self.lightY = np.array([source.y for source in lightSources], dtype=float)
+        self.lightSources = lightSources
+        self.values = None      # (x points, y points, headings, lights) array of brightness - set by compute or load
+
+    def compute(self):
+        """
+        Work out every light's brightness at every grid point and
+        heading (zero where the light is out of the field of view)
+        :return: None
+        """
+        dx = self.lightX[None, None, :] - self.xs[:, None, None]
+        dy = self.lightY[None, None, :] - self.ys[None, :, None]
+        dist = np.hypot(dx, dy)
+        brightness = np.stack([source.get_brightness_at_distance(dist[:, :, i])
+                               for i, source in enumerate(self.lightSources)], axis=-1) if self.lightSources else dist
+        values = np.empty((len(self.xs), len(self.ys), self.headingBins, len(self.lightSources)), dtype=np.float32)
+        bearing = np.arctan2(dy, dx)
+        for h, heading in enumerate(self.headings):
+            values[:, :, h, :] = brightness * self.inView(bearing, heading)
+        self.values = values
+
+    def inView(self, bearing, heading):
+        """
+        Whether lights at the given bearings are in the field of view of a sensor
+        facing heading - the same test as LightSensor.step, on arrays
+        :param bearing: Array of angles from the sensor to the lights
+        :param heading: Heading of the sensor
+        :return: Boolean array
+        """
+        if self.headingBins == 1:
+            return np.ones_like(bearing, dtype=bool)
+        diff = (bearing - heading) % (2 * np.pi)
+        diff = np.where(diff > np.pi, diff - 2 * np.pi, diff)
+        return np.abs(diff) <= self.fieldOfView / 2
+
+    def corners(self, x, y, heading):
+        """
+        Find the grid cell a sensor pose is in, and the weights of its corners
+        :param x: x position of the sensor
+        :param y: y position of the sensor
+        :param heading: Heading of the sensor
+        :return: x index, y index, the two heading indices, (2, 2, 2) array of corner weights
+        """
+        fx = min(max((x - self.bounds[0]) / self.spacing, 0), len(self.xs) - 1)
+        fy = min(max((y - self.bounds[2]) / self.spacing, 0), len(self.ys) - 1)
+        ix, iy = min(int(fx), len(self.xs) - 2), min(int(fy), len(self.ys) - 2)
+        tx, ty = fx - ix, fy - iy
+
+        fh = (heading % (2 * np.pi)) / (2 * np.pi) * self.headingBins
+        ih = int(fh) % self.headingBins
+        th = fh - int(fh)
+        weights = (np.array([1 - tx, tx])[:, None, None] * np.array([1 - ty, ty])[None, :, None] *
+                   np.array([1 - th, th])[None, None, :])
+        return ix, iy, [ih, (ih + 1) % self.headingBins], weights
+
+    def lookup(self, x, y, heading, on):
+        """
+        Get a sensor's activation from the map
+        :param x: x position of the sensor
+        :param y: y position of the sensor
+        :param heading: Heading of the sensor
+        :param on: Boolean array of which lights are on (not depleted)
+        :return: Activation
+        """
+        ix, iy, ih, weights = self.corners(x, y, heading)
+        cell = self.values[ix:ix + 2, iy:iy + 2][:, :, ih]
+        return float(np.tensordot(weights, cell, 3) @ on)
+
+    def errorBound(self, x, y, heading, on):
+        """
+        The most the looked up activation can be off from the exact one at a pose (see the class comment)
+        :param x: x position of the sensor
+        :param y: y position of the sensor
+        :param heading: Heading of the sensor
+        :param on: Boolean array of which lights are on
+        :return: Error bound
+        """
+        ix, iy, _, _ = self.corners(x, y, heading)
+        # Nearest each light gets to the cell
+        cellX = np.clip(self.lightX, self.xs[ix], self.xs[ix + 1])
+        cellY = np.clip(self.lightY, self.ys[iy], self.ys[iy + 1])
+        nearest = np.hypot(self.lightX - cellX, self.lightY - cellY)
+        brightest = np.array([source.get_brightness_at_distance(d) for source, d in zip(self.lightSources, nearest)])
+
+        # Interpolating the smooth brightness - the second derivatives (radial, and across the bearing) are largest
+        # nearest the light. A light inside the cell isn't smooth there at all, so it's counted like an edge below
+        d = np.maximum(nearest, 1e-9)
+        curvature = np.array([max(6 / (r + 1) ** 4, 2 / (r * (r + 1) ** 3)) * source.brightness
+                              if source.model == 'inv_sq' else 0 for source, r in zip(self.lightSources, d)])
+        smooth = self.spacing ** 2 / 4 * curvature
+
+        # Lights near an edge of the field of view can be blended between in and out of view
+        edge = nearest == 0
+        if self.headingBins > 1:
+            bearing = np.arctan2(self.lightY - y, self.lightX - x)
+            margin = 2 * np.pi / self.headingBins + np.arctan2(self.spacing * np.sqrt(2), np.maximum(nearest, 1e-9))
+            for side in [-1, 1]:
+                diff = (bearing - heading - side * self.fieldOfView / 2) % (2 * np.pi)
+                diff = np.where(diff > np.pi, diff - 2 * np.pi, diff)
+                edge |= np.abs(diff) <= margin
+        return float(np.where(edge, brightest, smooth) @ on)
+
+    def save(self, path):
+        """
+        Save the map's values
+        :param path: Path of the .npy file
+        :return: None
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.save(path, self.values)
+
+    def load(self, path):
+        """
+        Load the map's values (saved by save, for the same layout)
+        :param path: Path of the .npy file
+        :return: None
+        """
+        self.values = np.load(path)
+
+
+def getResponseMap(lightSources, fieldOfView, folder="responseMaps", bounds=(-20, 20, -20, 20), spacing=0.5,
+                   headingBins=36):
+    """
+    Get the response map for a layout of lights - from memory if it's been
+    used already in this process, then from the folder, or else computed
+    (and saved in the folder for next time)
+    :param lightSources: List of LightSource objects
+    :param fieldOfView: Field of view of the sensors
+    :param folder: Folder maps are cached in (None to not cache them on disk)
+    :param bounds: (x_left, x_right, y_bottom, y_top) of the grid
+    :param spacing: Distance between grid points
+    :param headingBins: Number of sensor headings in the grid
+    :return: ResponseMap object
+    """
+    key = layoutHash(lightSources, fieldOfView, bounds, spacing, headingBins)
+    if key in loadedMaps:
+        cached = loadedMaps[key]
+        # The same layout can be made from different LightSource objects - share the values but not the lights
+        responseMap = ResponseMap(lightSources, fieldOfView, bounds, spacing, headingBins)
+        responseMap.values = cached.values
+        return responseMap
+
+    responseMap = ResponseMap(lightSources, fieldOfView, bounds, spacing, headingBins)
+    path = os.path.join(folder, key + ".npy") if folder is not None else None
+    if path is not None and os.path.exists(path):
+        responseMap.load(path)
+    else:
+        responseMap.compute()
+        if path is not None:
+            responseMap.save(path)
+    loadedMaps[key] = responseMap
+    return responseMap
+
+
+# A LightSensor whose activation is looked up from a ResponseMap instead of adding up every light - for lights that
+# don't move. The lights being on or off (e.g. pellets being eaten) is still taken into account on every step
+class MappedLightSensor(LightSensor):
+
+    def __init__(self, light_sources, x, y, theta=0, field_of_view=2 * np.pi, noisemaker=None, responseMap=None,
+                 trackError=False):
+        """
+        Constructor method
+        :param light_sources: List of LightSource objects (the ones the map was made for, in the same order)
+        :param responseMap: ResponseMap for the lights and field of view
+        :param trackError: Whether to work out the error bound of every lookup (for checking a map is fine enough -
+        it costs as much as sensing exactly)
+        """
+        super().__init__(light_sources, x, y, theta, field_of_view, noisemaker)
+        self.responseMap = responseMap
+        self.trackError = trackError
+        self.errorBounds = []       # Error bound of every lookup, if trackError
+
+    def reset(self, x=None, y=None, theta=None):
+        super().reset(x, y, theta)
+        self.errorBounds = []
+
+    def step(self, dt):
+        System.step(self, dt)       # Store xy-coordinates and theta (LightSensor.step is replaced entirely)
+        on = np.fromiter((source.is_on for source in self.light_sources), dtype=float, count=len(self.light_sources))
+        self.activation = self.responseMap.lookup(self.x, self.y, self.theta, on) if len(on) else 0
+        if self.trackError and len(on):
+            self.errorBounds.append(self.responseMap.errorBound(self.x, self.y, self.theta, on))
+
+        # add noise, if a noisemaker is implemented
+        if self.noisemaker is not None:
+            self.activation += self.noisemaker.step(dt)
+
+        self.activations.append(self.activation)
+        return self.activation
+
+
+def useResponseMaps(robot, folder="responseMaps", spacing=0.5, headingBins=36, bounds=(-20, 20, -20, 20)):
+    """
+    Swap a ForagingRobot's four light sensors for MappedLightSensors with the same
+    lights, field of view and noise - call it before the robot is first stepped
+    :param robot: ForagingRobot object
+    :param folder: Folder maps are cached in (None to not cache them on disk)
+    :param spacing: Distance between grid points
+    :param headingBins: Number of sensor headings in the grid
+    :param bounds: (x_left, x_right, y_bottom, y_top) of the grid - should cover the arena
+    :return: None
+    """
+    for name in ['left_sensor', 'right_sensor', 'left_poison_sensor', 'right_poison_sensor']:
+        sensor = getattr(robot, name)
+        responseMap = getResponseMap(sensor.light_sources, sensor.field_of_view, folder, bounds, spacing, headingBins)
+        mapped = MappedLightSensor(sensor.light_sources, sensor.x, sensor.y, sensor.theta, sensor.field_of_view,
+                                   sensor.noisemaker, responseMap)
+        mapped.color = sensor.color
+        setattr(robot, name, mapped)
+    # the food and poison pairs are no longer stepped together, as the mapped sensors each look up their own maps
+    robot.left_multi_sensor = None
+    robot.right_multi_sensor = None
@@ -0,0 +1,135 @@
+import os
+import numpy as np
+
+
+# Every event a controller can be scored in. The position in the tuple is the code saved in the store's event column,
+# so new events must only ever be added to the end
+EVENTS = ('training', 'fight', 'fight2', 'circle', 'check', 'shift', 'kill', 'noise')
+
+# Name and data type of every column in the store - one row is one controller in one event of one run
+COLUMNS = {
+    'run': np.int32,            # Run number the row belongs to
+    'event': np.uint8,          # Index of the event in EVENTS
+    'generation': np.int32,     # Generation of the controller (0 for the olympics)
+    'controller': np.int32,     # Index of the controller in its population/olympic team
+    'novelty': np.bool_,        # Whether the controller was evolved with novelty search (False means fitness)
+    'foodEaten': np.int32,      # How many food pellets the robot ate
+    'activeNodes': np.int32,    # Number of active nodes in the controller's graph (-1 if unknown)
+    'velSpikes': np.int32,      # Behavioral score - number of velocity spikes
+    'accSpikes': np.int32,      # Behavioral score - number of acceleration spikes
+    'meanVelocity': np.float64  # Behavioral score - mean velocity
+}
+
+
+# An append-only, column-oriented store of results. Each column is its own raw binary file in the store's folder, so
+# adding rows only appends to the ends of the files and reading only touches the columns that are asked for
+class ResultsStore:
+
+    def __init__(self, path="results"):
+        """
+        Constructor method
+        :param path: Folder the column files are kept in (created if it doesn't exist)
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def columnPath(self, column):
+        """
+        Get the path of the file that holds a column
+        :param column: Name of the column (key in COLUMNS)
+        :return: Path to the column's file
+        """
+        return os.path.join(self.path, column + ".bin")
+
+    def __len__(self):
+        """
+        Number of complete rows in the store - if a write was interrupted part way
+        through, the columns that got the extra values are ignored past this point
+        :return: Number of rows
+        """
+        lengths = []
+        for column, dtype in COLUMNS.items():
+            path = self.columnPath(column)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            lengths.append(size // np.dtype(dtype).itemsize)
+        return min(lengths)
+
+    def append(self, **values):
+        """
+        Append one or more rows to the store. Every column must be given,
+        either as single values (one row) or as equal length lists
+        :param values: Column name = value(s). Events may be given by name or by code
+        :return: None
+        """
+        missing = set(COLUMNS) - set(values)
+        if missing:
+            raise ValueError(f"Missing columns: {sorted(missing)}")
+
+        values['event'] = eventCodes(values['event'])
+        arrays = {column: np.atleast_1d(np.asarray(values[column], dtype=dtype)) for column, dtype in COLUMNS.items()}
+        if len({len(x) for x in arrays.values()}) != 1:
+            raise ValueError("All columns must have the same number of values")
+
+        # Drop whatever an interrupted write left past the last complete row, so the new rows line up in every column
+        self.truncate()
+        for column, array in arrays.items():
+            with open(self.columnPath(column), "ab") as file:
+                array.tofile(file)
+
+    def truncate(self):
+        """
+        Cut every column file back to the number of complete rows
+        :return: None
+        """
+        n = len(self)
+        for column, dtype in COLUMNS.items():
+            path = self.columnPath(column)
+            if os.path.exists(path) and os.path.getsize(path) > n * np.dtype(dtype).itemsize:
+                os.truncate(path, n * np.dtype(dtype).itemsize)
+
+    def read(self, columns=None, **filters):
+        """
+        Read columns from the store, keeping only the rows that match every filter.
+        Columns are memory-mapped, so only the filter columns and the returned
+        rows are actually read from disk
+        :param columns: List of column names to return (defaults to all of them)
+        :param filters: Column name = value, or list of accepted values (e.g. event=['fight', 'fight2'], novelty=True)
+        :return: Dictionary of column name -> numpy array
+        """
+        if columns is None:
+            columns = list(COLUMNS)
+        n = len(self)
+
+        mask = np.ones(n, dtype=bool)
+        for column, accepted in filters.items():
+            if column == 'event':
+                accepted = eventCodes(accepted)
+            mask &= np.isin(self.column(column, n), accepted)
+
+        return {column: self.column(column, n)[mask] for column in columns}
+
+    def column(self, column, n=None):
+        """
+        Memory-map a single column
+        :param column: Name of the column
+        :param n: Number of rows to map (defaults to the number of complete rows)
+        :return: Read-only numpy array of the column
+        """
+        if n is None:
+            n = len(self)
+        if n == 0:
+            return np.zeros(0, dtype=COLUMNS[column])
+        return np.memmap(self.columnPath(column), dtype=COLUMNS[column], mode='r', shape=(n,))
+
+
+def eventCodes(events):
+    """
+    Convert event names to their codes in EVENTS (codes are left as they are)
+    :param events: Single event or list of events
+    :return: Code or array of codes
+    """
+    if isinstance(events, str):
+        return EVENTS.index(events)
+    if np.ndim(events) == 0:
+        return events
+    return np.array([EVENTS.index(x) if isinstance(x, str) else x for x in events], dtype=np.uint8)
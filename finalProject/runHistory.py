@@ -0,0 +1,45 @@
+import hashlib
+import numpy as np
+
+
+# A compact record of one robot's evaluation - everything the rest of a run needs once the simulation is over, without
+# the trajectories, sensors, motors and controller the robot itself holds on to. __slots__ stops each record having its
+# own dictionary, so hundreds of generations of them take up very little memory. With the genotype, the scenario it
+# was run in and a checksum of its trajectory, the whole evaluation can be re-simulated exactly when it's needed (see
+# replay.py) rather than kept
+class EvaluationSummary:
+
+    __slots__ = ('generation', 'novelty', 'behScore', 'foodEaten', 'energy', 'activeNodes', 'genome', 'scenario',
+                 'checksum')
+
+    def __init__(self, robot, scenario=None):
+        """
+        Constructor method
+        :param robot: ForagingRobot that has finished its simulation (with its behavioral score set)
+        :param scenario: Dictionary of the keyword arguments main.runSimOnce was given (seed, duration, dt...) -
+        shared between summaries, so don't change it. None if the evaluation can't be replayed
+        """
+        self.generation = robot.generation              # Generation the robot was evaluated in
+        self.novelty = robot.novelty                    # Whether it was evolved with novelty search
+        self.behScore = robot.behScore                  # [velocity spikes, acceleration spikes, mean velocity]
+        self.foodEaten = robot.foodEaten                # Food pellets eaten
+        self.energy = robot.energy                      # Energy at the end of the simulation
+        self.activeNodes = robot.controller.activeNodes     # Active nodes in the controller's graph
+        self.genome = robot.controller.getGenome()      # Genotype of the controller, to rebuild it for a replay
+        self.scenario = scenario                        # How the simulation was set up, to replay it
+        self.checksum = trajectoryChecksum(robot)       # Checksum of the trajectory, to check a replay against
+
+
+def trajectoryChecksum(robot):
+    """
+    Checksum of everything a robot did in a simulation - its
+    trajectory, energy and food eaten - which only matches
+    if another simulation did exactly the same
+    :param robot: ForagingRobot that has finished its simulation
+    :return: Checksum as a hex string
+    """
+    digest = hashlib.sha1()
+    for history in [robot.xs, robot.ys, robot.thetas, robot.energies]:
+        digest.update(np.asarray(history, dtype=float).tobytes())
+    digest.update(np.array([robot.foodEaten, robot.poisonEaten], dtype=np.int64).tobytes())
+    return digest.hexdigest()
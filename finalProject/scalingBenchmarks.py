@@ -0,0 +1,250 @@
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+import tracemalloc
+import types
+import numpy as np
+import matplotlib.pyplot as plt
+import pelletGenerator as pg
+import foragingRobot as fr
+import geneticController as gc
+import novelty as nv
+import settings as st
+import benchmarks as bm
+import main
+
+sys.path.insert(1, '..')
+from situsim_extensions.arena import *
+
+
+# Every sweep point sets up its own objects (with fixed seeds) and returns the function to measure and how many units of
+# work it does, so that throughput can be compared between points
+def pelletsPoint(numPellets, steps=20):
+    # One robot in the full 40x40 arena with numPellets pellets spread over it
+    pellets = pg.generateRandomPellets(numPellets, 0, 20, seed=42)
+    robot = bm.makeRobot(gc.GeneticController(rng=np.random.default_rng(1)), pellets)
+    arena = Arena([robot], x_left=-20, x_right=20, y_top=20, y_bottom=-20)
+    scheduler = fr.RecoveryScheduler(pellets[2], 0.1)
+
+    def run():
+        for _ in range(steps):
+            robot.step(0.1)
+            scheduler.step(0.1)
+            arena.step(0.1)
+
+    return run, steps
+
+
+def robotsPoint(numRobots, steps=20):
+    # numRobots robots sharing the training course, as in the olympic fights
+    pellets = pg.generateRandomPellets(25, 0, 10, seed=42)
+    rng = np.random.default_rng(1)
+    robots = [bm.makeRobot(gc.GeneticController(rng=rng), pellets) for _ in range(numRobots)]
+    arena = MultiAgentArena(robots, x_left=-20, x_right=20, y_top=20, y_bottom=-20)
+    scheduler = fr.RecoveryScheduler(pellets[2], 0.1)
+
+    def run():
+        for _ in range(steps):
+            for robot in robots:
+                robot.step(0.1)
+            scheduler.step(0.1)
+            arena.step(0.1)
+
+    return run, steps * numRobots
+
+
+def populationPoint(popSize, duration=10):
+    # One whole generation - every controller run on the training course, then novelty scoring and evolution
+    def run():
+        rng = np.random.default_rng(2)
+        population = gc.createPopulation(popSize, rng)
+        robots = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for controller in population:
+                robots += main.runSimOnce(screen_width=700, controller=controller, animate=False, duration=duration)[1]
+        nv.Novelty().getNoveltyScores(robots, 1, rng)
+        gc.evolve(population, robots, st.MUT_PB, min(st.MU, popSize), popSize, rng=rng)
+
+    return run, popSize * round(duration / 0.1)
+
+
+def nColsPoint(nCols, steps=50):
+    # One robot whose controller has nCols nodes - the graph size is read from settings when a controller is made
+    oldCols, oldLevels = st.N_COLS, st.LEVEL_BACK
+    st.N_COLS, st.LEVEL_BACK = nCols, nCols
+    try:
+        robot = bm.makeRobot(gc.GeneticController(rng=np.random.default_rng(1)))
+    finally:
+        st.N_COLS, st.LEVEL_BACK = oldCols, oldLevels
+
+    def run():
+        for _ in range(steps):
+            robot.step(0.1)
+
+    return run, steps
+
+
+def archivePoint(archiveSize, popSize=20):
+    # Novelty scoring of one generation against an archive of archiveSize behaviors
+    rng = np.random.default_rng(3)
+    archive = [[int(a), int(b), c] for a, b, c in zip(rng.integers(0, 300, archiveSize),
+                                                      rng.integers(0, 400, archiveSize), rng.random(archiveSize))]
+    pop = [types.SimpleNamespace(behScore=score, controller=types.SimpleNamespace()) for score in archive[:popSize]]
+
+    def run():
+        novelty = nv.Novelty()
+        novelty.behArchive = list(archive)
+        novelty.getNoveltyScores(pop, 0, rng)
+
+    return run, popSize
+
+
+# Name of every sweep -> (label of the swept parameter, values swept over, function making a point, unit of work)
+SWEEPS = {
+    'pellets': ('Pellets in arena', [25, 100, 400, 1600, 10000], pelletsPoint, 'step'),
+    'robots': ('Robots per arena', [1, 5, 25, 100, 200], robotsPoint, 'robot step'),
+    'population': ('Population size', [5, 10, 20, 40, 80], populationPoint, 'robot step'),
+    'nCols': ('Nodes per controller (N_COLS)', [25, 50, 100, 200, 400, 800], nColsPoint, 'step'),
+    'archive': ('Novelty archive size', [100, 300, 1000, 3000, 10000, 30000], archivePoint, 'robot')
+}
+
+
+def measurePoint(makePoint, value, memory=True):
+    """
+    Measure one point of a sweep. Timing and memory are measured in separate
+    runs, because tracemalloc slows Python down too much for the timings to be
+    trusted while it's tracing
+    :param makePoint: Function returning (function to measure, units of work it does)
+    :param value: Value of the swept parameter
+    :param memory: Whether to measure peak memory
+    :return: Wall time in seconds, peak memory in bytes (NaN if not measured), units of work per second
+    """
+    run, units = makePoint(value)
+    start = time.perf_counter()
+    run()
+    wallTime = time.perf_counter() - start
+
+    peak = np.nan
+    if memory:
+        # The point is set up again inside the trace, so the memory its objects take up is counted
+        tracemalloc.start()
+        run, _ = makePoint(value)
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return wallTime, peak, units / wallTime
+
+
+def fitExponent(values, measurements):
+    """
+    Fit measurement = a * value^k by least squares on a log-log scale
+    :param values: Values of the swept parameter
+    :param measurements: Measurement at each value
+    :return: Exponent k, coefficient a (NaN for both if there are fewer than 2 usable points)
+    """
+    values, measurements = np.asarray(values, dtype=float), np.asarray(measurements, dtype=float)
+    usable = np.isfinite(measurements) & (measurements > 0)
+    if usable.sum() < 2:
+        return np.nan, np.nan
+    k, logA = np.polyfit(np.log(values[usable]), np.log(measurements[usable]), 1)
+    return k, np.exp(logA)
+
+
+def runSweeps(names=None, memory=True, maxPoints=None):
+    """
+    Run the scaling sweeps and fit complexity curves to them
+    :param names: Names of the sweeps to run (keys in SWEEPS) - defaults to all of them
+    :param memory: Whether to measure peak memory
+    :param maxPoints: Only run the first maxPoints values of each sweep (for a quick check)
+    :return: Dictionary of sweep name -> dictionary of results
+    """
+    results = {}
+    for name in names or SWEEPS:
+        label, values, makePoint, unit = SWEEPS[name]
+        values = values[:maxPoints]
+        points = []
+        for value in values:
+            points.append(measurePoint(makePoint, value, memory))
+            print(f"{name:<12}{value:>8}{points[-1][0]:>10.3f}s{points[-1][1] / 1e6:>10.2f}MB"
+                  f"{points[-1][2]:>14,.0f} {unit}/s")
+
+        wallTimes, peaks, throughputs = [list(x) for x in zip(*points)]
+        results[name] = {'label': label, 'unit': unit, 'values': values, 'wallTime': wallTimes, 'peakMemory': peaks,
+                         'throughput': throughputs, 'timeExponent': fitExponent(values, wallTimes)[0],
+                         'memoryExponent': fitExponent(values, peaks)[0]}
+    return results
+
+
+def printExponents(results):
+    """
+    Print the fitted exponents of every sweep, most steeply scaling first - the
+    subsystem at the top is the one that breaks first as experiments grow
+    :param results: Dictionary returned by runSweeps
+    :return: None
+    """
+    print(f"{'Sweep':<12}{'Time ~ n^k':>12}{'Memory ~ n^k':>14}")
+    for name, result in sorted(results.items(), key=lambda x: -np.nan_to_num(x[1]['timeExponent'], nan=-np.inf)):
+        print(f"{name:<12}{result['timeExponent']:>12.2f}{result['memoryExponent']:>14.2f}")
+
+
+def plotScaling(results):
+    """
+    Log-log plots of wall time and peak memory against every swept
+    parameter, with the fitted complexity curves
+    :param results: Dictionary returned by runSweeps
+    :return: The figure
+    """
+    fig, axes = plt.subplots(2, len(results), figsize=(4 * len(results), 7), squeeze=False)
+
+    for col, (name, result) in enumerate(results.items()):
+        values = np.asarray(result['values'], dtype=float)
+        fitValues = np.geomspace(values.min(), values.max(), 50)
+
+        for row, (key, ylabel) in enumerate([('wallTime', 'Wall time (s)'), ('peakMemory', 'Peak memory (bytes)')]):
+            ax = axes[row, col]
+            ax.loglog(values, result[key], 'o', color='darkblue')
+            k, a = fitExponent(values, result[key])
+            if np.isfinite(k):
+                ax.loglog(fitValues, a * fitValues ** k, '--', color='darkred', label=f"~ n^{k:.2f}")
+                ax.legend()
+            ax.set_xlabel(result['label'])
+            ax.set_ylabel(ylabel)
+        axes[0, col].set_title(name)
+
+    fig.suptitle("Scaling of the Simulation")
+    fig.tight_layout()
+    return fig
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Sweep the size of each part of an experiment and fit how it scales")
+    parser.add_argument('names', nargs='*', metavar='SWEEP', help=f"sweeps to run (from {list(SWEEPS)}, default all)")
+    parser.add_argument('--out', default='scaling.json', help="JSON file the results are saved to")
+    parser.add_argument('--no-memory', action='store_true', help="skip the (slower) peak memory measurements")
+    parser.add_argument('--max-points', type=int, default=None, help="only run the first few values of each sweep")
+    parser.add_argument('--plot', nargs='?', const='', default=None, metavar='FILE',
+                        help="plot the complexity curves (saved to FILE if given, otherwise shown)")
+    args = parser.parse_args()
+
+    unknown = set(args.names) - set(SWEEPS)
+    if unknown:
+        parser.error(f"unknown sweeps: {sorted(unknown)} (choose from {list(SWEEPS)})")
+
+    allResults = runSweeps(args.names, not args.no_memory, args.max_points)
+    print()
+    printExponents(allResults)
+
+    with open(args.out, "w") as file:
+        json.dump(allResults, file, indent=4)
+    print("Results saved to", args.out)
+
+    if args.plot is not None:
+        figure = plotScaling(allResults)
+        if args.plot:
+            figure.savefig(args.plot)
+        else:
+            plt.show()
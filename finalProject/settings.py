@@ -9,3 +9,41 @@ LAMBDA = 20                  # Size of the population
 NUM_NOV_BOTS = 10            # How many good novelty robots you want to compete in the olympics
 NUM_FIT_BOTS = 10            # How many good fitness robots you want to compete in the olympics
 FOOD_THRESH = 10             # How many food pieces a robot has to eat to be considered good
+
+HEADLESS = False             # Save every plot to files in the background instead of showing it (for unattended runs)
+FIGURE_DIR = "figures"       # Folder the figures (and the index of them) are saved to when HEADLESS is True
+
+RUN_NUMBER = 5               # Run number - set for each trial to tell runs apart in the results store
+RESULTS_DIR = "results"      # Folder of the results store every run's scores are appended to
+
+SEED = None                  # Master seed for a run - None draws a fresh one (printed at the start so it can be reused)
+
+DT = 0.1                     # Simulation time step - with the 'arc' integrator it can be raised for fewer steps per run
+INTEGRATOR = 'euler'         # 'euler', or 'arc' for exact arcs and swept pellet contact (accurate at larger dt)
+
+STAGE_TIMERS = False         # Time every stage of the simulation loop and report it with each generation's summary
+
+MEMORY_ACCOUNTING = False    # Report the memory held by each part of the run (trajectories, archive...) every generation
+MEMORY_BUDGET = 4e9          # Warn when the memory held goes over this many bytes (None for no budget)
+
+TRAJECTORY_DIR = None        # Folder of the archive every training robot's full trajectories are saved to (None for none)
+TRAJECTORY_DTYPE = 'float32' # Data type trajectories are archived as ('float32', or 'float64' for full precision)
+TRAJECTORY_DELTA = False     # Delta encode archived trajectories (each value saved as the step from the one before)
+
+PHASE_SPACE_DENSITY = False  # Plot the phase spaces as density grids built up each generation (for huge runs)
+PHASE_SPACE_BINS = 50        # Number of bins in each dimension of the phase space density grids
+
+OCCUPANCY = False            # Bin where the training robots go into a grid over the arena, and plot heatmaps of it
+OCCUPANCY_CELLS = 80         # Number of cells along each side of the occupancy grid
+OCCUPANCY_WINDOW = 25        # Number of generations in each heatmap (0 for the whole run in one)
+
+RESPONSE_MAPS = False        # Training robots' light sensors look up precomputed maps of the fixed course (approximate)
+RESPONSE_MAP_DIR = "responseMaps"   # Folder response maps are cached in, by a hash of the pellet layout
+RESPONSE_MAP_SPACING = 0.5   # Distance between points of the response maps' position grid
+RESPONSE_MAP_HEADINGS = 36   # Number of sensor headings in the response maps
+
+SENSOR_ARRAY = 0             # Number of food sensors in a ring around the training robots (0 for the usual pair)
+
+OCCLUSION = False            # Robots and pellets block light from the robots' sensors in the olympic fight events
+
+REUSE_CONTEXTS = True        # Reset each training robot, its pellets and arena for every run instead of building new ones
@@ -0,0 +1,97 @@
+import numpy as np
+import resultsStore as rs
+
+
+def controllerScoreMatrix(table, events=rs.EVENTS[1:]):
+    """
+    Arrange the results table as one row per controller (per run) and one
+    column per event
+    :param table: Dictionary of column name -> numpy array (from analytics.loadRuns)
+    :param events: Events to include as columns (defaults to all olympic events)
+    :return: Scores array (controllers x events, 0 where missing), boolean array of which scores
+    are present, boolean array of whether each controller is novelty-evolved
+    """
+    codes = np.array([rs.EVENTS.index(event) for event in events])
+    keep = np.isin(table['event'], codes)
+
+    store = table['store'][keep] if 'store' in table else np.zeros(keep.sum(), dtype=np.int64)
+    keys = np.stack([store, table['run'][keep], table['controller'][keep]], axis=1).astype(np.int64)
+    _, row = np.unique(keys, axis=0, return_inverse=True)
+    row = row.ravel()
+    column = np.searchsorted(codes, table['event'][keep])
+
+    numControllers = row.max() + 1 if len(row) > 0 else 0
+    scores = np.zeros((numControllers, len(codes)))
+    present = np.zeros((numControllers, len(codes)), dtype=bool)
+    novelty = np.zeros(numControllers, dtype=bool)
+
+    scores[row, column] = table['foodEaten'][keep]
+    present[row, column] = True
+    novelty[row] = table['novelty'][keep]
+
+    return scores, present, novelty
+
+
+def groupMeans(weights, scores, present):
+    """
+    Mean score of every event for many weightings of the controllers at once
+    (one matrix multiply for all the resamples)
+    :param weights: Array (resamples x controllers) - how many times each controller is counted in each resample
+    :param scores: Array (controllers x events)
+    :param present: Boolean array (controllers x events) of which scores exist
+    :return: Array (resamples x events) of mean scores
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (weights @ (scores * present)) / (weights @ present)
+
+
+def compareNoveltyFitness(table, events=rs.EVENTS[1:], numResamples=10000, ci=0.95, rng=None):
+    """
+    Test whether novelty-evolved controllers eat more than fitness-evolved ones
+    in each event. The confidence interval of the difference in means comes from
+    bootstrapping controllers within each group, and the p-value from a two-sided
+    permutation test of the novelty/fitness labels. Every resample for every event
+    is done in a single pass of NumPy matrix operations
+    :param table: Dictionary of column name -> numpy array (from analytics.loadRuns)
+    :param events: Events to test (defaults to all olympic events)
+    :param numResamples: Number of bootstrap resamples and of permutations
+    :param ci: Width of the confidence interval (0.95 gives a 95% interval)
+    :param rng: np.random.Generator to draw resamples from (or a seed) - fresh entropy if None
+    :return: List of [event, novelty mean, fitness mean, difference, CI low, CI high, p-value] for every event
+    """
+    rng = np.random.default_rng(rng)
+    scores, present, novelty = controllerScoreMatrix(table, events)
+    novScores, novPresent = scores[novelty], present[novelty]
+    fitScores, fitPresent = scores[~novelty], present[~novelty]
+
+    # Observed difference in means (novelty - fitness)
+    novMeans = groupMeans(np.ones((1, len(novScores))), novScores, novPresent)[0]
+    fitMeans = groupMeans(np.ones((1, len(fitScores))), fitScores, fitPresent)[0]
+    observed = novMeans - fitMeans
+
+    # Bootstrap - resampling a group with replacement is the same as drawing multinomial counts for its controllers
+    novWeights = rng.multinomial(len(novScores), np.full(len(novScores), 1 / len(novScores)), size=numResamples)
+    fitWeights = rng.multinomial(len(fitScores), np.full(len(fitScores), 1 / len(fitScores)), size=numResamples)
+    bootDiffs = groupMeans(novWeights, novScores, novPresent) - groupMeans(fitWeights, fitScores, fitPresent)
+    low, high = np.nanpercentile(bootDiffs, [100 * (1 - ci) / 2, 100 * (1 + ci) / 2], axis=0)
+
+    # Permutation test - shuffle which controllers are labelled novelty, keeping the group sizes the same
+    labels = rng.permuted(np.tile(novelty, (numResamples, 1)), axis=1).astype(np.float64)
+    permDiffs = groupMeans(labels, scores, present) - groupMeans(1 - labels, scores, present)
+    extreme = (np.abs(permDiffs) >= np.abs(observed) - 1e-12).sum(axis=0)
+    pValues = (extreme + 1) / (numResamples + 1)
+
+    return [[event, novMeans[e], fitMeans[e], observed[e], low[e], high[e], pValues[e]]
+            for e, event in enumerate(events)]
+
+
+def printSignificance(results, ci=0.95):
+    """
+    Print the results of compareNoveltyFitness as a table
+    :param results: List returned by compareNoveltyFitness
+    :param ci: Width of the confidence interval that was used (for the heading)
+    :return: None
+    """
+    print(f"{'Event':<10}{'Nov mean':>10}{'Fit mean':>10}{'Nov - Fit':>11}{f'{ci:.0%} CI':>20}{'p-value':>10}")
+    for event, novMean, fitMean, diff, low, high, p in results:
+        print(f"{event:<10}{novMean:>10.2f}{fitMean:>10.2f}{diff:>11.2f}{f'[{low:.2f}, {high:.2f}]':>20}{p:>10.4f}")
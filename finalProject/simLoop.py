@@ -0,0 +1,181 @@
+import sys
+import pygameFunctions as pf
+import probes as pr
+import foragingRobot as fr
+
+sys.path.insert(1, '..')
+from situsim_v1_2 import *
+
+
+def replaceMethod(obj, name, method, replaced):
+    """
+    Replace a method on a single object, remembering what was there so it can be put back
+    :param obj: Object whose method is replaced
+    :param name: Name of the method
+    :param method: New method
+    :param replaced: List the [object, name, previous instance attribute or None] is added to
+    :return: None
+    """
+    replaced.append([obj, name, vars(obj).get(name)])
+    setattr(obj, name, method)
+
+
+def restoreMethods(replaced):
+    """
+    Undo replaceMethod, most recent first
+    :param replaced: List filled in by replaceMethod
+    :return: None
+    """
+    for obj, name, previous in reversed(replaced):
+        if previous is None:
+            delattr(obj, name)
+        else:
+            setattr(obj, name, previous)
+    replaced.clear()
+
+
+def hookController(robot, postSense, postControl, now):
+    """
+    Make a controller step method that calls the postSense and postControl hooks around the controller's own step
+    :param robot: Robot whose controller is hooked
+    :param postSense: List of postSense hooks
+    :param postControl: List of postControl hooks
+    :param now: One element list holding the current simulation time
+    :return: The new step method
+    """
+    step = robot.controller.step
+
+    def hooked(inputs, dt):
+        for hook in postSense:
+            hook(now[0], robot, inputs)
+        leftSpeed, rightSpeed = step(inputs, dt)
+        for hook in postControl:
+            hook(now[0], robot, leftSpeed, rightSpeed)
+        return leftSpeed, rightSpeed
+
+    return hooked
+
+
+def hookEat(robot, consume, now):
+    """
+    Make a robot eat method that calls the consume hooks when the robot eats anything
+    :param robot: ForagingRobot whose eat method is hooked
+    :param consume: List of consume hooks
+    :param now: One element list holding the current simulation time
+    :return: The new eat method
+    """
+    eat = robot.eat
+
+    def hooked(*args):
+        food, poison = robot.foodEaten, robot.poisonEaten
+        eat(*args)
+        if robot.foodEaten != food or robot.poisonEaten != poison:
+            for hook in consume:
+                hook(now[0], robot, robot.foodEaten - food, robot.poisonEaten - poison)
+
+    return hooked
+
+
+def runLoop(agents, pellets, arena, duration, dt=0.1, animate=False, screen_width=700, probes=(), timers=None):
+    """
+    The simulation main loop shared by training and every olympic event -
+    steps the robots, then the pellets, then the arena, until the duration is up
+    :param agents: List of robots
+    :param pellets: List of (static) consumables - a RecoveryScheduler recovers them, instead of them being stepped
+    :param arena: Arena the robots are kept in
+    :param duration: Duration of the simulation
+    :param dt: Time step
+    :param animate: Whether to animate the simulation with pygame
+    :param screen_width: Width of the pygame window
+    :param probes: List of probes.Probe objects to call as the simulation runs
+    :param timers: StageTimers to add the time of every stage to (None for no timing)
+    :return: List of time steps
+    """
+    # Work out once which hooks are needed, and only install those - with no probes the loop is the same as ever
+    hooks = pr.resolveHooks(probes)
+    preStep = hooks['preStep']
+    now = [0]               # Current time, shared with the installed hooks
+    replaced = []           # Methods replaced for the hooks, to put back at the end
+
+    # Pellets only need touching when they're due to recover, so they're left to a scheduler rather than stepped
+    scheduler = fr.RecoveryScheduler(pellets, dt)
+
+    if timers is not None:
+        timers.attach(agents, [scheduler], arena)
+
+    for probe in probes:
+        probe.setup(agents, pellets, arena, dt)
+    for robot in agents:
+        if hooks['postSense'] or hooks['postControl']:
+            replaceMethod(robot.controller, 'step',
+                          hookController(robot, hooks['postSense'], hooks['postControl'], now), replaced)
+        if hooks['consume']:
+            replaceMethod(robot, 'eat', hookEat(robot, hooks['consume'], now), replaced)
+
+    # Probes get read-only views of the robots' states, which stay current because states are updated in place
+    states = []
+    for robot in agents:
+        states.append(robot.state.view())
+        states[-1].flags.writeable = False
+
+    # only run pygame code if animating the simulation
+    if animate:
+        screen = pf.setup_pygame_window(screen_width)
+
+    # animation variables
+    delay = 0           # can be used to slow animation down
+    running = True      # can be used to exit animation early
+    paused = False      # can be used to pause simulation/animation
+
+    # prepare simulation time variables
+    t = 0
+    ts = [t]
+
+    try:
+        # begin simulation main loop
+        while t < duration and running:
+
+            # only move simulation forwards in time if not paused
+            if not paused:
+                now[0] = t
+
+                # step all robots
+                if preStep:
+                    for agent, state in zip(agents, states):
+                        for hook in preStep:
+                            hook(t, agent, state)
+                        agent.step(dt)
+                else:
+                    for agent in agents:
+                        agent.step(dt)
+
+                # Recover any consumable pellets that are due to
+                scheduler.step(dt)
+
+                arena.step(dt)      # Step arena (needed in case robot hits the wall)
+
+                # increment time variable and store in ts list for plotting later
+                t += dt
+                ts.append(t)
+
+            # only run pygame code if animating the simulation
+            if animate:
+                running, paused, delay = pf.pygame_drawsim(screen, agents + pellets + [arena], screen_width, paused,
+                                                           delay)
+    finally:
+        # Everything installed on the robots has to be gone before they're copied or pickled
+        restoreMethods(replaced)
+        scheduler.close()
+        if timers is not None:
+            timers.detach()
+
+    # only run pygame code if animating the simulation
+    if animate:
+        # Quit pygame.
+        pygame.display.quit()
+        pygame.quit()
+
+    for hook in hooks['endOfRun']:
+        hook(ts, agents, pellets)
+
+    return ts
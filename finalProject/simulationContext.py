@@ -0,0 +1,111 @@
+import sys
+
+import pelletGenerator as pg
+import foragingRobot as fr
+import responseMaps as rm
+import settings as st
+
+sys.path.insert(1, '..')
+from situsim_extensions.arena import *
+
+# Where every training robot starts
+START_X = -12
+START_Y = 0
+START_THETA = 0
+
+# The course every training robot is run on - 25 food pellets in a centered, 10x10 space in the arena
+FOOD_NUM = 25
+POISON_NUM = 0
+PELLET_SCALE = 10
+
+
+# Everything a training simulation runs in besides the controller - the robot (with its sensors and motors), the
+# pellets and the arena - built once and reset in place for every run, instead of being built again each time. A
+# reset puts the robot back at the start with a new controller and cleared records, and puts the pellets back
+# (moving them if the seed of the layout has changed), so a run in a reset context is the same as one in a new context
+class SimulationContext:
+
+    def __init__(self, field_of_view=0.8 * np.pi, left_sensor_angle=np.pi / 3, right_sensor_angle=-np.pi / 3, seed=42,
+                 integrator='euler', responseMaps=False, sensorAngles=None):
+        """
+        Constructor method
+        :param field_of_view: Field of view of sensors
+        :param left_sensor_angle: Angle of left sensor on robot body
+        :param right_sensor_angle: Angle of right sensor on robot body
+        :param seed: Random seed of the pellet layout it starts with
+        :param integrator: 'euler', or 'arc' for exact arcs and swept pellet contact
+        :param responseMaps: Whether the robot's light sensors look their activations up from precomputed response maps
+        :param sensorAngles: Angles of a ring of sensors for an ArrayForagingRobot (None for a ForagingRobot)
+        """
+        if sensorAngles is not None and responseMaps:
+            raise ValueError("Response maps are only made for the pair of sensors, not sensor arrays")
+
+        # Kept to check that runs are asked for with the same set up as the context was built with
+        self.scenario = dict(field_of_view=field_of_view, left_sensor_angle=left_sensor_angle,
+                             right_sensor_angle=right_sensor_angle, integrator=integrator, responseMaps=responseMaps,
+                             sensorAngles=sensorAngles)
+        self.seed = seed
+        self.responseMaps = responseMaps
+
+        foodPellets, poisonPellets, self.pellets = pg.generateRandomPellets(FOOD_NUM, POISON_NUM, PELLET_SCALE,
+                                                                            seed=seed)
+
+        # The controller is given to the robot by reset
+        if sensorAngles is not None:
+            self.robot = fr.ArrayForagingRobot(x=START_X, y=START_Y, controller=None, food_sources=foodPellets,
+                                               poison_sources=poisonPellets, consumables=self.pellets,
+                                               sensor_angles=sensorAngles, field_of_view=field_of_view,
+                                               theta=START_THETA, integrator=integrator)
+        else:
+            self.robot = fr.ForagingRobot(x=START_X, y=START_Y, controller=None, left_food_sources=foodPellets,
+                                          right_food_sources=foodPellets, left_poison_sources=poisonPellets,
+                                          right_poison_sources=poisonPellets,
+                                          left_food_sensor_angle=left_sensor_angle,
+                                          right_food_sensor_angle=right_sensor_angle,
+                                          left_poison_sensor_angle=left_sensor_angle,
+                                          right_poison_sensor_angle=right_sensor_angle,
+                                          food_field_of_view=field_of_view, poison_field_of_view=field_of_view,
+                                          consumables=self.pellets, theta=START_THETA, integrator=integrator)
+        if responseMaps:
+            rm.useResponseMaps(self.robot, st.RESPONSE_MAP_DIR, st.RESPONSE_MAP_SPACING, st.RESPONSE_MAP_HEADINGS)
+
+        # Create an arena so the robot is confined to the space
+        self.arena = Arena([self.robot], x_left=-20, x_right=20, y_top=20, y_bottom=-20)
+
+    def matches(self, **scenario):
+        """
+        Check whether runs with the given set up can be done in this context
+        :param scenario: Any of the constructor's parameters besides seed
+        :return: Boolean
+        """
+        return all(self.scenario[key] == value for key, value in scenario.items())
+
+    def reset(self, controller, seed=42, generation=0, novelty=False):
+        """
+        Put everything back to the start of a run, for another controller
+        :param controller: Controller object to put in the robot
+        :param seed: Random seed of the pellet layout
+        :param generation: What generation the robot is
+        :param novelty: Whether or not novelty is being implemented
+        :return: List of agents, list of pellets, arena
+        """
+        # Move the pellets to the layout of the new seed, which needs new response maps too
+        if seed != self.seed:
+            positions = pg.randomPelletPositions(FOOD_NUM, POISON_NUM, PELLET_SCALE, seed)
+            for pellet, (x, y) in zip(self.pellets, positions):
+                pellet.reset(x, y)
+            self.seed = seed
+            if self.responseMaps:
+                rm.useResponseMaps(self.robot, st.RESPONSE_MAP_DIR, st.RESPONSE_MAP_SPACING, st.RESPONSE_MAP_HEADINGS)
+        else:
+            for pellet in self.pellets:
+                pellet.reset()
+
+        self.robot.reset(START_X, START_Y, START_THETA, controller)
+        self.robot.set_novelty(novelty)
+        # Set the controller's novelty - I don't love how this is done, but it works and its fragile now
+        self.robot.controller.nov = novelty
+        self.robot.generation = generation      # Set what generation the robot is
+        self.arena.reset()
+
+        return [self.robot], self.pellets, self.arena
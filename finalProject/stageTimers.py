@@ -0,0 +1,115 @@
+import time
+
+
+# Stages of a simulation step that are timed, in the order they happen
+STAGES = ('sensing', 'controller', 'motors', 'integration', 'consumption', 'pellets', 'arena')
+
+
+def sensingSteps(robot):
+    """
+    The sensors a robot steps in its control method - a co-located food and poison
+    pair is stepped as one multi-channel sensor, which steps its channels itself
+    :param robot: ForagingRobot object - an ArrayForagingRobot steps its sensor arrays instead
+    :return: List of sensors
+    """
+    if hasattr(robot, 'food_sensor_array'):
+        return [robot.food_sensor_array, robot.poison_sensor_array, robot.energy_sensor]
+    sensors = []
+    for multi, food, poison in [(robot.left_multi_sensor, robot.left_sensor, robot.left_poison_sensor),
+                                (robot.right_multi_sensor, robot.right_sensor, robot.right_poison_sensor)]:
+        sensors += [multi] if multi is not None else [food, poison]
+    return sensors + [robot.energy_sensor]
+
+
+# Times every stage of the simulation loop by wrapping the methods that do each stage on the simulated objects
+# themselves. Nothing is changed in the classes, so when no timers are attached the simulation runs exactly as it
+# always did, with no extra cost. Timers must be detached before any of the objects are copied or pickled, because the
+# wrappers hold on to the original objects' methods
+class StageTimers:
+
+    def __init__(self):
+        """
+        Constructor method
+        """
+        self.times = {stage: 0.0 for stage in STAGES}   # Total time spent in each stage (seconds)
+        self.calls = {stage: 0 for stage in STAGES}     # Total number of calls of each stage
+        self.evaluations = []       # List of {stage: time} for every finished evaluation
+        self.wrapped = []           # List of [object, method name] for every method wrapped by attach
+        self.evalStart = dict(self.times)   # Stage times when the current evaluation began
+
+    def wrap(self, obj, name, stage):
+        """
+        Replace a method on a single object with one that
+        times it and counts its calls
+        :param obj: Object whose method is timed
+        :param name: Name of the method
+        :param stage: Stage the time and calls are added to
+        :return: None
+        """
+        # Objects shared between robots (e.g. pellets) only need wrapping once
+        if name in vars(obj):
+            return
+
+        method = getattr(obj, name)
+        times, calls, clock = self.times, self.calls, time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            result = method(*args, **kwargs)
+            times[stage] += clock() - start
+            calls[stage] += 1
+            return result
+
+        setattr(obj, name, timed)
+        self.wrapped.append([obj, name])
+
+    def attach(self, robots, pellets, arena=None):
+        """
+        Start timing the stages of a simulation
+        :param robots: List of ForagingRobot objects
+        :param pellets: List of what's stepped for the pellets in the simulation loop (a RecoveryScheduler, or
+        Consumable objects)
+        :param arena: Arena object (if there is one)
+        :return: None
+        """
+        self.evalStart = dict(self.times)
+        for robot in robots:
+            for sensor in sensingSteps(robot):
+                self.wrap(sensor, 'step', 'sensing')
+            self.wrap(robot.controller, 'step', 'controller')
+            self.wrap(robot.left_motor, 'step', 'motors')
+            self.wrap(robot.right_motor, 'step', 'motors')
+            self.wrap(robot, 'integrate', 'integration')
+            self.wrap(robot, 'eat', 'consumption')
+        for pellet in pellets:
+            self.wrap(pellet, 'step', 'pellets')
+        if arena is not None:
+            self.wrap(arena, 'step', 'arena')
+
+    def detach(self):
+        """
+        Stop timing - put every wrapped method back to the class's
+        own one, and record the times of the evaluation that just finished
+        :return: None
+        """
+        for obj, name in self.wrapped:
+            delattr(obj, name)
+        self.wrapped = []
+        self.evaluations.append({stage: self.times[stage] - self.evalStart[stage] for stage in STAGES})
+
+    def report(self, title="Stage timings"):
+        """
+        Print the total time, calls and mean time per call of every stage,
+        with the mean time per evaluation and each stage's share of the total
+        :param title: Heading printed above the table
+        :return: None
+        """
+        total = sum(self.times.values())
+        numEvals = max(len(self.evaluations), 1)
+        print(f"{title} ({len(self.evaluations)} evaluations, {total:.3f}s timed):")
+        print(f"{'Stage':<14}{'Calls':>10}{'Total (s)':>12}{'Per call (us)':>15}{'Per eval (ms)':>15}{'Share':>8}")
+        for stage in STAGES:
+            perCall = self.times[stage] / self.calls[stage] * 1e6 if self.calls[stage] else 0
+            share = self.times[stage] / total if total else 0
+            print(f"{stage:<14}{self.calls[stage]:>10}{self.times[stage]:>12.3f}{perCall:>15.2f}"
+                  f"{self.times[stage] / numEvals * 1e3:>15.2f}{share:>8.0%}")
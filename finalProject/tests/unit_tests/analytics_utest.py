@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from testcase import MyTestCase
+import analytics as an
+import resultsStore as rs
+
+# two runs in the format recordInfo wrote, with the other lines it wrote between the event scores
+LEGACY_LOG = """----RUN 5---
+Population Size: 20
+Fight Novelty:
+[0, 2, 0]
+(8, 1, 1)
+Fight Fitness:
+[1, 0]
+(4, 6, 0)
+
+Circle Novelty:
+[3, 0, 4]
+(5, 1, 4)
+Circle Fitness:
+[0, 0]
+(6, 1, 3)
+
+Controller Scores Novelty:
+[1, 2, 0]
+----RUN 5---
+Population Size: 20
+Fight 2 Novelty:
+[7]
+(3, 4, 3)
+Fight 2 Fitness:
+[0, 5]
+(6, 4, 0)
+"""
+
+# write text to a file in a new folder, and return its path
+def write_log(text, name="data.txt"):
+    path = os.path.join(tempfile.mkdtemp(), name)
+    with open(path, "w") as file:
+        file.write(text)
+    return path
+
+class Test_parseLegacyLog(MyTestCase):
+
+    def test_parse(self):
+
+        runs = an.parseLegacyLog(write_log(LEGACY_LOG))
+        self.assertEqual(runs, [['5', {'fight': [[0, 2, 0], [1, 0]], 'circle': [[3, 0, 4], [0, 0]]}],
+                                ['5', {'fight2': [[7], [0, 5]]}]])
+
+    def test_malformed(self):
+
+        # headings that can't be read aren't left out without a word
+        for text in ["----RUN 1---\nFight Novelty:\n(8, 1, 1)\n", "----RUN 1---\nFight Novelty:\n[0, 1\n",
+                     "----RUN 1---\nFight Novelty:\n", "Fight Novelty:\n[0, 1]\n"]:
+            with self.assertRaises(ValueError):
+                an.parseLegacyLog(write_log(text))
+
+class Test_importLegacyLogs(MyTestCase):
+
+    def test_import(self):
+
+        store = rs.ResultsStore(tempfile.mkdtemp())
+        store.append(run=3, event='fight', generation=0, controller=0, novelty=True, foodEaten=1, activeNodes=2,
+                     velSpikes=0, accSpikes=0, meanVelocity=0)
+        paths = [write_log(LEGACY_LOG, "data3.txt"), write_log(LEGACY_LOG, "data5.txt")]
+
+        # every run gets a new number after the largest already in the store, though the logs reuse their numbers
+        imported = an.importLegacyLogs(paths, store)
+        self.assertEqual(imported, [[paths[0], '5', 4], [paths[0], '5', 5], [paths[1], '5', 6], [paths[1], '5', 7]])
+
+        table = store.read(run=4)
+        self.assertTrue(np.array_equal(table['event'], [1] * 5 + [3] * 5))
+        self.assertTrue(np.array_equal(table['controller'], [0, 1, 2, 3, 4] * 2))
+        self.assertTrue(np.array_equal(table['novelty'], [True, True, True, False, False] * 2))
+        self.assertTrue(np.array_equal(table['foodEaten'], [0, 2, 0, 1, 0, 3, 0, 4, 0, 0]))
+        self.assertTrue(np.all(table['activeNodes'] == -1) and np.all(np.isnan(table['meanVelocity'])))
+        self.assertEqual(len(store), 1 + 2 * 13)
+
+        # given a first run number, it starts there
+        other = rs.ResultsStore(tempfile.mkdtemp())
+        self.assertEqual([run for _, _, run in an.importLegacyLogs(paths[:1], other, firstRun=10)], [10, 11])
+
+    def test_summaries(self):
+
+        store = rs.ResultsStore(tempfile.mkdtemp())
+        an.importLegacyLogs([write_log(LEGACY_LOG)], store)
+        table = an.loadRuns([store.path])
+
+        # events each controller ate in: run 0 has fight and circle, run 1 has fight2
+        scored = an.eventsScored(table)
+        self.assertTrue(np.array_equal(scored['run'], [0] * 5 + [1] * 3))
+        self.assertTrue(np.array_equal(scored['controller'], [0, 1, 2, 3, 4, 0, 1, 2]))
+        self.assertTrue(np.array_equal(scored['novelty'], [True, True, True, False, False, True, False, False]))
+        self.assertTrue(np.array_equal(scored['eventsScored'], [1, 1, 1, 1, 0, 1, 0, 1]))
+
+        # successful fraction of novelty and fitness controllers in each event
+        rates = an.successRates(table)
+        fight, fight2, circle = [rs.EVENTS.index(event) for event in ['fight', 'fight2', 'circle']]
+        self.assertTrue(np.allclose(rates[fight], [1 / 3, 1 / 2]))
+        self.assertTrue(np.allclose(rates[fight2], [1, 1 / 2]))
+        self.assertTrue(np.allclose(rates[circle], [2 / 3, 0]))
+        self.assertTrue(np.all(np.isnan(rates[rs.EVENTS.index('noise')])))
+
+if __name__ == '__main__':
+    unittest.main()
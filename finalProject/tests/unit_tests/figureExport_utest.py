@@ -0,0 +1,41 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from testcase import MyTestCase
+import figureExport as fe
+
+# plotting functions for the jobs - module level, so they can be sent to the workers
+def plotLine(n):
+    import matplotlib.pyplot as plt
+    for _ in range(n):
+        plt.figure()
+        plt.plot([0, 1], [0, 1])
+
+def plotBroken():
+    raise ValueError("no data")
+
+class Test_FigureExporter(MyTestCase):
+
+    def test_index(self):
+
+        exporter = fe.FigureExporter(tempfile.mkdtemp(), workers=1)
+        exporter.submit('line', plotLine, 2)
+        exporter.submit('broken', plotBroken)
+        exporter.submit('line', plotLine, 1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            indexPath = exporter.close()
+
+        # a failed job is recorded in the index, and doesn't lose the figures of the others
+        with open(indexPath) as file:
+            index = json.load(file)
+        self.assertEqual(index['broken'], {'error': "ValueError: no data"})
+        self.assertEqual(len(index['line']), 2)
+        self.assertEqual(len(index['line_1']), 1)
+        for path in index['line'] + index['line_1']:
+            self.assertTrue(os.path.exists(path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import itertools
+import unittest
+from testcase import MyTestCase
+import foragingRobot as fr
+
+# steps on which each of the pellets is eaten (if it's there to be eaten)
+EAT_STEPS = [[2, 150, 160], [2, 40], [57], [], [0, 1, 2, 3]]
+
+# pellets that start already depleted, and how long ago they were eaten
+PRE_DEPLETED = {3: 0.5, 4: 2.05}
+
+
+# make a set of pellets, some of them already depleted
+def make_pellets(recovery_time):
+    pellets = [fr.Consumable(i, 0, recovery_time=recovery_time) for i in range(len(EAT_STEPS))]
+    for i, elapsed in PRE_DEPLETED.items():
+        pellets[i].consume()
+        pellets[i].time_since_consumed = elapsed
+    return pellets
+
+
+class Test_RecoveryScheduler(MyTestCase):
+
+    def test_same_as_stepping(self):
+
+        # closing part way through leaves some pellets still waiting to recover
+        for (recovery_time, dt), last_step in itertools.product([(10, 0.1), (3, 0.3), (7, 0.7), (2.5, 0.1)],
+                                                                [45, 199]):
+            stepped = make_pellets(recovery_time)
+            scheduled = make_pellets(recovery_time)
+            scheduler = fr.RecoveryScheduler(scheduled, dt)
+
+            for step in range(200):
+                # the robots' part of the step, then the pellets' part, as in the simulation loop
+                for i, steps in enumerate(EAT_STEPS):
+                    if step in steps:
+                        stepped[i].consume()
+                        scheduled[i].consume()
+                for pellet in stepped:
+                    pellet.step(dt)
+                scheduler.step(dt)
+
+                for a, b in zip(stepped, scheduled):
+                    self.assertEqual(a.depleted, b.depleted, (recovery_time, dt, step))
+                    self.assertEqual(a.stimulus.is_on, b.stimulus.is_on, (recovery_time, dt, step))
+
+                if step == last_step:
+                    break
+
+            scheduler.close()
+            for a, b in zip(stepped, scheduled):
+                self.assertNear(a.time_since_consumed, b.time_since_consumed, tol=1E-9)
+                self.assertTrue(b.scheduler is None)
+
+    def test_recover_after_close(self):
+
+        # pellets carry on recovering when they're stepped on their own again
+        for recovery_time, dt in [(10, 0.1), (3, 0.3), (7, 0.7)]:
+            stepped = make_pellets(recovery_time)
+            scheduled = make_pellets(recovery_time)
+            scheduler = fr.RecoveryScheduler(scheduled, dt)
+            for _ in range(3):
+                for pellet in stepped:
+                    pellet.step(dt)
+                scheduler.step(dt)
+            scheduler.close()
+
+            for step in range(200):
+                for a, b in zip(stepped, scheduled):
+                    a.step(dt)
+                    b.step(dt)
+                    self.assertEqual(a.depleted, b.depleted, (recovery_time, dt, step))
+
+if __name__ == '__main__':
+    unittest.main()
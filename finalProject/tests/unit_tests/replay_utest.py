@@ -0,0 +1,58 @@
+import contextlib
+import io
+import unittest
+import numpy as np
+from testcase import MyTestCase
+import geneticController as gc
+import runHistory as rh
+import simulationContext as sc
+import replay as rp
+import main
+
+# record a short training evaluation, as main.runSim does
+def record(integrator='euler', context=None):
+    controller = gc.createPopulation(1, np.random.default_rng(11))[0]
+    scenario = dict(field_of_view=0.8 * np.pi, left_sensor_angle=np.pi / 3, right_sensor_angle=-np.pi / 3,
+                    duration=10, seed=42, dt=0.1, integrator=integrator, responseMaps=False, sensorAngles=None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, robots, _ = main.runSimOnce(screen_width=700, controller=controller, animate=False, generation=3,
+                                       novelty=True, context=context, **scenario)
+    return rh.EvaluationSummary(robots[0], scenario)
+
+# replay quietly
+def replay(summary):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return rp.replay(summary)
+
+class Test_replay(MyTestCase):
+
+    def test_matches_recording(self):
+
+        # evaluations run in a reused context replay the same as ones run in a new one
+        for integrator, context in [('euler', None), ('arc', None), ('euler', sc.SimulationContext())]:
+            summary = record(integrator, context)
+            _, robots, _ = replay(summary)
+            self.assertEqual(rh.trajectoryChecksum(robots[0]), summary.checksum)
+            self.assertEqual(robots[0].foodEaten, summary.foodEaten)
+            self.assertEqual(robots[0].generation, 3)
+
+    def test_changed_checksum(self):
+
+        summary = record()
+        summary.checksum = summary.checksum[::-1]
+        with self.assertRaises(RuntimeError):
+            replay(summary)
+
+        # unless it isn't checked
+        with contextlib.redirect_stdout(io.StringIO()):
+            rp.replay(summary, verify=False)
+
+    def test_no_scenario(self):
+
+        summary = record()
+        summary.scenario = None
+        with self.assertRaises(ValueError):
+            replay(summary)
+
+if __name__ == '__main__':
+    unittest.main()
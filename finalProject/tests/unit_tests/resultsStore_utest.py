@@ -0,0 +1,74 @@
+import tempfile
+import unittest
+import numpy as np
+from testcase import MyTestCase
+import resultsStore as rs
+
+# one row of every column, with the given values changed
+def row(**values):
+    return dict(dict(run=1, event='fight', generation=0, controller=0, novelty=True, foodEaten=3, activeNodes=4,
+                     velSpikes=1, accSpikes=2, meanVelocity=0.5), **values)
+
+class Test_ResultsStore(MyTestCase):
+
+    def test_round_trip(self):
+
+        store = rs.ResultsStore(tempfile.mkdtemp())
+        store.append(**row())
+        rows = row(run=[2, 2, 3], event=['training', 'fight2', 2], controller=[0, 1, 2], novelty=[False, True, False],
+                   foodEaten=[7, 8, 9], meanVelocity=[0.1, 0.2, 0.3])
+        store.append(**{column: value if isinstance(value, list) else [value] * 3 for column, value in rows.items()})
+        self.assertEqual(len(store), 4)
+
+        table = store.read()
+        self.assertTrue(np.array_equal(table['run'], [1, 2, 2, 3]))
+        self.assertTrue(np.array_equal(table['event'], [1, 0, 2, 2]))
+        self.assertTrue(np.array_equal(table['foodEaten'], [3, 7, 8, 9]))
+        self.assertTrue(np.array_equal(table['meanVelocity'], [0.5, 0.1, 0.2, 0.3]))
+
+        # filters on single values and on lists of accepted values
+        self.assertTrue(np.array_equal(store.read(['foodEaten'], run=2)['foodEaten'], [7, 8]))
+        self.assertTrue(np.array_equal(store.read(['foodEaten'], event=['fight', 'fight2'])['foodEaten'], [3, 8, 9]))
+        self.assertTrue(np.array_equal(store.read(['run'], novelty=False, event='fight2')['run'], [3]))
+
+        # a row missing a column, or columns of different lengths, are refused
+        with self.assertRaises(ValueError):
+            store.append(**{column: value for column, value in row().items() if column != 'run'})
+        with self.assertRaises(ValueError):
+            store.append(**row(run=[1, 2]))
+        self.assertEqual(len(store), 4)
+
+    def test_interrupted_write(self):
+
+        store = rs.ResultsStore(tempfile.mkdtemp())
+        store.append(**row(foodEaten=3))
+
+        # a write that stopped part way through: some columns got a value, one got part of one
+        for column in ['run', 'event', 'generation']:
+            with open(store.columnPath(column), "ab") as file:
+                np.asarray([9], dtype=rs.COLUMNS[column]).tofile(file)
+        with open(store.columnPath('meanVelocity'), "ab") as file:
+            file.write(b'\x01\x02\x03')
+        self.assertEqual(len(store), 1)
+
+        # the next append lines up with the complete rows in every column
+        store.append(**row(run=2, generation=5, foodEaten=7, meanVelocity=0.25))
+        self.assertEqual(len(store), 2)
+        table = store.read()
+        self.assertTrue(np.array_equal(table['run'], [1, 2]))
+        self.assertTrue(np.array_equal(table['generation'], [0, 5]))
+        self.assertTrue(np.array_equal(table['foodEaten'], [3, 7]))
+        self.assertTrue(np.array_equal(table['meanVelocity'], [0.5, 0.25]))
+
+    def test_empty(self):
+
+        store = rs.ResultsStore(tempfile.mkdtemp())
+        self.assertEqual(len(store), 0)
+        table = store.read(run=1)
+        self.assertEqual(set(table), set(rs.COLUMNS))
+        for column, dtype in rs.COLUMNS.items():
+            self.assertEqual(len(table[column]), 0)
+            self.assertEqual(table[column].dtype, np.dtype(dtype))
+
+if __name__ == '__main__':
+    unittest.main()
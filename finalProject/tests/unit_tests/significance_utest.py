@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+from testcase import MyTestCase
+import significance as sg
+
+EVENTS = ['fight', 'circle']
+
+# results table of 10 novelty and 10 fitness controllers in every event, with the given scores for each group
+def make_table(novScores, fitScores):
+    rows = [(controller, event, novelty, score)
+            for novelty, scores in [(True, novScores), (False, fitScores)]
+            for controller, score in enumerate(scores, start=0 if novelty else len(novScores))
+            for event in EVENTS]
+    controller, event, novelty, foodEaten = zip(*rows)
+    return {'run': np.ones(len(rows), dtype=np.int32), 'controller': np.array(controller),
+            'event': np.array([sg.rs.EVENTS.index(name) for name in event]), 'novelty': np.array(novelty),
+            'foodEaten': np.array(foodEaten)}
+
+SCORES = [3, 5, 2, 8, 4, 6, 1, 7, 5, 3]
+
+class Test_compareNoveltyFitness(MyTestCase):
+
+    def test_identical_groups(self):
+
+        results = sg.compareNoveltyFitness(make_table(SCORES, SCORES), EVENTS, numResamples=2000, rng=1)
+        for event, novMean, fitMean, diff, low, high, p in results:
+            self.assertEqual(diff, 0)
+            self.assertTrue(low <= 0 <= high)
+            self.assertTrue(p > 0.9)
+
+    def test_large_shift(self):
+
+        results = sg.compareNoveltyFitness(make_table([score + 10 for score in SCORES], SCORES), EVENTS,
+                                           numResamples=2000, rng=1)
+        for event, novMean, fitMean, diff, low, high, p in results:
+            self.assertNear(diff, 10)
+            self.assertTrue(0 < low <= diff <= high)
+            self.assertTrue(p < 0.05)
+
+    def test_reproducible(self):
+
+        table = make_table([score + 1 for score in SCORES], SCORES)
+        a = sg.compareNoveltyFitness(table, EVENTS, numResamples=500, rng=7)
+        b = sg.compareNoveltyFitness(table, EVENTS, numResamples=500, rng=np.random.default_rng(7))
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, sg.compareNoveltyFitness(table, EVENTS, numResamples=500, rng=8))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import contextlib
+import copy
+import io
+import unittest
+import numpy as np
+from testcase import MyTestCase
+import foragingRobot as fr
+import geneticController as gc
+import simulationContext as sc
+import main
+
+# run a controller once, quietly, and return what the run is compared on
+def run(controller, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        ts, robots, pellets = main.runSimOnce(700, copy.deepcopy(controller), animate=False, duration=20, **kwargs)
+    robot = robots[0]
+    return (ts, robot.xs, robot.ys, robot.energies, robot.foodEaten, [pellet.depleted for pellet in pellets],
+            [(pellet.x, pellet.y) for pellet in pellets])
+
+class Test_SimulationContext(MyTestCase):
+
+    def test_same_as_new_context(self):
+
+        sensorAngles = fr.radial_sensor_angles(8)
+        for integrator, angles in [('euler', None), ('arc', None), ('euler', sensorAngles)]:
+            inputs = dict(numInputs=len(angles), inputMap=None) if angles else {}
+            controllers = gc.createPopulation(3, np.random.default_rng(5), **inputs)
+            scenario = dict(integrator=integrator, sensorAngles=angles)
+            context = sc.SimulationContext(**scenario)
+
+            # the same seed again, then changed seeds, which move the pellets
+            for controller, seed in zip(controllers + controllers, [42, 42, 7, 7, 42, 99]):
+                new = run(controller, seed=seed, **scenario)
+                reused = run(controller, seed=seed, context=context, **scenario)
+                self.assertEqual(new, reused, (integrator, angles, seed))
+
+    def test_matches(self):
+
+        context = sc.SimulationContext()
+        self.assertTrue(context.matches(integrator='euler', responseMaps=False, sensorAngles=None))
+        self.assertFalse(context.matches(integrator='arc'))
+        self.assertFalse(context.matches(sensorAngles=fr.radial_sensor_angles(8)))
+        self.assertFalse(context.matches(field_of_view=np.pi))
+
+        # runs with a different set up are refused
+        controller = gc.createPopulation(1, np.random.default_rng(5))[0]
+        with self.assertRaises(ValueError):
+            run(controller, integrator='arc', context=context)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import contextlib
+import io
+import unittest
+import numpy as np
+from testcase import MyTestCase
+import foragingRobot as fr
+import geneticController as gc
+import stageTimers as stm
+import main
+
+# run a short simulation with timers attached, and return the timers and the robot
+def run(sensorAngles=None, steps=50):
+    inputs = dict(numInputs=len(sensorAngles), inputMap=None) if sensorAngles else {}
+    controller = gc.createPopulation(1, np.random.default_rng(3), **inputs)[0]
+    timers = stm.StageTimers()
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, robots, _ = main.runSimOnce(700, controller, animate=False, duration=steps * 0.1, timers=timers,
+                                       sensorAngles=sensorAngles)
+    return timers, robots[0]
+
+class Test_StageTimers(MyTestCase):
+
+    def test_paired_sensors(self):
+
+        # food and poison sensors at the same places are stepped together by multi-channel sensors, which are timed
+        timers, robot = run()
+        self.assertTrue(robot.left_multi_sensor is not None and robot.right_multi_sensor is not None)
+        steps = len(robot.xs) - 1
+        self.assertEqual(timers.calls['sensing'], 3 * steps)   # left pair, right pair and energy sensor
+        self.assertTrue(timers.times['sensing'] > 0)
+        self.assertEqual(len(robot.left_sensor.activations), steps + 1)
+
+        # every wrapper is gone once the run has finished
+        self.assertFalse('step' in vars(robot.left_multi_sensor))
+
+    def test_separate_sensors(self):
+
+        # sensors that aren't paired are timed one by one
+        robot = fr.ForagingRobot(x=0, y=0, controller=None, left_food_sources=[], right_food_sources=[],
+                                 left_poison_sources=[], right_poison_sources=[], consumables=[],
+                                 left_poison_sensor_angle=1)
+        self.assertTrue(robot.left_multi_sensor is None)
+        sensors = stm.sensingSteps(robot)
+        self.assertEqual(sensors, [robot.left_sensor, robot.left_poison_sensor, robot.right_multi_sensor,
+                                   robot.energy_sensor])
+
+    def test_sensor_arrays(self):
+
+        timers, robot = run(fr.radial_sensor_angles(8))
+        steps = len(robot.xs) - 1
+        self.assertEqual(timers.calls['sensing'], 3 * steps)   # food array, poison array and energy sensor
+        self.assertTrue(timers.times['sensing'] > 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,19 @@
+import os
+import sys
+import unittest
+
+# finalProject, and the folder above it (which holds situsim_v1_2 and situsim_extensions) - found from this file, so
+# the tests can be run from anywhere
+HERE = os.path.dirname(os.path.abspath(__file__))
+FINAL_PROJECT = os.path.normpath(os.path.join(HERE, '..', '..'))
+sys.path.insert(1, FINAL_PROJECT)
+sys.path.insert(1, os.path.dirname(FINAL_PROJECT))
+
+import matplotlib
+matplotlib.use('Agg')   # nothing in the tests should open a window
+
+
+class MyTestCase(unittest.TestCase):
+
+    def assertNear(self, a, b, tol=1E-6):
+        self.assertTrue(abs(a - b) < tol)
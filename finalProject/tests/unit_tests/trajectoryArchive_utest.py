@@ -0,0 +1,73 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from testcase import MyTestCase
+import foragingRobot as fr
+import geneticController as gc
+import trajectoryArchive as ta
+import main
+
+# run a short simulation of a robot with a ring of n sensors (or the usual pair if n is 0)
+def run(n=0):
+    inputs = dict(numInputs=n, inputMap=None) if n else {}
+    controller = gc.createPopulation(1, np.random.default_rng(3), **inputs)[0]
+    with contextlib.redirect_stdout(io.StringIO()):
+        ts, robots, _ = main.runSimOnce(700, controller, animate=False, duration=5,
+                                        sensorAngles=fr.radial_sensor_angles(n) if n else None)
+    return ts, robots[0]
+
+class Test_TrajectoryArchive(MyTestCase):
+
+    def test_sensor_arrays(self):
+
+        ts, robot = run(8)
+        for dtype, delta in [('float64', False), ('float64', True), ('float32', False)]:
+            archive = ta.TrajectoryArchive(tempfile.mkdtemp(), dtype=dtype, delta=delta)
+            archive.append(robot, ts)
+            record = archive.record(0)
+
+            # a row of activations for every time step
+            for name in ['food_sensor_array', 'poison_sensor_array']:
+                activations = getattr(record, name).activations
+                self.assertEqual(activations.shape, (len(ts), 8))
+                self.assertTrue(np.allclose(activations, np.array(getattr(robot, name).activations), atol=1E-5))
+            self.assertTrue(np.allclose(record.xs, robot.xs, atol=1E-5))
+
+        # robots with the usual pair of sensors have no array activations
+        ts, robot = run()
+        archive = ta.TrajectoryArchive(tempfile.mkdtemp(), dtype='float64')
+        archive.append(robot, ts)
+        record = archive.record(0)
+        self.assertEqual(record.food_sensor_array.activations.shape, (len(ts), 0))
+        self.assertTrue(np.array_equal(record.left_sensor.activations, robot.left_sensor.activations))
+
+    def test_older_channels(self):
+
+        # an archive started before the sensor array channels were added
+        path = tempfile.mkdtemp()
+        older = list(ta.CHANNELS[:ta.CHANNELS.index('foodArray')])
+        with open(os.path.join(path, "format.json"), "w") as file:
+            json.dump({'dtype': 'float64', 'delta': False, 'channels': older}, file)
+
+        ts, robot = run(8)
+        archive = ta.TrajectoryArchive(path)
+        archive.append(robot, ts)
+        archive.append(robot, ts)
+        self.assertEqual(os.path.getsize(archive.indexPath), 2 * ta.indexType(len(older)).itemsize)
+
+        # it reopens and reads as before, with the missing channels empty
+        archive = ta.TrajectoryArchive(path)
+        self.assertEqual(len(archive), 2)
+        record = archive.record(1)
+        self.assertTrue(np.array_equal(record.ys, robot.ys))
+        self.assertTrue(np.array_equal(record.energySensor, robot.energy_sensor.activations))
+        self.assertEqual(len(archive.channel(1, 'foodArray')), 0)
+        self.assertEqual(len(record.poisonArray), 0)
+        self.assertEqual(record.food_sensor_array.activations.shape, (len(ts), 0))
+
+if __name__ == '__main__':
+    unittest.main()
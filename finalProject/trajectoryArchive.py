@@ -0,0 +1,218 @@
+import os
+import json
+import numpy as np
+
+
+# Every history saved for an evaluation, and where it's found on a robot. The position in the tuple is the channel's
+# position in the index, so new channels must only ever be added to the end
+CHANNELS = ('ts', 'xs', 'ys', 'thetas', 'velocities', 'energies', 'leftFood', 'rightFood', 'leftPoison',
+            'rightPoison', 'energySensor', 'foodArray', 'poisonArray')
+
+# Sensors whose activations are saved, by the robot attribute plots2 reads them from
+SENSORS = {'left_sensor': 'leftFood', 'right_sensor': 'rightFood', 'left_poison_sensor': 'leftPoison',
+           'right_poison_sensor': 'rightPoison', 'energy_sensor': 'energySensor'}
+
+# Sensor arrays of an ArrayForagingRobot whose activations are saved, a row per time step flattened into one channel
+# (empty for robots without them)
+SENSOR_ARRAYS = {'food_sensor_array': 'foodArray', 'poison_sensor_array': 'poisonArray'}
+
+
+def indexType(numChannels):
+    """
+    Data type of the index of an archive - one entry per evaluation, with what it
+    was, and the offset and length (in values) of each of its channels
+    :param numChannels: Number of channels the archive was started with
+    :return: Structured numpy data type
+    """
+    return np.dtype([('generation', np.int32), ('novelty', np.bool_), ('foodEaten', np.int32),
+                     ('behScore', np.float64, 3), ('offset', np.int64, numChannels),
+                     ('length', np.int64, numChannels)])
+
+
+# Index data type of an archive with every channel
+INDEX = indexType(len(CHANNELS))
+
+
+# An append-only archive of full trajectories for analysis across thousands of evaluations. Every channel of every
+# evaluation is appended to one raw binary file, with an index of where each one starts, and the file is
+# memory-mapped when reading - so a trajectory is only read from disk when it's used, and never all at once. Values
+# can be stored as float32 to halve the size, and delta encoded (each value stored as the step from the one before)
+class TrajectoryArchive:
+
+    def __init__(self, path="trajectories", dtype=np.float32, delta=False):
+        """
+        Constructor method - opens the archive in the folder if there is one, or starts a new one
+        :param path: Folder the archive is kept in (created if it doesn't exist)
+        :param dtype: Data type values are stored as (np.float32 or np.float64) - only used for a new archive
+        :param delta: Whether to delta encode the values - only used for a new archive. Decoded float32 values
+        pick up the rounding of every step before them, so use float64 with it where the error matters
+        """
+        self.path = path
+        self.dataPath = os.path.join(path, "data.bin")
+        self.indexPath = os.path.join(path, "index.bin")
+        self.memmap = None          # Memory-mapped data file, reopened when the archive has grown
+        os.makedirs(path, exist_ok=True)
+
+        # An existing archive keeps the format it was started with
+        formatPath = os.path.join(path, "format.json")
+        if os.path.exists(formatPath):
+            with open(formatPath) as file:
+                archiveFormat = json.load(file)
+        else:
+            archiveFormat = {'dtype': np.dtype(dtype).name, 'delta': bool(delta), 'channels': list(CHANNELS)}
+            with open(formatPath, "w") as file:
+                json.dump(archiveFormat, file)
+        if archiveFormat['channels'] != list(CHANNELS)[:len(archiveFormat['channels'])]:
+            raise ValueError(f"{path} was saved with different channels: {archiveFormat['channels']}")
+        self.dtype = np.dtype(archiveFormat['dtype'])
+        self.delta = archiveFormat['delta']
+        # An archive started before channels were added keeps only the channels it had
+        self.channels = tuple(archiveFormat['channels'])
+        self.indexType = indexType(len(self.channels))
+
+    def __len__(self):
+        """
+        Number of evaluations in the archive - data is always written before its
+        index entry, so an interrupted append leaves no entry pointing at missing data
+        :return: Number of evaluations
+        """
+        size = os.path.getsize(self.indexPath) if os.path.exists(self.indexPath) else 0
+        return size // self.indexType.itemsize
+
+    def append(self, robot, ts, generation=None):
+        """
+        Append a robot's trajectories to the archive
+        :param robot: ForagingRobot that has finished its simulation (with its behavioral score set)
+        :param ts: List of time steps of the simulation
+        :param generation: Generation of the robot (robot.generation if None)
+        :return: Index of the evaluation in the archive
+        """
+        histories = [ts, robot.xs, robot.ys, robot.thetas, robot.velocities, robot.energies]
+        histories += [getattr(robot, sensor).activations for sensor in SENSORS]
+        histories = [np.asarray(history, dtype=np.float64) for history in histories]
+        histories += [np.asarray(getattr(robot, array).activations, dtype=np.float64).ravel()
+                      if hasattr(robot, array) else np.zeros(0) for array in SENSOR_ARRAYS]
+        histories = histories[:len(self.channels)]
+
+        entry = np.zeros(1, dtype=self.indexType)
+        entry['generation'] = robot.generation if generation is None else generation
+        entry['novelty'] = robot.novelty
+        entry['foodEaten'] = robot.foodEaten
+        entry['behScore'] = robot.behScore
+        entry['length'] = [len(history) for history in histories]
+        start = os.path.getsize(self.dataPath) // self.dtype.itemsize if os.path.exists(self.dataPath) else 0
+        entry['offset'] = start + np.concatenate(([0], np.cumsum(entry['length'][0])[:-1]))
+
+        if self.delta:
+            histories = [np.diff(history, prepend=0) for history in histories]
+        with open(self.dataPath, "ab") as file:
+            np.concatenate(histories).astype(self.dtype).tofile(file)
+        with open(self.indexPath, "ab") as file:
+            entry.tofile(file)
+        return len(self) - 1
+
+    def index(self):
+        """
+        Read the whole index - one entry per evaluation, with its generation,
+        novelty flag, food eaten and behavioral score (enough for phase-space plots)
+        :return: Structured array with the archive's index data type
+        """
+        if not os.path.exists(self.indexPath):
+            return np.zeros(0, dtype=self.indexType)
+        return np.fromfile(self.indexPath, dtype=self.indexType, count=len(self))
+
+    def entry(self, i):
+        """
+        Read the index entry of one evaluation
+        :param i: Index of the evaluation
+        :return: Index entry (structured scalar with the archive's index data type)
+        """
+        if not 0 <= i < len(self):
+            raise IndexError(f"Evaluation {i} is not in the archive ({len(self)} evaluations)")
+        return np.fromfile(self.indexPath, dtype=self.indexType, count=1, offset=i * self.indexType.itemsize)[0]
+
+    def channel(self, i, name, entry=None):
+        """
+        Read one channel of one evaluation
+        :param i: Index of the evaluation
+        :param name: Name of the channel (from CHANNELS)
+        :param entry: The evaluation's index entry, if it's already been read
+        :return: Array of values - a read-only view of the file unless it has to be decoded (empty for a channel
+        added after the archive was started)
+        """
+        if name not in self.channels:
+            return np.zeros(0, dtype=self.dtype)
+        if entry is None:
+            entry = self.entry(i)
+        c = self.channels.index(name)
+        offset, length = int(entry['offset'][c]), int(entry['length'][c])
+
+        end = offset + length
+        if self.memmap is None or len(self.memmap) < end:
+            self.memmap = np.memmap(self.dataPath, dtype=self.dtype, mode='r')
+        values = self.memmap[offset:end]
+        return np.cumsum(values, dtype=np.float64) if self.delta else values
+
+    def record(self, i):
+        """
+        Get an evaluation from the archive as an object that can be used in place
+        of its robot in the plots, reading its trajectories only when they're used
+        :param i: Index of the evaluation
+        :return: TrajectoryRecord object
+        """
+        return TrajectoryRecord(self, i, self.entry(i))
+
+    def records(self, indices=None):
+        """
+        Get many evaluations from the archive as TrajectoryRecord objects
+        :param indices: Indices of the evaluations (all of them if None), e.g. from a filter on index()
+        :return: List of TrajectoryRecord objects, list of lists of their time steps (as plots2 takes them)
+        """
+        index = self.index()
+        if indices is None:
+            indices = range(len(index))
+        records = [TrajectoryRecord(self, int(i), index[i]) for i in indices]
+        return records, [record.ts for record in records]
+
+
+# One evaluation in a TrajectoryArchive. It has the same attributes as a robot where the plots use them (xs, ys,
+# velocities, left_sensor.activations, behScore, novelty...), and each channel is only read when it's asked for
+class TrajectoryRecord:
+
+    def __init__(self, archive, i, entry):
+        """
+        Constructor method
+        :param archive: TrajectoryArchive the evaluation is in
+        :param i: Index of the evaluation
+        :param entry: The evaluation's index entry
+        """
+        self.archive = archive
+        self.i = i
+        self.entry = entry
+        self.generation = int(entry['generation'])
+        self.novelty = bool(entry['novelty'])
+        self.foodEaten = int(entry['foodEaten'])
+        self.behScore = list(entry['behScore'])
+
+    def __getattr__(self, name):
+        """
+        Read channels (and sensors and sensor arrays, as objects with activations) when they're first used
+        :param name: Attribute name
+        :return: Array of values, or a SensorRecord
+        """
+        if name in CHANNELS:
+            return self.archive.channel(self.i, name, self.entry)
+        if name in SENSORS:
+            return SensorRecord(self.archive.channel(self.i, SENSORS[name], self.entry))
+        if name in SENSOR_ARRAYS:
+            # A row of activations per time step
+            values = self.archive.channel(self.i, SENSOR_ARRAYS[name], self.entry)
+            return SensorRecord(values.reshape(len(self.ts), -1) if len(values) else np.zeros((len(self.ts), 0)))
+        raise AttributeError(name)
+
+
+# Stands in for a sensor of an archived robot, for the plots that read its activations
+class SensorRecord:
+
+    def __init__(self, activations):
+        self.activations = activations
@@ -87,3 +87,103 @@ class Arena(System):
                          start_pos=(scale * x1 + shiftx, scale * y1 + shifty),
                          end_pos=(scale * x2 + shiftx, scale * y2 + shifty),
                          width=2)
+
+
+# an Arena for many agents at once. the positions of all of the agents are kept in one pose matrix - each agent's state
+# is replaced with a view of its row, so agents still update their own states in place, but the arena can constrain
+# all of them with whole-matrix operations. walls are applied with one np.clip for each axis, and agents which overlap
+# each other are pushed apart. pairs of agents which might be touching are found with a spatial hash (a dictionary of
+# grid cells the size of the largest agent), so the cost of a step grows with the number of agents rather than the
+# number of pairs of them
+# - this class relies on agents having radius and state attributes, and on their states not being replaced
+class MultiAgentArena(Arena):
+
+    # construct MultiAgentArena. collision_iterations is how many times overlapping agents are pushed apart in each
+    # step - with many agents in a crowd, pushing one pair apart can push one of them into another, so a few rounds
+    # may be needed to separate everyone (0 to let agents overlap, as Arena does)
+    def __init__(self, agents, x_left, x_right, y_top, y_bottom, collision_iterations=2):
+        super().__init__(agents, x_left, x_right, y_top, y_bottom)
+        self.collision_iterations = collision_iterations
+        self.poses = np.zeros((0, 3))  # one row for each agent: x, y and theta
+        self.bind_agents()
+
+    # put every agent's state into the pose matrix, and give the agent a view of its row in place of its own state.
+    # this is done again automatically if the list of agents changes length
+    def bind_agents(self):
+        self.poses = np.array([agent.state for agent in self.agents], dtype=float).reshape(-1, 3)
+        for i, agent in enumerate(self.agents):
+            agent.state = self.poses[i]
+        self.radii = np.array([agent.radius for agent in self.agents], dtype=float)
+
+    # find every pair of agents which are close enough to be touching, using a spatial hash. returns two arrays of
+    # indices, with the first index of each pair less than the second
+    def get_candidate_pairs(self):
+        cell_size = 2 * self.radii.max()
+        cells = np.floor(self.poses[:, :2] / cell_size).astype(int)
+        grid = {}
+        for i, (column, row) in enumerate(cells.tolist()):
+            grid.setdefault((column, row), []).append(i)
+
+        firsts, seconds = [], []
+        for (column, row), members in grid.items():
+            # pairs within the cell, and with the cells to the E, NE, N and NW - so every neighbouring pair of cells
+            # is only visited once
+            for k, i in enumerate(members):
+                firsts += [i] * (len(members) - k - 1)
+                seconds += members[k + 1:]
+            for neighbour in ((column + 1, row - 1), (column + 1, row), (column + 1, row + 1), (column, row + 1)):
+                others = grid.get(neighbour)
+                if others:
+                    for i in members:
+                        firsts += [i] * len(others)
+                        seconds += others
+        firsts, seconds = np.array(firsts, dtype=int), np.array(seconds, dtype=int)
+        swap = firsts > seconds
+        firsts[swap], seconds[swap] = seconds[swap], firsts[swap]
+        return firsts, seconds
+
+    # push every pair of overlapping agents apart along the line between their centres, each by half of the overlap.
+    # agents exactly on top of each other are pushed apart in a direction which depends on which pair they are, so
+    # that a stack of agents spreads out rather than moving in a line
+    def resolve_collisions(self):
+        firsts, seconds = self.get_candidate_pairs()
+        if len(firsts) == 0:
+            return
+        vecs = self.poses[seconds, :2] - self.poses[firsts, :2]
+        dists = np.hypot(vecs[:, 0], vecs[:, 1])
+        overlaps = self.radii[firsts] + self.radii[seconds] - dists
+        touching = overlaps > 0
+        if not touching.any():
+            return
+        firsts, seconds, vecs, dists, overlaps = (firsts[touching], seconds[touching], vecs[touching],
+                                                  dists[touching], overlaps[touching])
+        directions = np.empty_like(vecs)
+        apart = dists > 0
+        directions[apart] = vecs[apart] / dists[apart, None]
+        angles = (firsts[~apart] + seconds[~apart] * len(self.agents)) * np.pi * (3 - np.sqrt(5))  # golden angle
+        directions[~apart] = np.column_stack((np.cos(angles), np.sin(angles)))
+
+        pushes = directions * (overlaps / 2)[:, None]
+        np.add.at(self.poses[:, :2], firsts, -pushes)
+        np.add.at(self.poses[:, :2], seconds, pushes)
+
+    # step arena
+    def step(self, dt, x_move=None, y_move=None):
+
+        # if move parameters are passed to step, then shift the arena
+        if x_move and y_move:
+            self.move(x_move, y_move)
+        # call step of System, so that new xy-coordinates are stored
+        System.step(self, dt)
+
+        if len(self.agents) != len(self.poses):
+            self.bind_agents()
+        if len(self.agents) == 0:
+            return
+
+        for _ in range(self.collision_iterations):
+            self.resolve_collisions()
+
+        # constrain all agents to remain inside the box
+        np.clip(self.poses[:, 0], self.x_left + self.radii, self.x_right - self.radii, out=self.poses[:, 0])
+        np.clip(self.poses[:, 1], self.y_bottom + self.radii, self.y_top - self.radii, out=self.poses[:, 1])
@@ -2,6 +2,7 @@ from .base import *
 from .noise import *
 from .stimuli import *
 from .sensors import *
+from .occlusion import *
 from .motors import *
 from .robots import *
 from .controllers import *
@@ -28,11 +28,32 @@ def angle_difference(angle1, angle2):
 
 # generate random number from uniform interval
 # - numpy already has a function for this, but I wrote this and used it in many places before thinking to check that
-def random_in_interval(minimum=0, maximum=1, seed=None):
-    if seed:
-        random.seed(seed)
+# - the number is drawn from rng, an np.random.Generator. to draw a reproducible sequence of numbers, make one
+#   Generator and pass it to every call
+# - if only seed is given, a new Generator is made from it for this one draw, so repeated calls with the same seed
+#   return the same number - it only suits one-off draws
+# - with neither, the number comes from numpy's global random state, as it always has (so np.random.seed applies)
+def random_in_interval(minimum=0, maximum=1, seed=None, rng=None):
     width = maximum - minimum
-    return (width * np.random.random()) + minimum
+    if rng is None:
+        if seed is None:
+            return (width * np.random.random()) + minimum
+        rng = np.random.default_rng(seed)
+    return (width * rng.random()) + minimum
+
+# shortest distance from the point (px, py) to the line segment from (x0, y0) to (x1, y1)
+# - used to check whether something moving in a straight line over a step passed close to a point at any time during
+#   the step, rather than only at the end of it
+def distance_to_segment(px, py, x0, y0, x1, y1):
+    dx = x1 - x0
+    dy = y1 - y0
+    length_sq = dx*dx + dy*dy
+    if length_sq == 0:
+        u = 0
+    else:
+        # fraction of the way along the segment of the closest point, clipped to the ends of the segment
+        u = min(max(((px - x0)*dx + (py - y0)*dy) / length_sq, 0), 1)
+    return np.hypot(x0 + u*dx - px, y0 + u*dy - py)
 
 ####################################################################################
 #                           utility functions end
@@ -69,6 +90,22 @@ class System:
         if self.has_orientation:
             self.thetas.append(self.theta)
 
+    # put the system back at the start of a simulation, at the given position and orientation (or where it is now, for
+    # any that are not given), with its histories cleared. this lets a system be used for another run without
+    # constructing it again
+    def reset(self, x=None, y=None, theta=None):
+        if self.has_position:
+            if x is not None:
+                self.x = x
+            if y is not None:
+                self.y = y
+            self.xs = [self.x]
+            self.ys = [self.y]
+        if self.has_orientation:
+            if theta is not None:
+                self.theta = theta
+            self.thetas = [self.theta]
+
 
 ####################################################################################
 #                           System class ends
@@ -25,6 +25,13 @@ class Motor(System):
         self.max_speed = max_speed
         self.reversed = reversed
 
+    # reset motor to a standstill, with its record of speeds cleared
+    def reset(self):
+        self.speed = 0
+        self.speeds = [0]
+        if self.noisemaker is not None:
+            self.noisemaker.reset()
+
     # step motor forwards in time
     def step(self, speed_command, dt):
 
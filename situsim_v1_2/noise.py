@@ -5,13 +5,51 @@ from .base import *
 ####################################################################################
 
 # a NoiseSource is a kind of plugin object which can be attached to or incorporated into other objects
+# - every NoiseSource draws from its own random number generator, so its noise can be reproduced exactly from its seed,
+#   whatever else in the simulation is using random numbers
+# - rather than drawing a random number in every step, noise is generated in blocks of block_size samples with
+#   vectorised numpy calls, and each step just takes the next sample from the current block
 class NoiseSource(System):
 
-    # construct noise source
-    def __init__(self):
+    # construct noise source. seed can be anything accepted by np.random.default_rng (None, an int, a SeedSequence or
+    # a Generator)
+    def __init__(self, seed=None, block_size=256):
         super().__init__()
         self.noise = 0
         self.noises = [self.noise]
+        self.seed = seed  # kept so that the noise can be restarted by reset
+        self.rng = np.random.default_rng(seed)
+        self.block_size = block_size
+        self.block = np.zeros(0)  # the current block of pre-generated noise
+        self.block_index = 0  # index of the next sample to use from the current block
+
+    # put the noise source back to how it was constructed, with its history cleared and its random number generator
+    # restarted from its seed, so that it produces the same noise again. (if the seed was None, it restarts from fresh
+    # entropy, and if it was a Generator, it carries on from wherever that Generator has got to)
+    def reset(self):
+        self.noise = 0
+        self.noises = [self.noise]
+        self.rng = np.random.default_rng(self.seed)
+        self.block = np.zeros(0)
+        self.block_index = 0
+
+    # generate the next n samples of noise. subclasses override this - the base class generates no noise
+    def draw_block(self, n):
+        return np.zeros(n)
+
+    # get the next sample of noise, generating a new block first if the current one has been used up
+    def next_noise(self):
+        if self.block_index >= len(self.block):
+            self.block = self.draw_block(self.block_size)
+            self.block_index = 0
+        noise = self.block[self.block_index]
+        self.block_index += 1
+        return noise
+
+    # throw away whatever is left of the current block, e.g. when parameters change, so that the new parameters take
+    # effect from the next step
+    def discard_block(self):
+        self.block_index = len(self.block)
 
     # when stepped, a noise source generates a noise signal. this is where that signal gets stored for later analysis
     def step(self, dt):
@@ -24,14 +62,18 @@ class NoiseSource(System):
 class WhiteNoiseSource(NoiseSource):
 
     # construct white noise source which will generate noise in the interval [min_val, max_val]
-    def __init__(self, min_val, max_val):
-        super().__init__()
+    def __init__(self, min_val, max_val, seed=None, block_size=256):
+        super().__init__(seed, block_size)
         self.extent = max_val - min_val  # scale of the noise
         self.min_val = min_val  # minimum value noise will take (i.e. offset)
 
+    # generate a block of white noise with a single vectorised uniform draw
+    def draw_block(self, n):
+        return self.min_val + (self.extent * self.rng.random(n))
+
     # step noise
     def step(self, dt):
-        self.noise = self.min_val + (self.extent * np.random.random())  # generate noise
+        self.noise = self.next_noise()  # generate noise
         return super().step(dt)  # call step of NoiseSource to store noise
 
 
@@ -41,13 +83,26 @@ class BrownNoiseSource(NoiseSource):
 
     # construct brown noise source. max_step_size is the maximum step in either positive or negative direction, i.e.
     # half the scale of the white noise
-    def __init__(self, max_step_size):
-        super().__init__()
+    def __init__(self, max_step_size, seed=None, block_size=256):
+        super().__init__(seed, block_size)
         self.max_step_size = max_step_size
+        self.level = 0  # where the noise has drifted to by the end of the blocks generated so far
+
+    # reset noise source, including where it has drifted to
+    def reset(self):
+        super().reset()
+        self.level = 0
+
+    # generate a block of brown noise: a block of white noise steps, accumulated with a cumulative sum which carries on
+    # from where the last block finished
+    def draw_block(self, n):
+        block = self.level + np.cumsum(self.max_step_size * (2 * self.rng.random(n) - 1))
+        self.level = block[-1]
+        return block
 
     # step noise source
     def step(self, dt):
-        self.noise += self.max_step_size * (2 * np.random.random() - 1)  # generate noise
+        self.noise = self.next_noise()  # generate noise
         return super().step(dt)  # store noise
 
 
@@ -61,8 +116,8 @@ class BrownNoiseSource(NoiseSource):
 class SpikeNoiseSource(NoiseSource):
 
     # construct noise source
-    def __init__(self, prob, pos_size, neg_size):
-        super().__init__()
+    def __init__(self, prob, pos_size, neg_size, seed=None, block_size=256):
+        super().__init__(seed, block_size)
         self.prob = prob  # probability of a spike
         self.pos_size = pos_size  # size of positive spike
         self.neg_size = neg_size  # size of negative spike
@@ -74,38 +129,61 @@ class SpikeNoiseSource(NoiseSource):
         self.prob = params[0]
         self.pos_size = params[1]
         self.neg_size = params[2]
+        self.discard_block()  # samples already generated used the old parameters
+
+    # generate a block of spike noise from two Bernoulli masks: one for whether there is a spike in each step, and one
+    # for whether each spike is positive or negative (with equiprobability)
+    def draw_block(self, n):
+        spikes = self.rng.random(n) < self.prob
+        positive = self.rng.random(n) < 0.5
+        return np.where(spikes, np.where(positive, self.pos_size, self.neg_size), 0)
 
     # step noise
     def step(self, dt):
-        self.noise = 0  # noise is zero by default
-        if np.random.random() < self.prob:  # if a randomly generated number is less than the probability of a spike, then spike
-            if np.random.random() < 0.5:  # spikes are positive or negative with equiprobability
-                self.noise = self.pos_size  # positive spike
-            else:
-                self.noise = self.neg_size  # negative spike
+        self.noise = self.next_noise()  # noise is zero unless there is a spike
         return super().step(dt)  # call step of NoiseSource to store noise
 
 
 # in the real world, we might expect different types of noise to be superimposed, e.g. low level white noise, plus some
 # drift (brown noise), and possibly the occasional big spike coming from somewhere
 # this class provides a convenient way to have a single NoiseSource which incorporates all of those kinds of noise
+# - each source gets its own independent stream of random numbers, spawned from the Noisemaker's seed
+# - the sources are only used to generate blocks of noise, which are summed a whole block at a time, so the individual
+#   sources' noises are not recorded - the Noisemaker's noises hold the combined signal
 class Noisemaker(NoiseSource):
-    def __init__(self, white_noise_params=[0, 0], brown_noise_step=0, spike_noise_params=[0, 0, 0]):
-        super().__init__()
+    def __init__(self, white_noise_params=[0, 0], brown_noise_step=0, spike_noise_params=[0, 0, 0], seed=None,
+                 block_size=256):
+        super().__init__(seed, block_size)
+        white_seed, brown_seed, spike_seed = self.rng.spawn(3)
         self.noise_sources = []  # list of noise sources
         if white_noise_params != [0, 0]:  # for each type of NoiseSource, it is only added to the list if it has non-zero parameters
-            self.noise_sources.append(WhiteNoiseSource(max_val=white_noise_params[0], min_val=white_noise_params[1]))
+            self.noise_sources.append(WhiteNoiseSource(max_val=white_noise_params[0], min_val=white_noise_params[1],
+                                                       seed=white_seed))
         if brown_noise_step != 0:
-            self.noise_sources.append(BrownNoiseSource(max_step_size=brown_noise_step))
+            self.noise_sources.append(BrownNoiseSource(max_step_size=brown_noise_step, seed=brown_seed))
         if spike_noise_params != [0, 0, 0]:
             self.noise_sources.append(SpikeNoiseSource(prob=spike_noise_params[0], pos_size=spike_noise_params[1],
-                                                neg_size=spike_noise_params[2]))
+                                                neg_size=spike_noise_params[2], seed=spike_seed))
+
+    # reset noisemaker. its sources' seeds are spawned again from its own restarted random number generator, in the
+    # same way as in the constructor
+    def reset(self):
+        super().reset()
+        seeds = dict(zip((WhiteNoiseSource, BrownNoiseSource, SpikeNoiseSource), self.rng.spawn(3)))
+        for noise_source in self.noise_sources:
+            noise_source.seed = seeds[type(noise_source)]
+            noise_source.reset()
+
+    # generate a block of noise as the sum of a block from each noise source
+    def draw_block(self, n):
+        block = np.zeros(n)
+        for noise_source in self.noise_sources:  # for all noise sources, effects are accumulated
+            block += noise_source.draw_block(n)  # accumulated noise may be positive or negative
+        return block
 
     # step noisemaker
     def step(self, dt):
-        self.noise = 0
-        for noise_source in self.noise_sources:  # for all noise sources, effects are accumulated
-            self.noise += noise_source.step(dt)  # accumulated noise may be positive or negative
+        self.noise = self.next_noise()
         return super().step(dt)  # call NoiseSource step to store noise for later analysis
 
 
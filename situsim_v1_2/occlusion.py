@@ -0,0 +1,97 @@
+from .base import *
+
+####################################################################################
+#                           Occlusion begins
+####################################################################################
+
+# an obstacle touching either end of a ray does not block it. the tolerance keeps this true for points which are only
+# on the edge of an obstacle up to rounding, e.g. sensors on the edge of a robot's body
+CONTAINMENT_TOLERANCE = 1E-9
+
+
+# find which line segments (rays from sensors to light sources) are blocked by any of a set of circles, all at once.
+# the segments go from (x0s, y0s) to (x1s, y1s), and the circles have centres (cxs, cys) and radii rs - all 1D arrays.
+# a circle blocks a segment if the segment passes through it, unless the circle contains either end of it (so a sensor
+# is not blocked by the body it is on, or a light by the object it belongs to). every segment is first checked against
+# the bounding box of every circle, and the exact test is only done for the pairs whose boxes overlap
+def get_blocked_segments(x0s, y0s, x1s, y1s, cxs, cys, rs):
+    x0s, y0s, x1s, y1s = [np.asarray(a, dtype=float) for a in (x0s, y0s, x1s, y1s)]
+    cxs, cys, rs = [np.asarray(a, dtype=float) for a in (cxs, cys, rs)]
+    blocked = np.zeros(len(x0s), dtype=bool)
+    if len(x0s) == 0 or len(cxs) == 0:
+        return blocked
+
+    # broad phase: only pairs where the segment's box overlaps the circle's box can intersect
+    overlap = ((np.minimum(x0s, x1s)[:, None] <= (cxs + rs)[None, :]) &
+               (np.maximum(x0s, x1s)[:, None] >= (cxs - rs)[None, :]) &
+               (np.minimum(y0s, y1s)[:, None] <= (cys + rs)[None, :]) &
+               (np.maximum(y0s, y1s)[:, None] >= (cys - rs)[None, :]))
+    segments, circles = np.nonzero(overlap)
+    if len(segments) == 0:
+        return blocked
+
+    # narrow phase: the closest point of each segment to each circle's centre
+    dxs = (x1s - x0s)[segments]
+    dys = (y1s - y0s)[segments]
+    fxs = cxs[circles] - x0s[segments]
+    fys = cys[circles] - y0s[segments]
+    lengths_sq = dxs * dxs + dys * dys
+    ts = np.clip((fxs * dxs + fys * dys) / np.where(lengths_sq > 0, lengths_sq, 1), 0, 1)
+    closest_sq = (fxs - ts * dxs) ** 2 + (fys - ts * dys) ** 2
+    radii_sq = rs[circles] ** 2
+
+    # distances squared from the circles' centres to the ends of the segments
+    start_sq = fxs * fxs + fys * fys
+    end_sq = (cxs[circles] - x1s[segments]) ** 2 + (cys[circles] - y1s[segments]) ** 2
+    contains_end = np.minimum(start_sq, end_sq) <= radii_sq * (1 + CONTAINMENT_TOLERANCE)
+
+    hits = (closest_sq < radii_sq) & ~contains_end
+    blocked[segments[hits]] = True
+    return blocked
+
+
+# a set of circular obstacles which block light - anything with a position and a radius, e.g. robots and consumables.
+# obstacles with a state (e.g. robots) can move, so their positions are read from it whenever they are used (state is
+# what Arenas correct). obstacles without one (e.g. consumables) are assumed to stay where they are, so their positions
+# are only read when the list of obstacles changes length. obstacles with a depleted attribute which is True (e.g.
+# eaten consumables) are left out. sensors which are given an Occluders object ignore any light source whose ray to
+# them is blocked
+class Occluders:
+
+    # construct set of obstacles
+    def __init__(self, obstacles):
+        self.obstacles = obstacles  # a list of obstacles. it can be added to while a simulation runs
+        self.count = None  # the length of the list when the obstacles were last sorted into moving and still ones
+
+    # sort the obstacles into ones which can move and ones which can't, and store the positions of the still ones
+    def sort_obstacles(self):
+        self.count = len(self.obstacles)
+        self.moving = [obstacle for obstacle in self.obstacles if hasattr(obstacle, 'state')]
+        self.moving_rs = np.array([obstacle.radius for obstacle in self.moving], dtype=float)
+        self.still = [obstacle for obstacle in self.obstacles if not hasattr(obstacle, 'state')]
+        self.still_circles = np.array([(obstacle.x, obstacle.y, obstacle.radius) for obstacle in self.still],
+                                      dtype=float).reshape(-1, 3)
+
+    # get the centres and radii of the obstacles which are currently there, as arrays
+    def get_circles(self):
+        if self.count != len(self.obstacles):
+            self.sort_obstacles()
+        still = self.still_circles[[not getattr(obstacle, 'depleted', False) for obstacle in self.still]]
+        if not self.moving:
+            return still[:, 0], still[:, 1], still[:, 2]
+        present = [not getattr(obstacle, 'depleted', False) for obstacle in self.moving]
+        moving = np.array([obstacle.state[:2] for obstacle in self.moving]).reshape(-1, 2)[present]
+        return (np.concatenate((still[:, 0], moving[:, 0])), np.concatenate((still[:, 1], moving[:, 1])),
+                np.concatenate((still[:, 2], self.moving_rs[present])))
+
+    # find which of the rays from (x, y) to (xs, ys) are blocked. the coordinates are broadcast against each other, so
+    # e.g. x and y can be a sensor's position and xs and ys the positions of its light sources, giving an array with a
+    # value for each source, or x and y can be columns of many sensors' positions, giving a row for each sensor
+    def get_blocked(self, x, y, xs, ys):
+        x0s, y0s, x1s, y1s = np.broadcast_arrays(*[np.asarray(a, dtype=float) for a in (x, y, xs, ys)])
+        blocked = get_blocked_segments(x0s.ravel(), y0s.ravel(), x1s.ravel(), y1s.ravel(), *self.get_circles())
+        return blocked.reshape(x0s.shape)
+
+####################################################################################
+#                           Occlusion ends
+####################################################################################
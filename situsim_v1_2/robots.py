@@ -16,12 +16,16 @@ class Robot(Agent):
                  left_motor_noisemaker=None, right_motor_noisemaker=None,
                  left_motor_max_speed=2, right_motor_max_speed=2,
                  left_motor_inertia=0, right_motor_inertia=0,
-                 left_motor_reversed=False, right_motor_reversed=False
+                 left_motor_reversed=False, right_motor_reversed=False,
+                 integrator='euler'
                  ):
         super().__init__(x, y, theta)  # call Agent constructor
         self.controller = controller  # the controller for the robot, which will set motor speeds according to how stimulated the robot's sensors are
         self.radius = radius  # the radius of the robot's body
-        self.state = np.array([x, y, theta]) # the robot's state: position and orientation
+        self.state = np.array([x, y, theta], dtype=float) # the robot's state: position and orientation. it is updated in place, so it must be float even if ints are given
+        if integrator not in ('euler', 'arc'):
+            raise ValueError("integrator must be 'euler' or 'arc', not " + repr(integrator))
+        self.integrator = integrator # 'euler' for forward Euler, or 'arc' to move along the exact arc the wheels trace out over a step
         self.left_sensor_angle = left_sensor_angle # sensor orientations
         self.right_sensor_angle = right_sensor_angle
         self.left_sensor = LightSensor(light_sources=left_light_sources, x=x, y=y, noisemaker=left_sensor_noisemaker, field_of_view=field_of_view) # construct left sensor. at this point, dummy positions are given for light sensors. they will be fixed when self.update_sensor_positions() is called
@@ -32,6 +36,21 @@ class Robot(Agent):
 
         self.velocities = []
 
+    # put the robot back at the given position and orientation, with its sensors, motors and records reset, so that it
+    # can be used for another run without being constructed again. if a controller is given, it replaces the robot's
+    # controller. the state is updated in place, as arenas can hold views of it
+    def reset(self, x, y, theta=0, controller=None):
+        super().reset(x, y, theta)
+        self.state[:] = (x, y, theta)
+        if controller is not None:
+            self.controller = controller
+        self.left_sensor.reset(x, y, 0)  # as in the constructor, dummy positions until update_sensor_positions
+        self.right_sensor.reset(x, y, 0)
+        self.update_sensor_positions()
+        self.left_motor.reset()
+        self.right_motor.reset()
+        self.velocities = []
+
     # update sensor positions according to robot's state
     def update_sensor_positions(self):
         self.left_sensor.x = self.state[0] + (self.radius * np.cos(self.state[2] + self.left_sensor_angle))
@@ -65,17 +84,28 @@ class Robot(Agent):
     def integrate(self, left_speed, right_speed, dt):
 
         """Applies a motor activation vector to an agent state, and simulates
-        the consequences using Euler integration over a dt interval."""
+        the consequences over a dt interval, using either Euler integration or
+        the exact arc for wheel speeds which are constant over the interval."""
         # calculate the linear speed and angular speed
-        v = np.mean([left_speed, right_speed])
+        v = (left_speed + right_speed) / 2
         self.velocities.append(v)
         omega = (right_speed - left_speed) / (2.0 * self.radius)
-
-        # calculate time derivative of state
-        deriv = [v * np.cos(self.state[2]), v * np.sin(self.state[2]), omega]
-
-        # perform Euler integration
-        self.state = dt * np.array(deriv) + self.state
+        theta = self.state[2]
+
+        if self.integrator == 'arc':
+            # with constant wheel speeds, a differential drive robot moves along a circular arc. the straight line from
+            # the start of the arc to its end is a chord, which points along the average of the start and end headings,
+            # and has length v * dt * sin(omega * dt / 2) / (omega * dt / 2). np.sinc(x) is sin(pi * x) / (pi * x), and
+            # is 1 when x is 0, so driving straight needs no special case
+            half_turn = omega * dt / 2
+            chord = v * dt * np.sinc(half_turn / np.pi)
+            self.state[0] += chord * np.cos(theta + half_turn)
+            self.state[1] += chord * np.sin(theta + half_turn)
+        else:
+            # perform Euler integration
+            self.state[0] += dt * (v * np.cos(theta))
+            self.state[1] += dt * (v * np.sin(theta))
+        self.state[2] += dt * omega
 
         # store robot state
         self.x = self.state[0]
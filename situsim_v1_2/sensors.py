@@ -1,4 +1,5 @@
 from .base import *
+from .stimuli import LightSourceGrid, get_brightnesses_at
 
 # base sensor class. in the current implementation, only contains methods for drawing
 class Sensor(System):
@@ -21,21 +22,112 @@ class Sensor(System):
             pygame.draw.circle(screen, center=(scale*self.x+shiftx, scale*self.y+shifty), color=self.color, radius=scale*self.radius)
 
 # a class to define a sensor which detects instances of the LightSource class
+# - by default, every light source in the list is checked on every step. with many lights, a max_range and/or an
+# epsilon can be given, and then only sources within range are added up: with max_range, sources further away than
+# that are ignored, and with epsilon, sources too far away to be brighter than epsilon are ignored. the sources in
+# range (and in the field of view) are found with a LightSourceGrid, so the cost of a step depends on how many sources
+# are nearby rather than how many there are. lights are assumed not to move (call build_grid if they do)
+# - ignoring sources is an approximation, and the most it can have changed the activation by (each ignored source
+# could at most have been as bright as it is at its cutoff distance) is kept in truncation_bound, with the largest
+# bound of any step so far in max_truncation_bound
+# - with occluders (an Occluders object), sources whose light is blocked by an obstacle on the way are not detected
 class LightSensor(Sensor):
     # construct light sensor
-    def __init__(self, light_sources, x, y, theta=0, field_of_view=2*np.pi, noisemaker=None):
+    def __init__(self, light_sources, x, y, theta=0, field_of_view=2*np.pi, noisemaker=None, max_range=None,
+                 epsilon=None, occluders=None):
         super().__init__(x, y, theta)
         self.light_sources = light_sources  # a list of LightSource instances which this sensor can detect
         self.activation = 0  # sensor activation. this variable is updated in and returned from the step method. it is stored separately in case you want to access it multiple times between simulation steps, although that is unlikely to be necessary
         self.activations = [self.activation]  # for plotting and analysis, a sensor keeps a complete record of its activation over time
         self.noisemaker = noisemaker  # noise source
         self.field_of_view = field_of_view  # sensor angular field of view
+        self.max_range = max_range  # sources further away than this are ignored (None for no limit)
+        self.epsilon = epsilon  # sources too far away to be brighter than this are ignored (None for no limit)
+        self.grid = None  # grid of the light sources' positions, built on the first step with a cutoff
+        self.truncation_bound = 0  # the most that ignoring sources can have changed the last activation by
+        self.max_truncation_bound = 0  # the largest truncation_bound so far
+        self.occluders = occluders  # Occluders whose obstacles block light from reaching the sensor (None for none)
+
+    # reset light sensor, with its records cleared. the grid is rebuilt on the next step, in case the light sources
+    # have been moved
+    def reset(self, x=None, y=None, theta=None):
+        super().reset(x, y, theta)
+        self.activation = 0
+        self.activations = [self.activation]
+        self.grid = None
+        self.truncation_bound = 0
+        self.max_truncation_bound = 0
+        if self.noisemaker is not None:
+            self.noisemaker.reset()
+
+    # build the grid used to find the sources within range, and work out each source's cutoff distance
+    def build_grid(self):
+        cutoffs = []
+        for source in self.light_sources:
+            cutoff = np.inf if self.max_range is None else self.max_range
+            if self.epsilon is not None:
+                cutoff = min(cutoff, source.get_cutoff_distance(self.epsilon))
+            cutoffs.append(cutoff)
+        self.cutoffs = cutoffs
+        self.cutoff_range = max(cutoffs, default=0)  # the furthest any source can be and still be added up
+        # the most any ignored source could add, which is its brightness at its cutoff distance
+        self.cutoff_brightness = max([source.get_brightness_at_distance(cutoff) for source, cutoff
+                                      in zip(self.light_sources, cutoffs) if np.isfinite(cutoff)], default=0)
+        self.grid = None
+        if np.isfinite(self.cutoff_range) and self.cutoff_range > 0:
+            self.grid = LightSourceGrid(self.light_sources, self.cutoff_range)
+
+    # get the bounding box of the part of a circle around the sensor which is in its field of view
+    def get_sector_bounds(self, radius):
+        if self.field_of_view >= np.pi:
+            return self.x - radius, self.x + radius, self.y - radius, self.y + radius
+        half_fov = self.field_of_view / 2
+        # the box of a sector is set by its centre, the ends of its arc, and any point of the arc due N, E, S or W
+        angles = [self.theta - half_fov, self.theta + half_fov]
+        angles += [k * np.pi / 2 for k in range(4) if np.abs(angle_difference(k * np.pi / 2, self.theta)) <= half_fov]
+        xs = [self.x] + [self.x + radius * np.cos(angle) for angle in angles]
+        ys = [self.y] + [self.y + radius * np.sin(angle) for angle in angles]
+        return min(xs), max(xs), min(ys), max(ys)
+
+    # get the light sources which are close enough to add up, in the order they are in the list, and update the
+    # truncation bound for ignoring the rest
+    def get_sources_in_range(self):
+        if self.grid is None or self.grid.count != len(self.light_sources):
+            self.build_grid()
+        if self.grid is None:  # no source has a finite cutoff, or none can be seen at all
+            candidates = range(len(self.light_sources)) if self.cutoff_range > 0 else []
+        else:
+            candidates = self.grid.query(*self.get_sector_bounds(self.cutoff_range))
+
+        sources = []
+        for i in candidates:
+            source = self.light_sources[i]
+            if np.hypot(source.x - self.x, source.y - self.y) <= self.cutoffs[i]:
+                sources.append(source)
+
+        self.truncation_bound = (len(self.light_sources) - len(sources)) * self.cutoff_brightness
+        self.max_truncation_bound = max(self.max_truncation_bound, self.truncation_bound)
+        return sources
+
+    # get the sources whose light is not blocked by any of the occluders, in the order they are in the list. only
+    # sources which are on and in the field of view are checked, as the rest are not detected anyway
+    def get_unblocked_sources(self, sources):
+        seen = [source for source in sources if source.is_on and np.abs(angle_difference(
+            np.arctan2(source.y - self.y, source.x - self.x), self.theta)) <= (self.field_of_view/2)]
+        blocked = self.occluders.get_blocked(self.x, self.y, [source.x for source in seen], [source.y for source in seen])
+        return [source for source, is_blocked in zip(seen, blocked) if not is_blocked]
 
     # step light sensor. the sensor has no dynamics, so technically is not stepped in time, but 'step' is used for consistency
     def step(self, dt):
         super().step(dt)  # call System step method, to store xy-coordinates and theta
         self.activation = 0  # begin with zero activation, and add to it for every detected light source
-        for source in self.light_sources:  # for every light source the sensor can detect
+        if self.max_range is None and self.epsilon is None:
+            sources = self.light_sources
+        else:
+            sources = self.get_sources_in_range()
+        if self.occluders is not None:
+            sources = self.get_unblocked_sources(sources)
+        for source in sources:  # for every light source the sensor can detect
             angle_to_source = np.arctan2(source.y - self.y, source.x - self.x)  # find angle of vector from light source to sensor
             if np.abs(angle_difference(angle_to_source, self.theta)) <= (self.field_of_view/2):  # if angle is within field fo view, the sensor detects the light
                 self.activation += source.get_brightness_at(self.x,self.y)  # stimuli from multiple lights are added linearly
@@ -49,3 +141,123 @@ class LightSensor(Sensor):
 
         # return activation
         return self.activation  # return activation
+
+
+# a set of LightSensors which are all in the same place, with the same orientation and field of view, but which detect
+# different lists of light sources (e.g. one for each type of consumable: food, poison, water...). stepping the set
+# steps every sensor in it, with the same result as stepping them one at a time, but the angles and brightnesses of all
+# of their sources are worked out in one pass, so the cost of sensing does not grow with the number of sensors (or
+# channels) at a location. the sensors keep their own noise, activations and drawing, and are still positioned as usual
+# - the first sensor's position and orientation are used for all of them
+class MultiChannelLightSensor:
+
+    # construct multi-channel sensor from a list of co-located LightSensors
+    def __init__(self, sensors):
+        self.sensors = sensors
+        for sensor in sensors[1:]:
+            if sensor.field_of_view != sensors[0].field_of_view:
+                raise ValueError('the sensors in a MultiChannelLightSensor must have the same field of view')
+
+    # step all of the sensors, and return a list of their activations
+    def step(self, dt):
+        # sensors with range or brightness cutoffs only add up some of their sources, and subclasses may sense in their
+        # own way, so they are stepped on their own. so are sensors with different occluders to the first one
+        lead = self.sensors[0]
+        shared = [sensor for sensor in self.sensors if type(sensor).step is LightSensor.step
+                  and sensor.max_range is None and sensor.epsilon is None and sensor.occluders is lead.occluders]
+        light_sources = [source for sensor in shared for source in sensor.light_sources]
+        brightnesses, angles = get_brightnesses_at(light_sources, lead.x, lead.y)
+        # the angles between the sensor's direction and each source, as in angle_difference
+        diffs = (angles - lead.theta) % (2*np.pi)
+        diffs[diffs > np.pi] -= 2*np.pi
+        visible = np.abs(diffs) <= (lead.field_of_view/2)
+        brightnesses[~visible] = 0
+        if lead.occluders is not None:  # only the sources which would be detected need checking
+            lit = np.nonzero(brightnesses)[0]
+            blocked = lead.occluders.get_blocked(lead.x, lead.y, [light_sources[i].x for i in lit],
+                                                 [light_sources[i].y for i in lit])
+            brightnesses[lit[blocked]] = 0
+
+        start = 0
+        for sensor in shared:
+            Sensor.step(sensor, dt)  # store xy-coordinates and theta, as LightSensor.step does
+            end = start + len(sensor.light_sources)
+            # the brightnesses are added up in order, so that the activation is rounded just as it is in LightSensor
+            sensor.activation = np.cumsum(brightnesses[start:end])[-1] if end > start else 0
+            start = end
+            if sensor.noisemaker != None:
+                sensor.activation += sensor.noisemaker.step(dt)
+            sensor.activations.append(sensor.activation)
+
+        return [sensor.activation if sensor in shared else sensor.step(dt) for sensor in self.sensors]
+
+
+# an array of light sensors around the edge of a body, all detecting the same list of light sources. the array is
+# positioned like any other sensor, at the centre of the body and facing the same way, and the sensors are at
+# mount_radius from its centre at the given angles, each facing directly outwards with its own field of view. the
+# activations of all of the sensors are computed together, as one (sensors x sources) numpy calculation, and are the
+# same as those of LightSensors at the same places. activation is an array with a value for each sensor
+class LightSensorArray(Sensor):
+
+    # construct light sensor array. fields_of_view and noisemakers can be single values for every sensor, or lists
+    def __init__(self, light_sources, x, y, theta=0, angles=(np.pi/4, -np.pi/4), fields_of_view=2*np.pi,
+                 mount_radius=1, noisemakers=None, occluders=None):
+        super().__init__(x, y, theta)
+        self.light_sources = light_sources  # a list of LightSource instances which the sensors can detect
+        self.angles = np.array(angles, dtype=float)  # angles of the sensors on the body
+        self.fields_of_view = np.broadcast_to(np.asarray(fields_of_view, dtype=float), self.angles.shape)
+        self.mount_radius = mount_radius  # distance of the sensors from the centre of the array
+        if noisemakers is None or not isinstance(noisemakers, (list, tuple)):
+            noisemakers = [noisemakers] * len(self.angles)
+        self.noisemakers = noisemakers  # a noise source for each sensor (or None)
+        self.occluders = occluders  # Occluders whose obstacles block light from reaching the sensors (None for none)
+        self.activation = np.zeros(len(self.angles))  # activation of every sensor in the last step
+        self.activations = [self.activation]  # complete record of the sensors' activations over time
+
+    # reset the sensors, with their records cleared
+    def reset(self, x=None, y=None, theta=None):
+        super().reset(x, y, theta)
+        self.activation = np.zeros(len(self.angles))
+        self.activations = [self.activation]
+        for noisemaker in self.noisemakers:
+            if noisemaker is not None:
+                noisemaker.reset()
+
+    # get the positions and orientations of the sensors
+    def get_sensor_poses(self):
+        thetas = self.theta + self.angles
+        return self.x + self.mount_radius * np.cos(thetas), self.y + self.mount_radius * np.sin(thetas), thetas
+
+    # step the sensors, and return an array of their activations
+    def step(self, dt):
+        super().step(dt)  # call System step method, to store xy-coordinates and theta
+        xs, ys, thetas = self.get_sensor_poses()
+        brightnesses, angles = get_brightnesses_at(self.light_sources, xs, ys)  # one row per sensor
+        # the angles between each sensor's direction and each source, as in angle_difference
+        diffs = (angles - thetas[:, None]) % (2*np.pi)
+        diffs[diffs > np.pi] -= 2*np.pi
+        brightnesses[np.abs(diffs) > (self.fields_of_view[:, None]/2)] = 0
+        if self.occluders is not None:
+            source_xs = np.array([source.x for source in self.light_sources])
+            source_ys = np.array([source.y for source in self.light_sources])
+            brightnesses[self.occluders.get_blocked(xs[:, None], ys[:, None], source_xs, source_ys)] = 0
+        self.activation = brightnesses.sum(axis=1)
+
+        # add noise, for the sensors which have noisemakers
+        for i, noisemaker in enumerate(self.noisemakers):
+            if noisemaker != None:
+                self.activation[i] += noisemaker.step(dt)
+
+        self.activations.append(self.activation)
+        return self.activation
+
+    # draw every sensor in the specified matplotlib axes
+    def draw(self, ax):
+        for x, y, _ in zip(*self.get_sensor_poses()):
+            ax.add_artist(mpatches.Circle((x, y), self.radius, color=self.color))
+            ax.plot(x, y, 'k.')
+
+    # draw every sensor in a pygame display
+    def pygame_draw(self, screen, scale, shiftx, shifty):
+        for x, y, _ in zip(*self.get_sensor_poses()):
+            pygame.draw.circle(screen, center=(scale*x+shiftx, scale*y+shifty), color=self.color, radius=scale*self.radius)
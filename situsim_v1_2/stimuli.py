@@ -84,6 +84,98 @@ class LightSource(Stimulus):
     def inv_sq_model(self, dist):
         return self.brightness / np.power(dist + 1, 2)  # 1 is added to fix brightness at dist=0
 
+    # get the brightness the light would have at the given distance, if it were on. dist can also be a numpy array of
+    # distances, to get the brightness at many places at once
+    def get_brightness_at_distance(self, dist):
+        if self.model == 'inv_sq':
+            return self.inv_sq_model(dist)
+        elif self.model == 'linear':
+            return np.maximum(self.brightness - self.gradient * dist, 0)
+        elif self.model == 'binary':
+            return self.brightness + np.zeros_like(dist)
+        return np.zeros_like(dist)
+
+    # get the distance beyond which the light's brightness is always below epsilon. with the binary model the
+    # brightness never falls, so there is no such distance (inf is returned)
+    def get_cutoff_distance(self, epsilon):
+        if self.model == 'inv_sq':
+            return max(np.sqrt(self.brightness / epsilon) - 1, 0)
+        elif self.model == 'linear':
+            if self.gradient <= 0:
+                return np.inf if self.brightness >= epsilon else 0
+            return max((self.brightness - epsilon) / self.gradient, 0)
+        elif self.model == 'binary':
+            return np.inf if self.brightness >= epsilon else 0
+        return 0
+
+
+# get the brightness of every light source in a list at the given xy coordinates, and the angle from the coordinates to
+# each source, as numpy arrays. this gives the same values as calling get_brightness_at and np.arctan2 for one source at
+# a time, but does it for all of the sources at once, so that sensors with many sources (or sensors which share a
+# position, and so can look at all of their sources together) do not have to loop over them. x and y can also be
+# arrays of coordinates (e.g. of the sensors in an array), in which case the results have a row for each of them
+def get_brightnesses_at(light_sources, x, y):
+    x, y = np.asarray(x), np.asarray(y)
+    n = len(light_sources)
+    if n == 0:
+        return np.zeros(x.shape + (0,)), np.zeros(x.shape + (0,))
+    # vectors from the coordinates to the sources
+    vecs = np.stack([np.array([source.x for source in light_sources]) - x[..., None],
+                     np.array([source.y for source in light_sources]) - y[..., None]], axis=-1)
+    # lengths are found from dot products, in the same way as np.linalg.norm finds them in get_distance, so that they
+    # are rounded in the same way
+    dists = np.sqrt((vecs[..., None, :] @ vecs[..., :, None])[..., 0, 0])
+    angles = np.arctan2(vecs[..., 1], vecs[..., 0])
+
+    models = [source.model for source in light_sources]
+    brightness = np.array([source.brightness for source in light_sources], dtype=float)
+    brightnesses = np.zeros(dists.shape)
+    inv_sq = np.array([model == 'inv_sq' for model in models])
+    brightnesses[..., inv_sq] = brightness[inv_sq] / np.power(dists[..., inv_sq] + 1, 2)
+    if not inv_sq.all():  # other models are rare, so they are only looked for when they are there
+        linear = np.array([model == 'linear' for model in models])
+        gradient = np.array([source.gradient for source in light_sources], dtype=float)
+        brightnesses[..., linear] = np.maximum(brightness[linear] - gradient[linear] * dists[..., linear], 0)
+        binary = np.array([model == 'binary' for model in models])
+        brightnesses[..., binary] = brightness[binary]
+    brightnesses[..., ~np.array([source.is_on for source in light_sources], dtype=bool)] = 0
+    return brightnesses, angles
+
+
+# a uniform grid of the positions of a list of light sources, so that the sources in a region can be found without
+# checking every one of them. the sources are assumed to stay where they were when the grid was built - if they move,
+# the grid has to be built again
+class LightSourceGrid:
+
+    # construct grid. cell_size should be about the size of the regions that will be queried
+    def __init__(self, light_sources, cell_size):
+        self.cell_size = cell_size
+        self.count = len(light_sources)  # number of sources in the grid, so a sensor can tell if its list has grown
+        self.cells = {}  # dictionary of (column, row) -> list of indices of the sources in that cell
+        for i, source in enumerate(light_sources):
+            cell = (int(np.floor(source.x / cell_size)), int(np.floor(source.y / cell_size)))
+            self.cells.setdefault(cell, []).append(i)
+        # the range of occupied cells, so queries of large regions don't visit cells that can't have anything in them
+        if self.cells:
+            columns, rows = zip(*self.cells)
+            self.bounds = (min(columns), max(columns), min(rows), max(rows))
+        else:
+            self.bounds = (0, -1, 0, -1)
+
+    # get the indices of all sources in cells which overlap the given rectangle, in the order they are in the list
+    # (some of them may be outside the rectangle itself)
+    def query(self, x_min, x_max, y_min, y_max):
+        column_min = max(int(np.floor(x_min / self.cell_size)), self.bounds[0])
+        column_max = min(int(np.floor(x_max / self.cell_size)), self.bounds[1])
+        row_min = max(int(np.floor(y_min / self.cell_size)), self.bounds[2])
+        row_max = min(int(np.floor(y_max / self.cell_size)), self.bounds[3])
+        found = []
+        for column in range(column_min, column_max + 1):
+            for row in range(row_min, row_max + 1):
+                found += self.cells.get((column, row), [])
+        found.sort()
+        return found
+
 ####################################################################################
 #                           Stimulus classes end
 ####################################################################################
@@ -0,0 +1,79 @@
+import unittest
+import numpy as np
+from testcase import MyTestCase
+import sys
+sys.path.insert(1, '../../..')
+from situsim_v1_2 import *
+from situsim_extensions.arena import MultiAgentArena
+
+# make robots at the given positions, with no controllers, in a MultiAgentArena
+def make_arena(positions, radius=1, size=20, collision_iterations=2):
+    robots = [Robot(x=x, y=y, controller=None, radius=radius) for x, y in positions]
+    arena = MultiAgentArena(robots, x_left=-size, x_right=size, y_top=size, y_bottom=-size,
+                            collision_iterations=collision_iterations)
+    return robots, arena
+
+# smallest distance between any two robots
+def min_distance(robots):
+    xy = np.array([robot.state[:2] for robot in robots])
+    dists = np.hypot(*(xy[:, None, :] - xy[None, :, :]).transpose(2, 0, 1))
+    return dists[np.triu_indices(len(robots), 1)].min()
+
+class Test_MultiAgentArena(MyTestCase):
+
+    def test_walls(self):
+
+        robots, arena = make_arena([(0, 0), (5, 5)], size=10)
+        robots[0].state[:2] = (12, -15)
+        robots[1].state[:2] = (-9.5, 9.8)
+        arena.step(0.1)
+        self.assertNear(robots[0].state[0], 9)
+        self.assertNear(robots[0].state[1], -9)
+        self.assertNear(robots[1].state[0], -9)
+        self.assertNear(robots[1].state[1], 9)
+
+    def test_separate_pair(self):
+
+        # two robots overlapping by 1 are each pushed back by half of it, along the line between them
+        robots, arena = make_arena([(0, 0), (1, 0)])
+        arena.step(0.1)
+        self.assertNear(robots[0].state[0], -0.5)
+        self.assertNear(robots[1].state[0], 1.5)
+        self.assertNear(robots[0].state[1], 0)
+        self.assertNear(robots[1].state[1], 0)
+
+        # robots which aren't touching are left alone
+        robots, arena = make_arena([(0, 0), (2.5, 0)])
+        arena.step(0.1)
+        self.assertNear(robots[1].state[0], 2.5)
+
+    def test_separate_stack(self):
+
+        # robots all at one point spread out, rather than staying on top of each other or moving in a line
+        robots, arena = make_arena([(0, 0)] * 20)
+        for _ in range(50):
+            arena.step(0.1)
+        self.assertTrue(min_distance(robots) > 1.9)
+        xy = np.array([robot.state[:2] for robot in robots])
+        self.assertTrue(np.ptp(xy[:, 0]) > 2 and np.ptp(xy[:, 1]) > 2)
+
+    def test_state_views(self):
+
+        robots, arena = make_arena([(0, 0), (5, 0)])
+        for i, robot in enumerate(robots):
+            self.assertTrue(np.shares_memory(robot.state, arena.poses))
+            self.assertTrue(np.array_equal(robot.state, arena.poses[i]))
+
+        # robots still update their states in place, so the arena sees where they move to
+        state = robots[1].state
+        robots[1].integrate(1, 1, 1)
+        self.assertTrue(robots[1].state is state)
+        self.assertNear(arena.poses[1, 0], 6)
+
+        # and the arena's corrections are seen by the robots
+        robots[1].state[:2] = (0.5, 0)
+        arena.step(0.1)
+        self.assertNear(robots[1].state[0] - robots[0].state[0], 2)
+
+if __name__ == '__main__':
+    unittest.main()
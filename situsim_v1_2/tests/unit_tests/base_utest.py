@@ -17,6 +17,45 @@ class Test_angle_difference(MyTestCase):
         self.assertApproxZero(angle_difference(np.pi, 3*np.pi))
         self.assertNotApproxZero(angle_difference(np.pi, 3*np.pi+0.01))
 
+class Test_random_in_interval(MyTestCase):
+
+    def test_interval(self):
+
+        rng = np.random.default_rng(1)
+        for _ in range(100):
+            r = random_in_interval(-3, 2, rng=rng)
+            self.assertTrue(-3 <= r < 2)
+
+    def test_reproducible(self):
+
+        # a seeded Generator gives the same sequence every time
+        rng1 = np.random.default_rng(42)
+        rng2 = np.random.default_rng(42)
+        self.assertEqual([random_in_interval(rng=rng1) for _ in range(5)],
+                         [random_in_interval(rng=rng2) for _ in range(5)])
+
+        # a seed with no Generator gives the same number every call
+        self.assertEqual(random_in_interval(0, 10, seed=7), random_in_interval(0, 10, seed=7))
+
+        # with neither, numbers come from numpy's global random state
+        np.random.seed(3)
+        a = [random_in_interval(0, 10) for _ in range(5)]
+        np.random.seed(3)
+        self.assertEqual(a, [random_in_interval(0, 10) for _ in range(5)])
+        self.assertNotEqual(a[0], a[1])
+
+class Test_distance_to_segment(MyTestCase):
+
+    def test_func(self):
+
+        # closest point in the middle of the segment
+        self.assertNear(distance_to_segment(1, 1, 0, 0, 2, 0), 1)
+        # closest points at the ends of the segment
+        self.assertNear(distance_to_segment(-3, 4, 0, 0, 2, 0), 5)
+        self.assertNear(distance_to_segment(5, 4, 0, 0, 2, 0), 5)
+        # a segment of zero length is a point
+        self.assertNear(distance_to_segment(3, 4, 0, 0, 0, 0), 5)
+
 class Test_System(MyTestCase):
 
     def test_init(self):
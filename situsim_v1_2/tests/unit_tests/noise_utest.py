@@ -0,0 +1,94 @@
+import unittest
+import numpy as np
+from testcase import MyTestCase
+import sys
+sys.path.insert(1, '../../..')
+from situsim_v1_2 import *
+
+# step a noise source n times and return the noise it generated
+def run_noise(source, n, dt=0.1):
+    return np.array([source.step(dt) for _ in range(n)])
+
+class Test_WhiteNoiseSource(MyTestCase):
+
+    def test_interval(self):
+
+        noise = run_noise(WhiteNoiseSource(min_val=-2, max_val=3, seed=1, block_size=16), 100)
+        self.assertTrue(np.all(noise >= -2))
+        self.assertTrue(np.all(noise < 3))
+
+    def test_reproducible(self):
+
+        # same seed gives the same noise, whatever the block size
+        a = run_noise(WhiteNoiseSource(min_val=0, max_val=1, seed=5, block_size=7), 50)
+        b = run_noise(WhiteNoiseSource(min_val=0, max_val=1, seed=5, block_size=13), 50)
+        self.assertTrue(np.array_equal(a, b))
+
+        c = run_noise(WhiteNoiseSource(min_val=0, max_val=1, seed=6, block_size=7), 50)
+        self.assertTrue(not np.array_equal(a, c))
+
+    def test_noises_recorded(self):
+
+        s = WhiteNoiseSource(min_val=0, max_val=1, seed=1, block_size=4)
+        noise = run_noise(s, 10)
+        self.assertEqual(len(s.noises), 11)
+        self.assertTrue(np.array_equal(s.noises[1:], noise))
+
+class Test_BrownNoiseSource(MyTestCase):
+
+    def test_steps(self):
+
+        # brown noise must carry on from where it was between blocks, and never step more than max_step_size
+        noise = run_noise(BrownNoiseSource(max_step_size=0.5, seed=3, block_size=8), 100)
+        steps = np.diff(np.concatenate([[0], noise]))
+        self.assertTrue(np.all(np.abs(steps) <= 0.5))
+
+    def test_reproducible(self):
+
+        a = run_noise(BrownNoiseSource(max_step_size=1, seed=2, block_size=10), 30)
+        b = run_noise(BrownNoiseSource(max_step_size=1, seed=2, block_size=10), 30)
+        self.assertTrue(np.array_equal(a, b))
+
+        # the seed determines the noise, not how it is split into blocks (up to floating point rounding)
+        c = run_noise(BrownNoiseSource(max_step_size=1, seed=2, block_size=3), 30)
+        self.assertTrue(np.allclose(a, c))
+
+class Test_SpikeNoiseSource(MyTestCase):
+
+    def test_values(self):
+
+        noise = run_noise(SpikeNoiseSource(prob=0.3, pos_size=2, neg_size=-1, seed=4), 1000)
+        self.assertTrue(set(np.unique(noise)) <= {0, 2, -1})
+        self.assertTrue(np.any(noise == 2))
+        self.assertTrue(np.any(noise == -1))
+
+    def test_set_params(self):
+
+        s = SpikeNoiseSource(prob=1, pos_size=1, neg_size=-1, seed=4)
+        run_noise(s, 5)
+        # turning the spikes off must take effect straight away, not after the current block is used up
+        s.set_params([0, 0, 0])
+        self.assertTrue(np.all(run_noise(s, 20) == 0))
+
+class Test_Noisemaker(MyTestCase):
+
+    def test_reproducible(self):
+
+        a = run_noise(Noisemaker([1, -1], 0.1, [0.1, 1, -1], seed=9), 300)
+        b = run_noise(Noisemaker([1, -1], 0.1, [0.1, 1, -1], seed=9), 300)
+        self.assertTrue(np.array_equal(a, b))
+
+    def test_reset(self):
+
+        n = Noisemaker([1, -1], 0.1, [0.1, 1, -1], seed=9)
+        a = run_noise(n, 300)
+        n.reset()
+        self.assertEqual(n.noises, [0])
+        self.assertTrue(np.array_equal(run_noise(n, 300), a))
+
+    def test_no_sources(self):
+
+        self.assertTrue(np.all(run_noise(Noisemaker(), 10) == 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+from testcase import MyTestCase
+import sys
+sys.path.insert(1, '../../..')
+from situsim_v1_2 import *
+
+class Test_get_blocked_segments(MyTestCase):
+
+    def test_blocked(self):
+
+        # a circle between the ends blocks, one off to the side or past the end doesn't, and one containing either
+        # end doesn't
+        cxs, cys, rs = [2, 0, 6, 0, 4], [0, 2, 0, 0, 0], [0.5, 0.5, 0.5, 0.5, 0.5]
+        for i, expected in enumerate([True, False, False, False, False]):
+            blocked = get_blocked_segments([0], [0], [4], [0], cxs[i:i+1], cys[i:i+1], rs[i:i+1])
+            self.assertEqual(bool(blocked[0]), expected)
+
+        # the same as testing every segment against every circle one at a time
+        rng = np.random.default_rng(0)
+        segments = rng.uniform(-10, 10, (300, 4))
+        circles = rng.uniform(-10, 10, (20, 3))
+        circles[:, 2] = np.abs(circles[:, 2]) / 4
+        blocked = get_blocked_segments(*segments.T, *circles.T)
+        for (x0, y0, x1, y1), is_blocked in zip(segments, blocked):
+            expected = False
+            for cx, cy, r in circles:
+                if np.hypot(cx - x0, cy - y0) <= r or np.hypot(cx - x1, cy - y1) <= r:
+                    continue
+                t = np.clip(((cx - x0) * (x1 - x0) + (cy - y0) * (y1 - y0)) / ((x1 - x0)**2 + (y1 - y0)**2), 0, 1)
+                expected = expected or np.hypot(x0 + t * (x1 - x0) - cx, y0 + t * (y1 - y0) - cy) < r
+            self.assertEqual(bool(is_blocked), bool(expected))
+
+        self.assertEqual(len(get_blocked_segments([], [], [], [], [1], [1], [1])), 0)
+        self.assertFalse(get_blocked_segments([0], [0], [4], [0], [], [], [])[0])
+
+class Test_Occluders(MyTestCase):
+
+    def test_get_blocked(self):
+
+        # obstacles are left out while depleted, and moving obstacles are read from their state
+        still = System(x=2, y=0)
+        still.radius = 0.5
+        mover = System(x=0, y=5)
+        mover.radius = 0.5
+        mover.state = np.array([0., 5., 0.])
+        occluders = Occluders([still, mover])
+        blocked = occluders.get_blocked(0, 0, [4, 0], [0, 10])
+        self.assertEqual(list(blocked), [True, True])
+        still.depleted = True
+        mover.state[0] = 3
+        blocked = occluders.get_blocked(0, 0, [4, 0], [0, 10])
+        self.assertEqual(list(blocked), [False, False])
+
+        # a column of positions gives a row for each of them
+        self.assertEqual(occluders.get_blocked(np.array([[0], [3]]), np.array([[0], [0]]), [3, 3], [5, 10]).shape,
+                         (2, 2))
+
+if __name__ == '__main__':
+    unittest.main()
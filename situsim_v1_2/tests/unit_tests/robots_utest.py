@@ -0,0 +1,92 @@
+import unittest
+import numpy as np
+from testcase import MyTestCase
+import sys
+sys.path.insert(1, '../../..')
+from situsim_v1_2 import *
+
+# integrate a robot with constant wheel speeds for n steps of dt
+def drive(robot, left_speed, right_speed, n, dt):
+    for _ in range(n):
+        robot.integrate(left_speed, right_speed, dt)
+    return robot.state
+
+class Test_Robot_integrate(MyTestCase):
+
+    def test_invalid_integrator(self):
+
+        with self.assertRaises(ValueError):
+            Robot(x=0, y=0, controller=None, integrator='rk4')
+
+    def test_straight(self):
+
+        # with equal wheel speeds, both integrators are exact
+        for integrator in ['euler', 'arc']:
+            r = Robot(x=0, y=0, controller=None, theta=np.pi/2, integrator=integrator)
+            state = drive(r, 1, 1, 10, 0.5)
+            self.assertNear(state[0], 0)
+            self.assertNear(state[1], 5)
+            self.assertNear(state[2], np.pi/2)
+
+    def test_arc_exact(self):
+
+        # with constant wheel speeds, the robot drives round a circle of radius v / omega, whatever the step size
+        v, omega = 1, 0.5
+        left_speed, right_speed = v - omega, v + omega  # robot radius is 1, so omega = (right - left) / 2
+        for dt, n in [(0.01, 1000), (1, 10), (5, 2)]:
+            r = Robot(x=0, y=0, controller=None, integrator='arc')
+            state = drive(r, left_speed, right_speed, n, dt)
+            t = n * dt
+            self.assertNear(state[0], (v/omega) * np.sin(omega*t))
+            self.assertNear(state[1], (v/omega) * (1 - np.cos(omega*t)))
+            self.assertNear(state[2], omega*t)
+
+        # Euler integration drifts away from the circle at large steps
+        r = Robot(x=0, y=0, controller=None, integrator='euler')
+        state = drive(r, left_speed, right_speed, 2, 5)
+        self.assertNotNear(state[0], (v/omega) * np.sin(omega*10), tol=0.1)
+
+    def test_state_updated_in_place(self):
+
+        r = Robot(x=1, y=2, controller=None, integrator='arc')
+        state = r.state
+        r.integrate(1, 2, 0.1)
+        self.assertTrue(r.state is state)
+        self.assertEqual(r.x, r.state[0])
+        self.assertEqual(r.y, r.state[1])
+
+class Test_Robot_reset(MyTestCase):
+
+    # run a robot with noisy motors towards a light for n steps, and return its trajectory
+    def run_robot(self, robot, n=50, dt=0.1):
+        for _ in range(n):
+            robot.step(dt)
+        return robot.xs, robot.ys, robot.thetas, robot.left_sensor.activations, robot.left_motor.speeds
+
+    def make_robot(self):
+        return Robot(x=0, y=0, controller=Controller(), theta=0.5,
+                     left_light_sources=[LightSource(x=5, y=5)], right_light_sources=[LightSource(x=5, y=5)],
+                     left_motor_noisemaker=Noisemaker([1, -1], seed=1),
+                     right_motor_noisemaker=Noisemaker([1, -1], seed=2))
+
+    def test_same_as_new_robot(self):
+
+        r = self.make_robot()
+        state = r.state
+        self.run_robot(r)
+        r.reset(x=0, y=0, theta=0.5)
+        self.assertTrue(r.state is state)  # arenas can hold views of the state
+        self.assertEqual(r.velocities, [])
+        self.assertEqual(self.run_robot(r), self.run_robot(self.make_robot()))
+
+    def test_new_controller(self):
+
+        r = self.make_robot()
+        controller = Controller()
+        r.reset(x=1, y=2, controller=controller)
+        self.assertTrue(r.controller is controller)
+        self.assertEqual((r.xs, r.ys, r.thetas), ([1], [2], [0]))
+        self.assertNear(r.left_sensor.x, 1 + np.cos(np.pi/4))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -56,6 +56,141 @@ class Test_LightSensor(MyTestCase):
         self.assertTrue(hasattr(s, 'activations'))
         self.assertTrue(hasattr(s, 'noisemaker'))
         self.assertTrue(hasattr(s, 'field_of_view'))
+        self.assertTrue(s.max_range is None)
+        self.assertTrue(s.epsilon is None)
+
+    def test_cutoff_covering_all_sources(self):
+
+        # with a range that reaches every source, the activation is exactly the same as with no cutoff
+        sources = [LightSource(x=x, y=y) for x, y in np.random.default_rng(0).uniform(-10, 10, (50, 2))]
+        exact = LightSensor(light_sources=sources, x=1, y=2, theta=0.5, field_of_view=np.pi/2)
+        cut = LightSensor(light_sources=sources, x=1, y=2, theta=0.5, field_of_view=np.pi/2, max_range=100)
+        self.assertEqual(exact.step(0.1), cut.step(0.1))
+
+        # sources outside the field of view are skipped too, but only with a full field of view is every source
+        # certainly counted, with nothing left for the bound
+        cut = LightSensor(light_sources=sources, x=1, y=2, theta=0.5, max_range=100)
+        cut.step(0.1)
+        self.assertEqual(cut.truncation_bound, 0)
+
+    def test_cutoff_error_bounded(self):
+
+        rng = np.random.default_rng(1)
+        sources = [LightSource(x=x, y=y) for x, y in rng.uniform(-100, 100, (2000, 2))]
+        for fov in [2*np.pi, np.pi/2, 0.3]:
+            for x, y, theta in rng.uniform(-100, 100, (10, 3)):
+                exact = LightSensor(light_sources=sources, x=x, y=y, theta=theta, field_of_view=fov)
+                for kwargs in [{'max_range': 20}, {'epsilon': 1E-3}, {'max_range': 5, 'epsilon': 1E-2}]:
+                    cut = LightSensor(light_sources=sources, x=x, y=y, theta=theta, field_of_view=fov, **kwargs)
+                    error = np.abs(exact.step(0.1) - cut.step(0.1))
+                    self.assertTrue(error <= cut.truncation_bound)
+                    self.assertTrue(cut.truncation_bound <= cut.max_truncation_bound)
+
+        # with epsilon, every ignored source is dimmer than epsilon
+        cut = LightSensor(light_sources=sources, x=0, y=0, epsilon=1E-3)
+        cut.step(0.1)
+        self.assertNear(cut.cutoff_brightness, 1E-3)
+        self.assertTrue(cut.truncation_bound <= len(sources) * 1E-3 + 1E-9)
+
+    def test_cutoff_field_of_view(self):
+
+        # sources behind the sensor are never candidates, and sources in front but out of range are ignored
+        behind = [LightSource(x=-x, y=0) for x in range(1, 5)]
+        near_ahead = LightSource(x=2, y=0)
+        far_ahead = LightSource(x=50, y=0)
+        s = LightSensor(light_sources=behind + [near_ahead, far_ahead], x=0, y=0, theta=0, field_of_view=np.pi/2,
+                        max_range=10)
+        self.assertEqual(s.get_sources_in_range(), [near_ahead])
+        self.assertNear(s.step(0.1), near_ahead.get_brightness_at(0, 0))
+
+    def test_cutoff_sources_added(self):
+
+        # the grid is rebuilt when sources are added to the list
+        sources = [LightSource(x=1, y=0)]
+        s = LightSensor(light_sources=sources, x=0, y=0, max_range=5)
+        s.step(0.1)
+        sources.append(LightSource(x=0, y=1))
+        self.assertNear(s.step(0.1), 2 * LightSource(x=1, y=0).get_brightness_at(0, 0))
+
+    def test_occluders(self):
+
+        # a light behind an obstacle is not detected, and the obstacle doesn't block lights it contains
+        behind = LightSource(x=4, y=0)
+        inside = LightSource(x=2, y=0.1)
+        obstacle = System(x=2, y=0)
+        obstacle.radius = 0.5
+        s = LightSensor(light_sources=[behind, inside], x=0, y=0, occluders=Occluders([obstacle]))
+        self.assertEqual(s.step(0.1), inside.get_brightness_at(0, 0))
+
+        # the same result for every kind of light sensor
+        multi = MultiChannelLightSensor([LightSensor(light_sources=[behind, inside], x=0, y=0,
+                                                     occluders=s.occluders)])
+        self.assertEqual(multi.step(0.1), [s.activation])
+        array = LightSensorArray(light_sources=[behind, inside], x=-1, y=0, angles=[0], mount_radius=1,
+                                 occluders=s.occluders)
+        self.assertNear(array.step(0.1)[0], s.activation)
+
+class Test_MultiChannelLightSensor(MyTestCase):
+
+    def test_same_as_separate_sensors(self):
+
+        # each channel's activations are exactly the same as those of a sensor stepped on its own, noise included
+        rng = np.random.default_rng(3)
+        food = [LightSource(x=x, y=y) for x, y in rng.uniform(-10, 10, (20, 2))]
+        poison = [LightSource(x=x, y=y, model='linear') for x, y in rng.uniform(-10, 10, (20, 2))]
+        water = []
+        poison[0].is_on = False
+        separate = [LightSensor(light_sources=sources, x=0, y=0, field_of_view=np.pi/2,
+                                noisemaker=WhiteNoiseSource(-0.1, 0.1, seed=i))
+                    for i, sources in enumerate([food, poison, water])]
+        channels = [LightSensor(light_sources=sources, x=0, y=0, field_of_view=np.pi/2,
+                                noisemaker=WhiteNoiseSource(-0.1, 0.1, seed=i))
+                    for i, sources in enumerate([food, poison, water])]
+        multi = MultiChannelLightSensor(channels)
+        for x, y, theta in rng.uniform(-10, 10, (50, 3)):
+            for sensor in separate + channels:
+                sensor.x, sensor.y, sensor.theta = x, y, theta
+            self.assertEqual(multi.step(0.1), [sensor.step(0.1) for sensor in separate])
+        for sensor, channel in zip(separate, channels):
+            self.assertEqual(sensor.activations, channel.activations)
+            self.assertEqual(sensor.xs, channel.xs)
+
+    def test_channels_with_cutoffs(self):
+
+        # channels with a cutoff are stepped on their own, and the sensors must share a field of view
+        sources = [LightSource(x=1, y=0), LightSource(x=50, y=0)]
+        cut = LightSensor(light_sources=sources, x=0, y=0, max_range=10)
+        multi = MultiChannelLightSensor([LightSensor(light_sources=sources, x=0, y=0), cut])
+        full, truncated = multi.step(0.1)
+        self.assertEqual(full, LightSensor(light_sources=sources, x=0, y=0).step(0.1))
+        self.assertEqual(truncated, sources[0].get_brightness_at(0, 0))
+        with self.assertRaises(ValueError):
+            MultiChannelLightSensor([cut, LightSensor(light_sources=sources, x=0, y=0, field_of_view=1)])
+
+class Test_LightSensorArray(MyTestCase):
+
+    def test_same_as_light_sensors(self):
+
+        # every sensor's activation is the same as a LightSensor's at the same place, facing the same way
+        rng = np.random.default_rng(4)
+        sources = [LightSource(x=x, y=y) for x, y in rng.uniform(-10, 10, (30, 2))]
+        angles = np.linspace(-np.pi, np.pi, 8, endpoint=False)
+        fovs = rng.uniform(0.5, 2*np.pi, 8)
+        array = LightSensorArray(light_sources=sources, x=1, y=-1, theta=0.3, angles=angles, fields_of_view=fovs,
+                                 mount_radius=0.5)
+        activations = array.step(0.1)
+        self.assertEqual(activations.shape, (8,))
+        for angle, fov, activation in zip(angles, fovs, activations):
+            sensor = LightSensor(light_sources=sources, x=1 + 0.5*np.cos(0.3 + angle), y=-1 + 0.5*np.sin(0.3 + angle),
+                                 theta=0.3 + angle, field_of_view=fov)
+            self.assertNear(activation, sensor.step(0.1))
+
+        # with no sources, every sensor reads zero (plus its noise)
+        array = LightSensorArray(light_sources=[], x=0, y=0, angles=angles,
+                                 noisemakers=[WhiteNoiseSource(1, 2, seed=i) for i in range(8)])
+        activations = array.step(0.1)
+        self.assertTrue(np.all((activations >= 1) & (activations <= 2)))
+        self.assertEqual(len(array.activations), 2)
 
 if __name__ == '__main__':
     unittest.main()
@@ -68,5 +68,43 @@ class Test_LightSource(MyTestCase):
         self.assertTrue(not hasattr(ls, 'thetas'))
         self.assertTrue(ls.is_on)
 
+    def test_get_cutoff_distance(self):
+
+        # beyond the cutoff distance, the brightness is below epsilon
+        for model in ['inv_sq', 'linear']:
+            ls = LightSource(x=0, y=0, brightness=3, model=model)
+            d = ls.get_cutoff_distance(0.01)
+            self.assertNear(ls.get_brightness_at_distance(d), 0.01)
+            self.assertTrue(ls.get_brightness_at(d + 0.1, 0) < 0.01)
+        self.assertEqual(LightSource(x=0, y=0, model='binary').get_cutoff_distance(0.01), np.inf)
+
+    def test_get_brightnesses_at(self):
+
+        # the same brightnesses and angles as looking at one source at a time, with every model, and with sources off
+        rng = np.random.default_rng(2)
+        sources = [LightSource(x=x, y=y, brightness=b, model=model) for (x, y, b), model
+                   in zip(rng.uniform(-10, 10, (30, 3)), ['inv_sq', 'linear', 'binary'] * 10)]
+        sources[4].is_on = False
+        brightnesses, angles = get_brightnesses_at(sources, 1.5, -2)
+        for source, brightness, angle in zip(sources, brightnesses, angles):
+            self.assertEqual(brightness, source.get_brightness_at(1.5, -2))
+            self.assertEqual(angle, np.arctan2(source.y + 2, source.x - 1.5))
+        self.assertEqual(len(get_brightnesses_at([], 0, 0)[0]), 0)
+
+class Test_LightSourceGrid(MyTestCase):
+
+    def test_query(self):
+
+        rng = np.random.default_rng(0)
+        sources = [LightSource(x=x, y=y) for x, y in rng.uniform(-50, 50, (500, 2))]
+        grid = LightSourceGrid(sources, 7)
+        for x_min, y_min in rng.uniform(-60, 40, (20, 2)):
+            x_max, y_max = x_min + 15, y_min + 10
+            found = grid.query(x_min, x_max, y_min, y_max)
+            inside = [i for i, s in enumerate(sources) if x_min <= s.x <= x_max and y_min <= s.y <= y_max]
+            self.assertTrue(set(inside) <= set(found))
+            self.assertEqual(found, sorted(found))
+        self.assertEqual(LightSourceGrid([], 1).query(-1, 1, -1, 1), [])
+
 if __name__ == '__main__':
     unittest.main()